@@ -0,0 +1,232 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmarks sans affichage (plateforme Qt "offscreen") des étapes principales :
+lecture de l'extraction, cache, filtrage, remplissage du tableau, note infos,
+recherche de composants ZP20 et capture ZP20 (arbre factice).
+
+Chaque étape est chronométrée puis rejouée sous tracemalloc pour le pic
+mémoire. Sans contexte fbs : QApplication simple et dossier Fichies_config
+temporaire sous le répertoire de travail (cache, paramètres et journal perf
+hors des ressources sources). Le résultat est écrit en JSON pour être
+comparé entre versions :
+
+    python benchmarks/run_benchmarks.py --sizes 10000 100000 --output bench.json
+    python benchmarks/run_benchmarks.py --compare bench.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src" / "main" / "python"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic_data import write_data_ref_json, write_extract_xlsx  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+# Saisie progressive, comme au clavier : "Référence" (colonne catégorielle,
+# filtrée sur ses catégories) et "OF" (texte, masque restreint frappe après
+# frappe)
+TYPED_FILTERS = {
+    "filter_typing": (1, "5136C"),
+    "filter_typing_text": (0, "13800"),
+}
+BOM_POSITIONS = 5_000
+# Ressources nécessaires à la fenêtre principale, copiées depuis les sources
+BENCH_RESOURCES = ["action_buttons.json"]
+
+
+def measure(func, with_memory=True):
+    """Exécute func deux fois : durée puis pic mémoire (tracemalloc)."""
+    gc.collect()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+
+    peak_mb = None
+    if with_memory:
+        gc.collect()
+        tracemalloc.start()
+        func()
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+    return result, {"seconds": round(elapsed, 4), "peak_mb": None if peak_mb is None else round(peak_mb, 2)}
+
+
+def typed_filters(column_count, column, text):
+    """Textes de filtre successifs dans column, une frappe à la fois."""
+    steps = []
+    for length in range(1, len(text) + 1):
+        texts = [""] * column_count
+        texts[column] = text[:length]
+        steps.append(texts)
+    return steps
+
+
+def prepare_resources(work_dir):
+    """Dossier Fichies_config du benchmark (comme tests/conftest.py)."""
+    from package import settings
+    from package.resourcesPath import SOURCE_RESOURCES_DIR, set_resources_dir
+
+    resources_dir = work_dir / "Fichies_config"
+    resources_dir.mkdir(parents=True, exist_ok=True)
+    for name in BENCH_RESOURCES:
+        shutil.copy(SOURCE_RESOURCES_DIR / name, resources_dir / name)
+    set_resources_dir(resources_dir)
+    settings._settings = None
+    return resources_dir
+
+
+def bench_size(rows, work_dir, with_memory):
+    from PySide6.QtWidgets import QApplication
+    from package.data_extract_service import read_extract_file
+    from package.extract_cache import load_cached_extract, save_extract_cache
+    from package.filter_engine import FilterEngine
+    from package.logic import BusinessLogic
+    from package.excel_viewer import ExcelViewerApp
+    from package.ZP20_json import ComponentSearchWidget
+    from package.zp20_extractor import extract_bom
+    from package.zp20_tree_stub import FakeZp20Session, synthetic_rows
+
+    app = QApplication.instance()
+    stages = {}
+
+    xlsx_path = work_dir / f"extraction_OF_du_bench_{rows}.xlsx"
+    if not xlsx_path.exists():
+        print(f"Génération de {xlsx_path.name}...")
+        write_extract_xlsx(xlsx_path, rows)
+    cache_root = work_dir / f"cache_{rows}"
+
+    df, stages["parse_extract"] = measure(lambda: read_extract_file(xlsx_path), with_memory)
+    _, stages["cache_write"] = measure(lambda: save_extract_cache(xlsx_path, df, cache_root), with_memory)
+    _, stages["cache_read"] = measure(lambda: load_cached_extract(xlsx_path, cache_root), with_memory)
+    _, stages["filter_engine_build"] = measure(lambda: FilterEngine(df), with_memory)
+
+    def type_filter(steps, use_index):
+        logic = BusinessLogic(use_search_index=False)
+        logic.set_data(df)
+        if use_index:
+            logic.filter_engine.build_indexes()
+        for texts in steps:
+            logic.filter_data(texts)
+        return logic
+
+    _, stages["filter_index_build"] = measure(
+        lambda: FilterEngine(df).build_indexes(), with_memory)
+    for stage, (column, text) in TYPED_FILTERS.items():
+        steps = typed_filters(len(df.columns), column, text)
+        _, stages[f"{stage}_scan"] = measure(lambda: type_filter(steps, False), with_memory)
+        logic, stages[f"{stage}_indexed"] = measure(lambda: type_filter(steps, True), with_memory)
+
+    viewer = ExcelViewerApp()
+    viewer.logic = logic
+    viewer.update_table_structure(df)
+
+    def populate():
+        viewer.populate_table()
+        app.processEvents()
+
+    _, stages["populate_table"] = measure(populate, with_memory)
+
+    of_value = str(df["OF"].iloc[len(df) // 2])
+    logic.reset_filters()
+    _, stages["infos_note"] = measure(lambda: logic.build_infos_note(of_value), with_memory)
+    viewer.close()
+
+    json_path = work_dir / "data_ref.json"
+    if not json_path.exists():
+        write_data_ref_json(json_path, BOM_POSITIONS)
+
+    def search_components():
+        widget = ComponentSearchWidget(json_path=json_path)
+        for text in ("c1", "c12", "r45", "u7", "q100"):
+            widget.search_input.setText(text)
+        widget.close()
+
+    _, stages["component_search"] = measure(search_components, with_memory)
+
+    # Capture ZP20 (extracteur Python) sur un arbre factice en mémoire
+    session = FakeZp20Session({"BENCH": synthetic_rows(BOM_POSITIONS)})
+    _, stages["zp20_extract"] = measure(
+        lambda: extract_bom(session, "BENCH", work_dir / "zp20_extract.json"), with_memory)
+
+    return {"rows": len(df), "stages": stages}
+
+
+def environment():
+    import numpy
+    import pandas
+    import PySide6
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandas": pandas.__version__,
+        "numpy": numpy.__version__,
+        "pyside6": PySide6.__version__,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(current, baseline):
+    """Affiche le rapport de durée courant / référence pour chaque étape."""
+    for size, result in current["results"].items():
+        reference = baseline["results"].get(size)
+        if not reference:
+            continue
+        print(f"\n{size} lignes")
+        for stage, values in result["stages"].items():
+            old = reference["stages"].get(stage)
+            if not old or not old["seconds"]:
+                continue
+            ratio = values["seconds"] / old["seconds"]
+            print(f"  {stage:<28} {old['seconds']:>9.3f}s -> {values['seconds']:>9.3f}s  (x{ratio:.2f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de l'application Excel Data Viewer")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="nombre de lignes des extractions synthétiques")
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"))
+    parser.add_argument("--work-dir", type=Path, default=None,
+                        help="répertoire des fichiers générés (réutilisés d'un lancement à l'autre)")
+    parser.add_argument("--no-memory", action="store_true", help="ne mesure pas le pic mémoire")
+    parser.add_argument("--compare", type=Path, default=None, help="résultats de référence (JSON)")
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or Path(tempfile.gettempdir()) / "excel_viewer_bench"
+    work_dir.mkdir(parents=True, exist_ok=True)
+    prepare_resources(work_dir)
+
+    # QApplication simple (plateforme offscreen) pour les widgets mesurés
+    from PySide6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+
+    report = {"environment": environment(), "results": {}}
+    for rows in args.sizes:
+        print(f"Benchmark {rows} lignes...")
+        report["results"][str(rows)] = bench_size(rows, work_dir, not args.no_memory)
+        for stage, values in report["results"][str(rows)]["stages"].items():
+            print(f"  {stage:<28} {values['seconds']:>9.3f}s  {values['peak_mb'] or '-':>8} Mo")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Résultats enregistrés dans {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/startup_budget.py
+"""
+Contrôle du temps d'import au démarrage (python -X importtime).
+
+Importe main.py (sans lancer l'application) dans un processus neuf, relève
+le temps cumulé et vérifie :
+  - qu'il reste sous le budget (meilleur de --runs lancements) ;
+  - qu'aucun module réservé à une action (COM, tkinter, IPR, SAP, widget
+    ZP20, overlay de performances) n'est chargé au démarrage.
+
+    python benchmarks/startup_budget.py --budget-ms 1500
+    python benchmarks/startup_budget.py --top 20
+
+Code de sortie 1 si le budget est dépassé ou si un module différé est importé.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SOURCE_DIR = REPO_ROOT / "src" / "main" / "python"
+
+DEFAULT_BUDGET_MS = 1500
+DEFAULT_RUNS = 3
+# Modules chargés uniquement à la première utilisation
+DEFERRED_MODULES = [
+    "win32com",
+    "pythoncom",
+    "tkinter",
+    "package.IPR",
+    "package.sap_service",
+    "package.ZP20_json",
+    "package.perf_overlay",
+]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def measure_imports(entry_module="main"):
+    """{module: (propre µs, cumulé µs, profondeur)} pour un import de entry_module."""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(SOURCE_DIR)] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else [])
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {entry_module}"],
+        env=env, capture_output=True, text=True, cwd=str(SOURCE_DIR),
+    )
+    if completed.returncode != 0:
+        raise Exception(f"Echec de l'import de {entry_module} :\n{completed.stderr[-2000:]}")
+
+    modules = {}
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), (len(indent) - 1) // 2)
+    if entry_module not in modules:
+        raise Exception(f"{entry_module} absent de la sortie -X importtime.")
+    return modules
+
+
+def deferred_imports(modules):
+    """Modules différés présents dans l'import (le module ou un sous-module)."""
+    return sorted(
+        name for name in modules
+        if any(name == deferred or name.startswith(deferred + ".") for deferred in DEFERRED_MODULES)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Budget de temps d'import au démarrage")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="temps d'import cumulé maximal de main.py (ms)")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS,
+                        help="nombre de lancements (le meilleur est retenu)")
+    parser.add_argument("--top", type=int, default=10,
+                        help="nombre d'imports les plus coûteux affichés")
+    args = parser.parse_args()
+
+    best = None
+    for _ in range(max(args.runs, 1)):
+        modules = measure_imports()
+        if best is None or modules["main"][1] < best["main"][1]:
+            best = modules
+
+    total_ms = best["main"][1] / 1000
+    print(f"Import de main.py : {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    # Imports des deux premiers niveaux, par coût cumulé
+    top_level = sorted(
+        ((name, cumulative) for name, (_, cumulative, depth) in best.items() if 1 <= depth <= 2),
+        key=lambda item: item[1], reverse=True,
+    )
+    for name, cumulative in top_level[:args.top]:
+        print(f"  {name:<40} {cumulative / 1000:>8.1f} ms")
+
+    failed = False
+    loaded = deferred_imports(best)
+    if loaded:
+        failed = True
+        print("Modules différés importés au démarrage : " + ", ".join(loaded))
+    if total_ms > args.budget_ms:
+        failed = True
+        print(f"Budget dépassé de {total_ms - args.budget_ms:.0f} ms")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# benchmarks/synthetic_data.py
+"""
+Générateurs de données synthétiques pour les benchmarks :
+- extraction_OF_du_*.xlsx au format de l'extraction SAP (28 colonnes) ;
+- data_ref.json (nomenclature ZP20 : [ZTOPO, ZCOMP, ZDES]).
+
+Le .xlsx est écrit directement en XML (chaînes inline) pour pouvoir
+générer un million de lignes en un temps raisonnable.
+"""
+
+import json
+import random
+import zipfile
+from datetime import date, timedelta
+from xml.sax.saxutils import escape
+
+# En-têtes de l'extraction SAP, dans l'ordre du fichier réel
+EXTRACT_HEADERS = [
+    "OF", "Article", "Désignatio", "Client", "Gestionnai", "DatedebutO", "Datelancem",
+    "DateFinOF", "Statutsyst", "Quantité", "Quantitéli", "Numéroopér", "Postedetra",
+    "Designatio", "OpérationS", "Tempsprépa", "TempsMACal", "TempsMOall", "Rendementc",
+    "Tempsdepré", "Tempsunita", "Rebutconfi", "Commentair", "Datedébute", "Heuredébut",
+    "Datefinexé", "Heurefinex", "Division",
+]
+DATE_COLUMNS = {5, 6, 7, 23, 25}
+
+CLIENTS = [
+    "COMUTITRE", "THALES", "SAFRAN", "ALSTOM", "SCHNEIDER", "LEGRAND", "VALEO", "SIEMENS",
+    "ABB", "NEXANS", "DASSAULT", "AIRBUS", "ZODIAC", "SAGEM", "HAGER", "SOCOMEC",
+    "INGENICO", "PARROT", "SOMFY", "FAURECIA", "RENAULT", "STELLANTIS", "NAVAL GROUP",
+    "MBDA", "LATECOERE", "RATIER", "EUROCOPTER",
+]
+OPERATIONS = [
+    "TEST ICT TAKAYA", "Insertion/Vague", "Dégrappage", "Sérigraphie", "Report CMS",
+    "Refusion", "Contrôle AOI", "Vernissage", "Câblage", "Emballage", "Contrôle final",
+    "Programmation", "Rétrofit", "Brasure sélective", "Nettoyage", "Déverminage",
+]
+DESIGNATION_WORDS = [
+    "PCBA", "CARTE", "ALIM", "CPU", "IHM", "CMS", "ROHS", "MODULE", "CAPTEUR", "RELAIS",
+    "COMMANDE", "PUISSANCE", "LED", "FILTRE", "INTERFACE", "UCE050", "PUP", "BUS", "CAN",
+]
+COMPONENT_KINDS = [
+    ("C", "COND {v}nF 10% 50V MS 0402 (ROHS)"),
+    ("R", "RES {v}K 1% 0603 (ROHS)"),
+    ("U", "CI REGULATEUR {v} SOIC8 (ROHS)"),
+    ("D", "DIODE {v}V SOD123 (ROHS)"),
+    ("L", "SELF {v}uH 20% (ROHS)"),
+    ("Q", "TRANSISTOR {v} SOT23 (ROHS)"),
+]
+STATUSES = ["LANC CNFP CCRP", "LANC CNF CCRP RIMP", "OUV", "LANC LIVP REGU"]
+
+EXCEL_EPOCH = date(1899, 12, 30)
+
+
+def _reference(rng):
+    return f"5136{rng.choice('ACFT')}{rng.randint(10**9, 10**11 - 1)}V{rng.randint(1, 9):02d}"
+
+
+def _designation(rng):
+    return " ".join(rng.sample(DESIGNATION_WORDS, 4))
+
+
+def generate_extract_rows(rows, seed=0):
+    """
+    Génère les lignes de l'extraction (28 valeurs par ligne).
+    Les OF ont plusieurs opérations, et un même article revient sur plusieurs OF,
+    pour garder des cardinalités proches du fichier réel.
+    """
+    rng = random.Random(seed)
+    articles = [(_reference(rng), _designation(rng), rng.choice(CLIENTS))
+                for _ in range(max(10, rows // 70))]
+    start = date(2025, 1, 1)
+
+    produced = 0
+    of_number = 1380000
+    while produced < rows:
+        of_number += 1
+        reference, designation, client = rng.choice(articles)
+        of_value = f"P{of_number}" if rng.random() < 0.01 else str(of_number)
+        quantity = rng.randint(1, 500)
+        end_date = start + timedelta(days=rng.randint(0, 120))
+        status = rng.choice(STATUSES)
+        for step in range(rng.randint(3, 12)):
+            if produced >= rows:
+                break
+            operation = f"{(step + 1) * 10:04d}"
+            yield [
+                of_value, reference, designation, client, "X17",
+                end_date - timedelta(days=20), end_date - timedelta(days=30), end_date,
+                status, quantity, rng.randint(0, quantity), operation,
+                f"POSTE{rng.randint(1, 40):02d}", rng.choice(OPERATIONS), "PP06",
+                0.0, 0, round(rng.random(), 6), quantity, 0.0, round(rng.random() * 60, 2),
+                0, "", end_date - timedelta(days=10), 0, end_date, 0, "DI61",
+            ]
+            produced += 1
+
+
+def write_extract_xlsx(path, rows, seed=0):
+    """Écrit un extraction_OF_du_*.xlsx synthétique de `rows` lignes de données."""
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("xl/workbook.xml", _WORKBOOK)
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        archive.writestr("xl/styles.xml", _STYLES)
+        with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(_SHEET_HEAD.encode("utf-8"))
+            sheet.write(_row_xml(1, EXTRACT_HEADERS, header=True).encode("utf-8"))
+            for index, values in enumerate(generate_extract_rows(rows, seed), start=2):
+                sheet.write(_row_xml(index, values).encode("utf-8"))
+            sheet.write(_SHEET_TAIL.encode("utf-8"))
+    return path
+
+
+def write_data_ref_json(path, positions, seed=0):
+    """Écrit un data_ref.json synthétique ([ZTOPO, ZCOMP, ZDES]) de `positions` lignes."""
+    rng = random.Random(seed)
+    rows = [["", "", ""], ["0001", _reference(rng), "PCBA " + _designation(rng)]]
+    counters = {}
+    part_numbers = [f"5136C26202{rng.randint(10000, 99999)}" for _ in range(max(10, positions // 5))]
+    for _ in range(positions):
+        prefix, label = rng.choice(COMPONENT_KINDS)
+        counters[prefix] = counters.get(prefix, 0) + 1
+        rows.append([f"{prefix}{counters[prefix]:03d}", rng.choice(part_numbers),
+                     label.format(v=rng.randint(1, 999))])
+    with open(path, "w", encoding="cp1252") as f:
+        json.dump(rows, f, ensure_ascii=False)
+    return path
+
+
+# ----------------------------------------------------------------
+#  XML du classeur
+# ----------------------------------------------------------------
+
+def _column_letter(index):
+    letters = ""
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        letters = chr(65 + rest) + letters
+    return letters
+
+
+_LETTERS = [_column_letter(i) for i in range(len(EXTRACT_HEADERS))]
+
+
+def _row_xml(row_number, values, header=False):
+    cells = []
+    for col, value in enumerate(values):
+        ref = f"{_LETTERS[col]}{row_number}"
+        if value is None or value == "":
+            continue
+        if not header and col in DATE_COLUMNS:
+            serial = (value - EXCEL_EPOCH).days
+            cells.append(f'<c r="{ref}" s="1"><v>{serial}</v></c>')
+        elif isinstance(value, (int, float)) and not header:
+            cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        else:
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t>{escape(str(value))}</t></is></c>')
+    return f'<row r="{row_number}">{"".join(cells)}</row>'
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="extraction" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+    '<borders count="1"><border/></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '</styleSheet>'
+)
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = '</sheetData></worksheet>'
@@ -3,7 +3,7 @@ import sys
 from package.excel_viewer import ExcelViewerApp
 from pathlib import Path
 from package.resourcesPath import AppContext
-from package.IPR import message_box
+from package.message_box import message_box
 
 if __name__ == "__main__":
     ctx = AppContext.get()
@@ -1,37 +1,60 @@
 from pathlib import Path
 import datetime
-import win32com.client
-from package.resourcesPath import AppContext
+from package.resourcesPath import get_resources_dir
+from package.settings import get_setting
+from package.perf import perf_span
 from PySide6.QtWidgets import QMessageBox
 
 def convert_xls_to_xlsx(chemin_xls: Path, chemin_xlsx: Path):
     """
     Convertit un fichier .xls en .xlsx via Excel COM, sans copie locale du .xls.
+    Utilisé uniquement si le paramètre keep_xlsx_copy est actif.
     :param chemin_xls: Chemin réseau vers le fichier .xls
     :param chemin_xlsx: Chemin local où enregistrer le .xlsx
     """
     try:
-        excel_app = win32com.client.Dispatch("Excel.Application")
-        excel_app.Visible = False  # Excel invisible pendant la conversion
-        
-        wb = excel_app.Workbooks.Open(str(chemin_xls))
-        wb.SaveAs(str(chemin_xlsx), FileFormat=51)  # 51 correspond au format .xlsx
-        wb.Close()
-        excel_app.Quit()
-        
+        with perf_span("extract_conversion", file=chemin_xls.name):
+            # Import à la demande : Excel/pywin32 ne sont pas nécessaires pour lire le .xls
+            import win32com.client
+            import pythoncom
+
+            # Nécessaire lorsque la conversion tourne dans un thread de chargement
+            pythoncom.CoInitialize()
+            excel_app = win32com.client.Dispatch("Excel.Application")
+            excel_app.Visible = False  # Excel invisible pendant la conversion
+
+            wb = excel_app.Workbooks.Open(str(chemin_xls))
+            wb.SaveAs(str(chemin_xlsx), FileFormat=51)  # 51 correspond au format .xlsx
+            wb.Close()
+            excel_app.Quit()
+
         print(f"Conversion réussie : {chemin_xls.name} -> {chemin_xlsx.name}")
     except Exception as e:
         print(f"Echec de la conversion en .xlsx : {e}")
 
-def get_xlsx_of_the_day():
+def archive_extract(chemin_xlsx: Path):
+    """Ajoute une ancienne extraction à l'historique si sa date n'y figure pas."""
+    # Imports locaux : data_extract_service importe ce module
+    from package.history_store import extract_date, get_history_store
+    from package.data_extract_service import read_extract_file
+
+    jour = extract_date(chemin_xlsx)
+    store = get_history_store()
+    if jour is None or store.has_extract(jour):
+        return
+    store.append(jour, read_extract_file(chemin_xlsx), chemin_xlsx)
+    print(f"Extraction archivée dans l'historique : {chemin_xlsx.name}")
+
+def get_extract_of_the_day():
     """
-    Vérifie l'existence d'un fichier .xls sur un lecteur réseau
-    (nommé extraction_OF_du_dd_mm_yyyy.xls), le convertit en .xlsx,
-    et le stocke dans le même dossier que ce script.
+    Recherche l'extraction du jour (extraction_OF_du_dd_mm_yyyy).
 
-    Retourne le seul nom du fichier .xlsx (ex. 'extraction_OF_du_30_01_2025.xlsx')
-    si déjà présent ou converti avec succès. Retourne None si le fichier est
-    introuvable ou si la conversion a échoué.
+    Retourne le chemin à charger :
+    - le .xlsx local s'il existe déjà ;
+    - sinon le .xls du dossier réseau, lu directement (xlrd, sans Excel).
+      Si keep_xlsx_copy est actif, une copie .xlsx locale est d'abord créée
+      via Excel et c'est elle qui est retournée.
+    Retourne None si le fichier est introuvable.
     """
     # Récupération de la date du jour
     aujourdhui = datetime.date.today()
@@ -43,51 +66,49 @@ def get_xlsx_of_the_day():
     prefixe_fichier = f"extraction_OF_du_{jour:02d}_{mois:02d}_{annee}"
 
     # Chemin réseau du .xls
-    chemin_source = Path(f"W:/CHARGE_SAP/Extraction_OF/{prefixe_fichier}.xls")
+    chemin_source = Path(get_setting("extract_source_dir")) / f"{prefixe_fichier}.xls"
     print("Chemin du fichier source :", chemin_source)
 
     # Chemin local pour la version .xlsx
-    ctx = AppContext.get()
-    resources_dir = ctx.get_resource('Fichies_config/dummy.txt')
-    chemin_xlsx = Path(resources_dir).parent / f"{prefixe_fichier}.xlsx"
+    chemin_xlsx = get_resources_dir() / f"{prefixe_fichier}.xlsx"
 
     # 1) Vérification de l'existence locale du .xlsx
     if chemin_xlsx.exists():
         print(f"Le fichier '{chemin_xlsx.name}' existe déjà dans le répertoire du script. Aucune action.")
-        # QMessageBox.information(None, "Fichier utilisé", f"Le fichier utilisé est : {chemin_xlsx.name}")
-        return chemin_xlsx.name
-    else:
-        # 2) Vérifier si le .xls existe sur le réseau
-        if not chemin_source.exists():
-            print("ERREUR : Le fichier source n'existe pas sur le réseau.")
-            return None
-        else:
-            # 3) Conversion directe
-            convert_xls_to_xlsx(chemin_source, chemin_xlsx)
-
-            # 4) Vérifier la bonne création du .xlsx
-            if chemin_xlsx.exists():
-                print("Le fichier .xlsx a été créé correctement.")
-
-                # Suppression des autres fichiers .xlsx dans le répertoire de destination
-                destination_dir = chemin_xlsx.parent
-                for fichier in destination_dir.glob("*.xlsx"):
-                    if fichier != chemin_xlsx:
-                        try:
-                            fichier.unlink()
-                            print(f"Fichier supprimé : {fichier.name}")
-                        except Exception as e:
-                            print(f"Echec de suppression du fichier {fichier.name} : {e}")
-
-                # QMessageBox.information(None, "Fichier utilisé", f"Le fichier utilisé est : {chemin_xlsx.name}")
-                return chemin_xlsx.name
-            else:
-                print("Le fichier .xlsx n'a pas été créé correctement.")
-                return None
+        return chemin_xlsx
+
+    # 2) Vérifier si le .xls existe sur le réseau
+    if not chemin_source.exists():
+        print("ERREUR : Le fichier source n'existe pas sur le réseau.")
+        return None
+
+    # 3) Sans copie .xlsx : le .xls est lu directement
+    if not get_setting("keep_xlsx_copy"):
+        return chemin_source
+
+    # 4) Copie .xlsx demandée : conversion via Excel
+    convert_xls_to_xlsx(chemin_source, chemin_xlsx)
+    if not chemin_xlsx.exists():
+        print("Le fichier .xlsx n'a pas été créé correctement, lecture directe du .xls.")
+        return chemin_source
+
+    print("Le fichier .xlsx a été créé correctement.")
+    # Suppression des autres fichiers .xlsx dans le répertoire de destination,
+    # après archivage dans l'historique s'ils n'y sont pas encore
+    destination_dir = chemin_xlsx.parent
+    for fichier in destination_dir.glob("*.xlsx"):
+        if fichier != chemin_xlsx:
+            try:
+                archive_extract(fichier)
+                fichier.unlink()
+                print(f"Fichier supprimé : {fichier.name}")
+            except Exception as e:
+                print(f"Echec de suppression du fichier {fichier.name} : {e}")
+    return chemin_xlsx
 
 if __name__ == "__main__":
-    resultat = get_xlsx_of_the_day()
+    resultat = get_extract_of_the_day()
     if resultat:
-        print("Nom du fichier du jour :", resultat)
+        print("Fichier du jour :", resultat)
     else:
-        print("Pas de fichier créé ou échec lors de la conversion.")
+        print("Pas de fichier trouvé pour aujourd'hui.")
@@ -1,51 +1,21 @@
 from pathlib import Path
-import win32com.client as win32
-import tkinter as tk
-from tkinter import messagebox, simpledialog
-import pythoncom
 import sys
-from PySide6.QtWidgets import QMessageBox
-from PySide6.QtCore import Qt
-
-class NonModalMessageBox:
-    def __init__(self):
-        self.root = None
-        self._current_msg = None  # Pour garder une référence aux messages
-
-    def show_message(self, title, message, icon="info"):
-        if not self.root:
-            return
-            
-        # Fermer le message précédent s'il existe
-        if self._current_msg:
-            self._current_msg.close()
-            
-        msg = QMessageBox(self.root)
-        msg.setWindowTitle(title)
-        msg.setText(message)
-        msg.setStandardButtons(QMessageBox.Ok)
-        msg.setMinimumWidth(400)  # Largeur minimum
-        
-        if icon == "error":
-            msg.setIcon(QMessageBox.Critical)
-        elif icon == "warning":
-            msg.setIcon(QMessageBox.Warning)
-        else:
-            msg.setIcon(QMessageBox.Information)
-        
-        msg.setWindowModality(Qt.NonModal)
-        
-        # Connecter le signal finished pour nettoyer la référence
-        msg.finished.connect(lambda: self._clear_message(msg))
-        
-        self._current_msg = msg
-        msg.show()
-        
-    def _clear_message(self, msg):
-        if self._current_msg == msg:
-            self._current_msg = None
-
-message_box = NonModalMessageBox()
+from package.job_control import check_cancelled
+from package.ipr_index import IPR_BASE_PATH, IPR_DIRECTORIES, get_ipr_index
+from package.message_box import message_box
+from package.perf import perf_span
+
+# win32com / pythoncom / tkinter sont importés à l'usage : leur chargement
+# (plusieurs centaines de ms) ne pèse pas sur le démarrage de l'application
+
+
+# Libellé (et consigne) selon le répertoire où l'IPR a été trouvé
+IPR_STATUS = {
+    "VALIDE": ("IPR VALIDE", ""),
+    "AUTORISEES": ("IPR AUTORISES", ""),
+    "COURS": ("IPR en cours", "\nN'UTILISER QUE LES POSTES EN VERT"),
+}
+
 
 def rech_ipr(codecar):
     """Fonction principale qui peut être appelée par d'autres scripts"""
@@ -56,84 +26,104 @@ def rech_ipr(codecar):
     # Message initial de recherche
     message_box.show_message("Recherche en cours", f"Recherche de l'IPR pour le code {codecar}...")
 
-    pythoncom.CoInitialize()
-    codecar = codecar.replace('/', '-')
+    result = find_ipr(codecar)
+    message, level = ipr_status(result)
+    if result is None:
+        message_box.show_message("Information", message)
+        return
+    if level == "warning":
+        message_box.show_message("Attention", message, "warning")
+        return
+    message_box.show_message("Information", message)
+
+    try:
+        open_ipr_document(result)
+    except Exception as e:
+        message_box.show_message("Erreur", str(e), "error")
 
-    base_path = Path(r"S:\Methodes Production")
-    # base_path = Path(r"C:\Destination")
-    directories = [
-        ("0- IPR VALIDE", False),
-        ("1- IPR AUTORISEES", False),
-        ("2- IPR en COURS", True),
-        ("3- IPR ARCHIVES", True)
-    ]
+def find_ipr(codecar):
+    """
+    (répertoire, fichier, "xls" | "doc") de l'IPR de codecar, ou None.
+    Sans message ni COM : peut tourner dans un thread de fond.
+    """
+    codecar = codecar.replace('/', '-')
 
-    found = False
+    with perf_span("ipr_lookup", code=codecar) as span:
+        try:
+            # Recherche via l'index local (rafraîchi si un répertoire a changé)
+            result = get_ipr_index().lookup(codecar)
+        except Exception as e:
+            print(f"Index IPR indisponible, recherche directe : {e}")
+            span["fallback"] = True
+            result = _search_ipr_files(codecar)
+        span["found"] = result is not None
+    return result
+
+def ipr_status(result):
+    """(message, niveau "info" | "warning") correspondant au résultat de find_ipr."""
+    if result is None:
+        return "Aucun IPR trouvé", "info"
+    dir_name, _, kind = result
+    word = " (Word)" if kind != "xls" else ""
+    if "ARCHIVES" in dir_name:
+        return f"Code trouvé dans IPR ARCHIVES{word}, ne pas utiliser", "warning"
+    key = next(k for k in IPR_STATUS if k in dir_name)
+    label, note = IPR_STATUS[key]
+    return f"Code trouvé dans {label}{word}{note}", "info"
+
+def _search_ipr_files(codecar):
+    """Recherche directe sur le partage (sans index), par ordre de priorité des répertoires."""
+    for dir_name in IPR_DIRECTORIES:
+        # Recherche lancée en arrière-plan : arrêt possible entre deux répertoires
+        check_cancelled()
+        dir_full = IPR_BASE_PATH / dir_name
 
-    for dir_name, _ in directories:
-        dir_full = base_path / dir_name
-        
         # Recherche fichiers Excel
         xls_files = list(dir_full.glob(f"{codecar}.xls*"))
         if xls_files:
-            _handle_excel_find(xls_files[0], dir_name)
-            found = True
-            break
+            return dir_name, str(xls_files[0]), "xls"
 
         # Recherche fichiers Word
         doc_files = list(dir_full.glob(f"{codecar}.doc*"))
         if doc_files:
-            _handle_word_find(doc_files[0], dir_name)
-            found = True
-            break
-
-    if not found:
-        message_box.show_message("Information", "Aucun IPR trouvé")
-
-def _handle_excel_find(file_path, dir_name):
-    if "ARCHIVES" in dir_name:
-        message_box.show_message("Attention", "Code trouvé dans IPR ARCHIVES, ne pas utiliser", "warning")
-        return
+            return dir_name, str(doc_files[0]), "doc"
+    return None
 
-    msg_mapping = {
-        "VALIDE": "IPR VALIDE",
-        "AUTORISEES": "IPR AUTORISES", 
-        "COURS": "IPR en cours\nN'UTILISER QUE LES POSTES EN VERT"
-    }
-    key = next(k for k in msg_mapping if k in dir_name)
-    message_box.show_message("Information", f"Code trouvé dans {msg_mapping[key]}")
+def open_ipr_document(result):
+    """Ouvre dans Excel ou Word l'IPR trouvé par find_ipr (COM, thread courant)."""
+    import pythoncom
+    pythoncom.CoInitialize()
+    _, file_path, kind = result
+    if kind == "xls":
+        _open_excel(Path(file_path))
+    else:
+        _open_word(Path(file_path))
 
+def _open_excel(file_path):
     try:
+        import win32com.client as win32
         excel = win32.Dispatch('Excel.Application')
         excel.Visible = True
         wb = excel.Workbooks.Open(str(file_path))
         if not wb.ReadOnly:
             wb.Save()
     except Exception as e:
-        message_box.show_message("Erreur", f"Erreur Excel: {e}", "error")
-
-def _handle_word_find(file_path, dir_name):
-    if "ARCHIVES" in dir_name:
-        message_box.show_message("Attention", "Code trouvé dans IPR ARCHIVES (Word), ne pas utiliser", "warning")
-        return
-
-    msg_mapping = {
-        "VALIDE": "IPR VALIDE (Word)",
-        "AUTORISEES": "IPR AUTORISES (Word)",
-        "COURS": "IPR en cours (Word)\nN'UTILISER QUE LES POSTES EN VERT"
-    }
-    key = next(k for k in msg_mapping if k in dir_name)
-    message_box.show_message("Information", f"Code trouvé dans {msg_mapping[key]}")
+        raise Exception(f"Erreur Excel: {e}")
 
+def _open_word(file_path):
     try:
+        import win32com.client as win32
         word = win32.Dispatch('Word.Application')
         word.Visible = True
         doc = word.Documents.Open(str(file_path))
         doc.Activate()
     except Exception as e:
-        message_box.show_message("Erreur", f"Erreur Word: {e}", "error")
+        raise Exception(f"Erreur Word: {e}")
 
 if __name__ == "__main__":
+    import tkinter as tk
+    from tkinter import simpledialog
+
     root = tk.Tk()
     root.withdraw()
     
@@ -1,30 +1,51 @@
 import json
-import re
+from datetime import datetime
 from pathlib import Path
 
 from PySide6.QtWidgets import (
     QWidget, QLineEdit, QLabel, QPushButton, QVBoxLayout,
-    QHBoxLayout, QFileDialog, QMessageBox, QTextEdit
+    QHBoxLayout, QFileDialog, QMessageBox, QTextEdit, QListWidget
 )
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont, QIcon
 import os
-from package.resourcesPath import AppContext
+from package.resourcesPath import get_resources_dir
+from package.bom_index import BomIndex, get_bom_index, normalize_key
 
-ctx = AppContext.get()
-resources_dir = ctx.get_resource('Fichies_config/dummy.txt')
+# Nombre maximal de candidats affichés pendant la saisie
+MAX_CANDIDATES = 200
 
 class ComponentSearchWidget(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, json_path=None, index=None, captured_at=None, on_refresh=None,
+                 where_used=None):
+        """
+        :param index: BomIndex déjà construit (nomenclature enregistrée) ;
+            sinon json_path (par défaut data_ref.json) est lu
+        :param captured_at: date de capture de la nomenclature (timestamp)
+        :param on_refresh: appelé par le bouton "Actualiser (SAP)"
+        :param where_used: cas d'emploi d'une référence de composant
+            (BomStore.where_used) ; sans lui, le champ n'est pas affiché
+        """
         super().__init__(parent)
-        self.data_by_key = {}
+        # Par défaut : data_ref.json écrit par la nomenclature interactive
+        self.json_path = Path(json_path) if json_path else get_resources_dir() / 'data_ref.json'
+        self.index = BomIndex([])
+        self.captured_at = captured_at
+        self.on_refresh = on_refresh
+        self.where_used = where_used
+        # Champs d'affichage (nom, référence, description) par nom d'objet
+        self.fields = {}
+        self.candidate_positions = []
         self.selected_components = []
         self.setup_ui()
-        self.load_json_file()
+        if index is not None:
+            self.index = index
+        else:
+            self.load_json_file()
 
     def setup_ui(self):
         self.setWindowTitle("Recherche de Composants")
-        self.setFixedSize(800, 400)
+        self.setFixedSize(800, 640 if self.where_used is not None else 560)
         
         # Layout principal
         main_layout = QHBoxLayout()
@@ -48,10 +69,19 @@ class ComponentSearchWidget(QWidget):
         search_layout.addWidget(self.search_input)
         left_layout.addLayout(search_layout)
 
+        # Candidats : préfixe ("C01"), plage ("C10-C19") ou référence
+        self.candidate_list = QListWidget()
+        self.candidate_list.setFixedHeight(110)
+        self.candidate_list.currentRowChanged.connect(self.on_candidate_selected)
+        left_layout.addWidget(self.candidate_list)
+
         # Zones d'affichage : nom, référence, description
         left_layout.addLayout(self.create_display_area("Nom du composant:", "component_name"))
         left_layout.addLayout(self.create_display_area("Référence:", "reference"))
         left_layout.addLayout(self.create_display_area("Description:", "description"))
+        # Autres nomenclatures capturées qui utilisent la référence
+        if self.where_used is not None:
+            left_layout.addLayout(self.create_display_area("Cas d'emploi:", "where_used"))
 
         # Boutons
         button_layout = QHBoxLayout()
@@ -63,6 +93,19 @@ class ComponentSearchWidget(QWidget):
         button_layout.addWidget(self.reset_list_button)
         left_layout.addLayout(button_layout)
 
+        # Nomenclature enregistrée : date de capture et nouvelle capture SAP
+        if self.captured_at is not None or self.on_refresh is not None:
+            capture_layout = QHBoxLayout()
+            captured = (datetime.fromtimestamp(self.captured_at).strftime("%d/%m/%Y %H:%M")
+                        if self.captured_at else "-")
+            self.capture_label = QLabel(f"Capturée le {captured}")
+            capture_layout.addWidget(self.capture_label)
+            if self.on_refresh is not None:
+                self.refresh_button = QPushButton("Actualiser (SAP)")
+                self.refresh_button.clicked.connect(self.refresh_from_sap)
+                capture_layout.addWidget(self.refresh_button)
+            left_layout.addLayout(capture_layout)
+
         # Ajout du layout gauche
         main_layout.addLayout(left_layout)
 
@@ -127,12 +170,12 @@ class ComponentSearchWidget(QWidget):
         text_field.setReadOnly(True)
         text_field.setMinimumHeight(40)
         layout.addWidget(text_field)
+        self.fields[object_name] = text_field
 
         return layout
 
     def normalize_key(self, key):
-        key = key.strip().lower()
-        return re.sub(r'(\D)0+(\d+)', r'\1\2', key)
+        return normalize_key(key)
 
     def show_error(self, message):
         QMessageBox.critical(
@@ -143,43 +186,76 @@ class ComponentSearchWidget(QWidget):
         )
 
     def load_json_file(self):
-        file_path = Path(resources_dir).parent / 'data_ref.json'
         try:
-            # Utilisation de l'encodage CP1252 (Windows-1252) pour lire correctement les caractères spéciaux
-            with open(file_path, 'r', encoding='cp1252') as jsonfile:
-                rows = json.load(jsonfile)
-                for row in rows:
-                    if isinstance(row, list) and len(row) >= 2:
-                        key = row[0].strip()
-                        normalized_key = self.normalize_key(key)
-                        value = [row[1].strip()]
-                        if len(row) > 2:
-                            value.append(row[2].strip())
-
-                        if normalized_key:
-                            self.data_by_key[normalized_key] = value
+            # Index partagé : relu seulement si data_ref.json a changé
+            self.index = get_bom_index(self.json_path)
         except json.JSONDecodeError:
             self.show_error("Le fichier sélectionné n'est pas un fichier JSON valide.")
         except Exception as e:
             self.show_error(f"Erreur lors de la lecture du fichier : {str(e)}")
 
     def search_component(self):
-        search_text = self.normalize_key(self.search_input.text())
-
-        # Réinitialiser les champs
-        self.findChild(QLineEdit, "component_name").clear()
-        self.findChild(QLineEdit, "reference").clear()
-        self.findChild(QLineEdit, "description").clear()
-
-        if search_text in self.data_by_key:
-            component_data = self.data_by_key[search_text]
-            self.findChild(QLineEdit, "component_name").setText(search_text)
-            self.findChild(QLineEdit, "reference").setText(component_data[0])
-            if len(component_data) > 1:
-                self.findChild(QLineEdit, "description").setText(component_data[1])
+        search_text = self.search_input.text()
+        exact, candidates = self.index.search(search_text, MAX_CANDIDATES) if search_text.strip() else (None, [])
+        if exact is not None and exact not in candidates:
+            candidates = [exact] + candidates[:MAX_CANDIDATES - 1]
+
+        self.candidate_positions = candidates
+        self.candidate_list.blockSignals(True)
+        self.candidate_list.clear()
+        self.candidate_list.addItems([
+            f"{topology}  {reference}  {description}"
+            for topology, reference, description in (self.index.entries[p] for p in candidates)
+        ])
+        self.candidate_list.blockSignals(False)
+
+        # Correspondance exacte, ou candidat unique : affiché directement
+        if exact is None and len(candidates) == 1:
+            exact = candidates[0]
+        if exact is not None:
+            self.candidate_list.setCurrentRow(candidates.index(exact))
+        else:
+            self.show_entry(None)
+            # Référence absente de cette nomenclature : cas d'emploi dans les autres
+            if not candidates:
+                self.show_where_used(search_text)
+
+    def on_candidate_selected(self, row):
+        if 0 <= row < len(self.candidate_positions):
+            self.show_entry(self.index.entries[self.candidate_positions[row]])
+
+    def show_entry(self, entry):
+        """Affiche (topologie, référence, description), ou vide les champs."""
+        topology, reference, description = entry if entry else ("", "", "")
+        self.fields["component_name"].setText(topology)
+        self.fields["reference"].setText(reference)
+        self.fields["description"].setText(description)
+        self.show_where_used(reference)
+
+    def show_where_used(self, reference):
+        """Références racines (et topologies) des nomenclatures qui utilisent reference."""
+        if self.where_used is None:
+            return
+        roots = {}
+        if reference.strip():
+            for _, root, topology, _ in self.where_used(reference):
+                roots.setdefault(root, []).append(topology)
+        text = " ; ".join(f"{root} ({', '.join(topologies)})" for root, topologies in roots.items())
+        self.fields["where_used"].setText(text)
+        self.fields["where_used"].setToolTip("\n".join(text.split(" ; ")))
+        self.fields["where_used"].setCursorPosition(0)
+
+    def refresh_from_sap(self):
+        """Nouvelle capture de la nomenclature, rouverte dans une nouvelle fenêtre."""
+        try:
+            self.on_refresh()
+        except Exception as e:
+            self.show_error(f"Erreur lors de l'actualisation : {str(e)}")
+            return
+        self.close()
 
     def open_file(self):
-        file_path = Path(resources_dir).parent / "commande_composants.txt"
+        file_path = get_resources_dir() / "commande_composants.txt"
         with file_path.open("a", encoding='utf-8') as file:
             for component in self.selected_components:
                 file.write(component)
@@ -190,9 +266,9 @@ class ComponentSearchWidget(QWidget):
 
     def add_to_list(self):
         # Récupération des champs et conversion du nom en majuscules
-        component_name = self.findChild(QLineEdit, "component_name").text().upper()
-        reference = self.findChild(QLineEdit, "reference").text()
-        description = self.findChild(QLineEdit, "description").text()
+        component_name = self.fields["component_name"].text().upper()
+        reference = self.fields["reference"].text()
+        description = self.fields["description"].text()
 
         if component_name and reference:
             component_info = (
@@ -203,9 +279,7 @@ class ComponentSearchWidget(QWidget):
             self.selected_components.append(component_info)
             self.update_selected_components_display()
             self.search_input.clear()
-            self.findChild(QLineEdit, "component_name").clear()
-            self.findChild(QLineEdit, "reference").clear()
-            self.findChild(QLineEdit, "description").clear()
+            self.show_entry(None)
             self.search_input.setFocus()
         else:
             self.show_error("Veuillez sélectionner un composant valide.")
@@ -215,7 +289,7 @@ class ComponentSearchWidget(QWidget):
         self.update_selected_components_display()
         self.search_input.setFocus()
 
-        file_path = Path(resources_dir).parent / "commande_composants.txt"
+        file_path = get_resources_dir() / "commande_composants.txt"
         with file_path.open("w", encoding='utf-8') as file:
             file.write("")
 
@@ -229,12 +303,13 @@ class ComponentSearchWidget(QWidget):
         self.selected_components_widget.setPlainText("\n".join(self.selected_components))
 
 
-def nom_app():
+def nom_app(index=None, captured_at=None, on_refresh=None, where_used=None):
     """
     Cette fonction instancie simplement le QWidget, le rend visible,
     et force l'interface à être au premier plan.
     """
-    widget = ComponentSearchWidget()
+    widget = ComponentSearchWidget(index=index, captured_at=captured_at, on_refresh=on_refresh,
+                                   where_used=where_used)
     widget.show()
     widget.raise_()         # Place la fenêtre au-dessus des autres
     widget.activateWindow() # Active la fenêtre pour qu'elle reçoive le focus
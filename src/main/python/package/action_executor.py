@@ -0,0 +1,214 @@
+# services/action_executor.py
+"""
+Exécution non bloquante des actions (transactions SAP, recherche IPR,
+ouverture de documents Office).
+
+Chaque action devient un ActionJob placé dans la file de sa cible ("SAP",
+"IPR", "Office") ; une cible n'exécute pas plus de jobs à la fois que sa
+limite (une seule session SAP, par exemple). Les jobs tournent dans un
+QThreadPool dédié, leur résultat revient dans le thread GUI (job_changed).
+
+Annulation et délai maximal :
+  - un job en attente est retiré de la file ;
+  - un job en cours est marqué (cancel_event) et passe à l'état CANCELLING :
+    job_control.run_process() arrête le processus lancé (cscript...),
+    check_cancelled() interrompt les boucles Python. Sa cible reste occupée
+    jusqu'au retour effectif du thread (une session SAP n'est jamais pilotée
+    par deux jobs à la fois) ; l'état final (annulée, délai dépassé) est
+    fixé à ce moment-là.
+"""
+
+import itertools
+import time
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+from package.job_control import (
+    CANCELLED, CANCELLING, DONE, FAILED, RUNNING, TIMED_OUT, ActionJob, running_job
+)
+from package.perf import perf_span
+
+DEFAULT_LIMITS = {"SAP": 1, "IPR": 2, "Office": 1}
+DEFAULT_TIMEOUTS_S = {"SAP": 300, "IPR": 120, "Office": 120}
+WATCHDOG_INTERVAL_MS = 500
+
+
+class ActionJobSignals(QObject):
+    """Signaux émis par ActionRunnable (reçus dans le thread GUI)."""
+    succeeded = Signal(object, object)
+    failed = Signal(object, str)
+
+
+class ActionRunnable(QRunnable):
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+        self.signals = ActionJobSignals()
+
+    def run(self):
+        try:
+            with running_job(self.job), perf_span("action_job", target=self.job.target,
+                                                   action=self.job.label):
+                result = self.job.func()
+        except Exception as e:
+            self.signals.failed.emit(self.job, str(e))
+            return
+        self.signals.succeeded.emit(self.job, result)
+
+
+# ----------------------------------------------------------------
+#  Côté thread GUI
+# ----------------------------------------------------------------
+
+class ActionExecutor(QObject):
+    """Files d'actions par cible ; job_changed est émis à chaque changement d'état."""
+    job_changed = Signal(object)
+
+    def __init__(self, limits=None, timeouts=None, pool=None, parent=None):
+        """
+        :param limits: {cible: nombre de jobs simultanés} (défaut 1)
+        :param timeouts: {cible: délai maximal (s)} (défaut : sans limite)
+        :param pool: QThreadPool ; par défaut un pool dédié, distinct du pool
+            global utilisé par les chargements
+        """
+        super().__init__(parent)
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.timeouts = dict(DEFAULT_TIMEOUTS_S, **(timeouts or {}))
+        if pool is None:
+            pool = QThreadPool(self)
+            pool.setMaxThreadCount(max(sum(self.limits.values()), 1) + 1)
+        self.pool = pool
+        self.queue = []
+        self.running = {}
+        self._ids = itertools.count(1)
+        # Références gardées jusqu'à la fin du job
+        self._runnables = {}
+        self.watchdog = QTimer(self)
+        self.watchdog.setInterval(WATCHDOG_INTERVAL_MS)
+        self.watchdog.timeout.connect(self.check_timeouts)
+
+    def submit(self, target, label, func, on_done=None, timeout=None):
+        """Place func dans la file de target et retourne le job (ActionJob)."""
+        if timeout is None:
+            timeout = self.timeouts.get(target)
+        job = ActionJob(next(self._ids), target, label, func, on_done, timeout)
+        self.queue.append(job)
+        self.job_changed.emit(job)
+        self._schedule()
+        return job
+
+    def running_jobs(self):
+        return [job for jobs in self.running.values() for job in jobs]
+
+    def cancel(self, job):
+        """
+        Annule job : retiré de la file, ou interrompu s'il est en cours (la
+        cible n'est libérée qu'au retour du thread).
+        """
+        if job in self.queue:
+            self.queue.remove(job)
+            self._finish(job, CANCELLED, "Annulée avant démarrage")
+        elif job.state == RUNNING:
+            self._request_stop(job, CANCELLED)
+
+    def cancel_all(self):
+        for job in list(self.queue) + self.running_jobs():
+            self.cancel(job)
+
+    def check_timeouts(self):
+        """Demande l'arrêt des jobs en cours qui ont dépassé leur délai."""
+        for job in self.running_jobs():
+            if job.state == RUNNING and job.overdue():
+                self._request_stop(job, TIMED_OUT)
+
+    def _request_stop(self, job, reason):
+        job.request_cancel(reason)
+        job.state = CANCELLING
+        self.job_changed.emit(job)
+
+    # -- Ordonnancement -----------------------------------------------
+
+    def _next_startable(self):
+        # Les jobs en cours d'annulation occupent toujours leur cible
+        for job in self.queue:
+            if len(self.running.get(job.target, ())) < self.limits.get(job.target, 1):
+                return job
+        return None
+
+    def _schedule(self):
+        while True:
+            job = self._next_startable()
+            if job is None:
+                break
+            self.queue.remove(job)
+            self._start(job)
+        if self.running_jobs():
+            self.watchdog.start()
+        else:
+            self.watchdog.stop()
+
+    def _start(self, job):
+        job.state = RUNNING
+        job.started_at = time.time()
+        if job.timeout:
+            job.deadline = time.monotonic() + job.timeout
+        self.running.setdefault(job.target, []).append(job)
+        runnable = ActionRunnable(job)
+        runnable.signals.succeeded.connect(self._on_succeeded)
+        runnable.signals.failed.connect(self._on_failed)
+        self._runnables[job.id] = runnable
+        self.job_changed.emit(job)
+        self.pool.start(runnable)
+
+    def _release(self, job):
+        jobs = self.running.get(job.target, [])
+        if job in jobs:
+            jobs.remove(job)
+
+    def _finish_cancelled(self, job):
+        """Termine job selon le motif de son annulation (utilisateur ou délai)."""
+        if job.cancel_reason == TIMED_OUT:
+            self._finish(job, TIMED_OUT, f"Délai de {job.timeout:g} s dépassé", "error")
+        else:
+            self._finish(job, CANCELLED, "Annulée")
+
+    def _on_succeeded(self, job, result):
+        # Thread revenu : la cible est libérée
+        self._runnables.pop(job.id, None)
+        self._release(job)
+        if job.cancel_event.is_set():
+            # Annulé ou délai dépassé entre-temps : résultat ignoré
+            self._finish_cancelled(job)
+            self._schedule()
+            return
+        message, level = "", "info"
+        try:
+            if job.on_done is not None:
+                outcome = job.on_done(result)
+                if isinstance(outcome, tuple):
+                    message, level = outcome
+                elif outcome:
+                    message = str(outcome)
+        except Exception as e:
+            self._finish(job, FAILED, str(e), "error")
+        else:
+            self._finish(job, DONE, message, level)
+        self._schedule()
+
+    def _on_failed(self, job, message):
+        self._runnables.pop(job.id, None)
+        self._release(job)
+        if job.cancel_event.is_set():
+            # Arrêt demandé, ou délai constaté par le job lui-même (run_process,
+            # check_cancelled)
+            self._finish_cancelled(job)
+        else:
+            self._finish(job, FAILED, message, "error")
+        self._schedule()
+
+    def _finish(self, job, state, message, level="info"):
+        job.state = state
+        job.message = message
+        job.level = level
+        job.finished_at = time.time()
+        self.job_changed.emit(job)
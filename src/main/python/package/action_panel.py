@@ -0,0 +1,121 @@
+# gui/action_panel.py
+"""
+Panneau d'état des actions lancées en arrière-plan (ActionExecutor) : file,
+actions en cours, résultats et erreurs, à la place des messages bloquants.
+"""
+
+import time
+
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import (
+    QWidget, QHBoxLayout, QVBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, QHeaderView
+)
+
+from package.job_control import CANCELLING, FAILED, QUEUED, RUNNING, TIMED_OUT
+
+MAX_JOBS_SHOWN = 20
+PANEL_HEIGHT = 110
+REFRESH_INTERVAL_MS = 1000
+LEVEL_COLORS = {"warning": QColor("#b36b00"), "error": QColor("#c0392b")}
+
+
+class ActionStatusPanel(QWidget):
+    def __init__(self, executor, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        # Jobs affichés, du plus récent au plus ancien
+        self.jobs = []
+        self.setFixedHeight(PANEL_HEIGHT)
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["Heure", "Action", "État", "Durée", "Message"])
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setDefaultSectionSize(22)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.itemSelectionChanged.connect(self.update_buttons)
+        layout.addWidget(self.table)
+
+        buttons = QVBoxLayout()
+        self.cancel_button = QPushButton("Annuler")
+        self.cancel_button.clicked.connect(self.cancel_selected)
+        self.clear_button = QPushButton("Effacer")
+        self.clear_button.clicked.connect(self.clear_finished)
+        buttons.addWidget(self.cancel_button)
+        buttons.addWidget(self.clear_button)
+        buttons.addStretch()
+        layout.addLayout(buttons)
+
+        # Durée des actions en cours mise à jour chaque seconde
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        executor.job_changed.connect(self.on_job_changed)
+        self.update_buttons()
+
+    def on_job_changed(self, job):
+        if job not in self.jobs:
+            self.jobs.insert(0, job)
+            # Les actions terminées les plus anciennes sortent de la liste
+            while len(self.jobs) > MAX_JOBS_SHOWN:
+                finished = [old for old in self.jobs if old.finished]
+                if not finished:
+                    break
+                self.jobs.remove(finished[-1])
+        self.refresh()
+
+    def refresh(self):
+        selected = self.selected_job()
+        self.table.setRowCount(len(self.jobs))
+        for row, job in enumerate(self.jobs):
+            elapsed = job.elapsed()
+            cells = [
+                time.strftime("%H:%M:%S", time.localtime(job.submitted_at)),
+                job.label,
+                job.state,
+                "" if elapsed is None else f"{elapsed:.1f} s",
+                job.message.replace("\n", " - "),
+            ]
+            color = LEVEL_COLORS.get(job.level)
+            if job.state in (FAILED, TIMED_OUT):
+                color = LEVEL_COLORS["error"]
+            for col, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                item.setToolTip(job.message)
+                if color is not None:
+                    item.setForeground(color)
+                self.table.setItem(row, col, item)
+        if selected in self.jobs:
+            self.table.selectRow(self.jobs.index(selected))
+        if any(job.state in (RUNNING, CANCELLING) for job in self.jobs):
+            self.refresh_timer.start(REFRESH_INTERVAL_MS)
+        else:
+            self.refresh_timer.stop()
+        self.update_buttons()
+
+    def selected_job(self):
+        rows = self.table.selectionModel().selectedRows()
+        if not rows or rows[0].row() >= len(self.jobs):
+            return None
+        return self.jobs[rows[0].row()]
+
+    def update_buttons(self):
+        job = self.selected_job()
+        # Annulation déjà demandée : le job attend le retour de son thread
+        self.cancel_button.setEnabled(job is not None and job.state in (QUEUED, RUNNING))
+        self.clear_button.setEnabled(any(job.finished for job in self.jobs))
+
+    def cancel_selected(self):
+        job = self.selected_job()
+        if job is not None:
+            self.executor.cancel(job)
+
+    def clear_finished(self):
+        self.jobs = [job for job in self.jobs if not job.finished]
+        self.table.clearSelection()
+        self.refresh()
@@ -0,0 +1,196 @@
+# services/bom_index.py
+"""
+Index en mémoire de la nomenclature ZP20 (data_ref.json : [ZTOPO, ZCOMP, ZDES]).
+
+Construit une fois par processus et par fichier, puis réutilisé tant que le
+fichier n'a pas changé (taille et date de modification) : rouvrir la
+recherche de composants ne relit ni ne renormalise le JSON.
+
+Recherches :
+  - exacte sur la topologie normalisée ("c012" = "C12") ;
+  - par préfixe de topologie ("C01" -> C010 à C019), sur les clés triées ;
+  - par plage de topologies ("C10-C19", "R1..R20") ;
+  - inverse, par référence de composant (préfixe accepté).
+"""
+
+import json
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+# Topologie : lettres, numéro, suffixe éventuel (C012, R45A...)
+TOPOLOGY_PATTERN = re.compile(r"^([A-Za-z]*)(\d+)(.*)$")
+# Plage de topologies : "C10-C19", "C10..C19" ou "C10:C19"
+RANGE_PATTERN = re.compile(r"^\s*([A-Za-z]+\d+)\s*(?:-|\.\.|:)\s*([A-Za-z]*\d+)\s*$")
+MAX_KEY = "\uffff"
+
+
+def normalize_key(key):
+    """Topologie sans casse ni zéros de tête ("C012" -> "c12")."""
+    key = key.strip().lower()
+    return re.sub(r'(\D)0+(\d+)', r'\1\2', key)
+
+
+class BomIndex:
+    def __init__(self, rows):
+        """
+        :param rows: lignes [ZTOPO, ZCOMP, ZDES] (ZDES optionnelle) ; les
+            lignes sans topologie sont ignorées
+        """
+        # (topologie, référence, description), une entrée par topologie
+        self.entries = []
+        self.by_key = {}
+        for row in rows:
+            if not isinstance(row, list) or len(row) < 2:
+                continue
+            topology = str(row[0]).strip()
+            normalized = normalize_key(topology)
+            if not normalized:
+                continue
+            description = str(row[2]).strip() if len(row) > 2 else ""
+            entry = (topology, str(row[1]).strip(), description)
+            if normalized in self.by_key:
+                # Topologie en double : la dernière ligne l'emporte, comme avant
+                self.entries[self.by_key[normalized]] = entry
+            else:
+                self.by_key[normalized] = len(self.entries)
+                self.entries.append(entry)
+        self._build_sorted_keys()
+
+    def _build_sorted_keys(self):
+        # Préfixe : topologies en majuscules triées
+        keyed = sorted((topology.upper(), position)
+                       for position, (topology, _, _) in enumerate(self.entries))
+        self._topology_keys = [key for key, _ in keyed]
+        self._topology_positions = [position for _, position in keyed]
+
+        # Repli du préfixe sur les clés normalisées ("c1" -> C001, C010...)
+        normalized = sorted((key, position) for key, position in self.by_key.items())
+        self._normalized_keys = [key for key, _ in normalized]
+        self._normalized_positions = [position for _, position in normalized]
+
+        # Plages : numéros triés par famille de lettres
+        families = {}
+        for position, (topology, _, _) in enumerate(self.entries):
+            match = TOPOLOGY_PATTERN.match(topology)
+            if match:
+                families.setdefault(match.group(1).upper(), []).append((int(match.group(2)), position))
+        self._families = {}
+        for letters, numbered in families.items():
+            numbered.sort()
+            self._families[letters] = ([number for number, _ in numbered],
+                                       [position for _, position in numbered])
+
+        # Recherche inverse : références triées -> positions
+        by_reference = {}
+        for position, (_, reference, _) in enumerate(self.entries):
+            if reference:
+                by_reference.setdefault(reference.upper(), []).append(position)
+        self._references = sorted(by_reference)
+        self._reference_positions = [by_reference[reference] for reference in self._references]
+
+    @classmethod
+    def from_json_file(cls, path):
+        # Encodage CP1252 (Windows-1252), celui du fichier écrit par SAP
+        with open(path, 'r', encoding='cp1252') as jsonfile:
+            return cls(json.load(jsonfile))
+
+    def __len__(self):
+        return len(self.entries)
+
+    # ----------------------------------------------------------------
+    #  Recherches (positions dans self.entries)
+    # ----------------------------------------------------------------
+
+    def get(self, key):
+        """Entrée de la topologie key (normalisée), ou None."""
+        position = self.by_key.get(normalize_key(key))
+        return None if position is None else self.entries[position]
+
+    @staticmethod
+    def _prefix_range(keys, prefix):
+        return bisect_left(keys, prefix), bisect_left(keys, prefix + MAX_KEY)
+
+    def prefix(self, text, limit=None):
+        """Topologies commençant par text (sinon par sa forme normalisée)."""
+        prefix = text.strip().upper()
+        if not prefix:
+            return []
+        start, end = self._prefix_range(self._topology_keys, prefix)
+        positions = self._topology_positions
+        if start == end:
+            start, end = self._prefix_range(self._normalized_keys, normalize_key(text))
+            positions = self._normalized_positions
+        if limit is not None:
+            end = min(end, start + limit)
+        return positions[start:end]
+
+    def topology_range(self, first, last, limit=None):
+        """Topologies de first à last inclus (même famille de lettres)."""
+        first_match = TOPOLOGY_PATTERN.match(first.strip())
+        last_match = TOPOLOGY_PATTERN.match(last.strip())
+        if not first_match or not last_match:
+            return []
+        letters = first_match.group(1).upper()
+        # "C10-19" : la famille de la borne basse s'applique aux deux bornes
+        if last_match.group(1) and last_match.group(1).upper() != letters:
+            return []
+        low, high = int(first_match.group(2)), int(last_match.group(2))
+        if low > high:
+            low, high = high, low
+        numbers, positions = self._families.get(letters, ([], []))
+        start, end = bisect_left(numbers, low), bisect_right(numbers, high)
+        if limit is not None:
+            end = min(end, start + limit)
+        return positions[start:end]
+
+    def where_reference(self, reference, limit=None):
+        """Topologies dont la référence commence par reference."""
+        prefix = reference.strip().upper()
+        if not prefix:
+            return []
+        start, end = self._prefix_range(self._references, prefix)
+        found = []
+        for positions in self._reference_positions[start:end]:
+            found.extend(positions)
+            if limit is not None and len(found) >= limit:
+                return found[:limit]
+        return found
+
+    def search(self, text, limit=None):
+        """
+        (position exacte ou None, candidats) pour une saisie libre : plage,
+        sinon préfixe de topologie, sinon référence de composant.
+        """
+        exact = self.by_key.get(normalize_key(text))
+        match = RANGE_PATTERN.match(text)
+        if match:
+            return exact, self.topology_range(match.group(1), match.group(2), limit)
+        candidates = self.prefix(text, limit)
+        if not candidates:
+            candidates = self.where_reference(text, limit)
+        return exact, candidates
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_bom_index(path):
+    """
+    Index partagé du fichier path, reconstruit seulement si le fichier a
+    changé (taille ou date de modification) depuis la dernière lecture.
+    """
+    path = Path(path)
+    stat = path.stat()
+    signature = (stat.st_size, stat.st_mtime_ns)
+    key = str(path.resolve())
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+    index = BomIndex.from_json_file(path)
+    with _indexes_lock:
+        _indexes[key] = (signature, index)
+    return index
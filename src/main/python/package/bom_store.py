@@ -0,0 +1,230 @@
+# services/bom_store.py
+"""
+Nomenclatures ZP20 capturées, conservées par référence racine (SQLite).
+
+La nomenclature interactive relit l'arborescence ZP20 dans SAP nœud par
+nœud ; chaque capture est enregistrée ici avec sa date. Tant qu'elle a moins
+de bom_max_age_hours heures, la référence est rouverte directement depuis la
+base, sans repasser par SAP.
+
+Le même fichier sert de cas d'emploi hors ligne (équivalent CS15) : l'index
+bom_rows_component (référence de composant, sans casse) est tenu à jour par
+SQLite à chaque capture et donne, pour un composant, toutes les références
+racines et topologies qui l'utilisent.
+
+Fichier : Fichies_config/bom/bom_store.sqlite3
+    boms(root, captured_at, source, positions)
+    bom_rows(root, seq, topology, component, description)
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from package.bom_index import BomIndex
+from package.resourcesPath import get_resources_dir
+
+SCHEMA_VERSION = 2
+STORE_FILE_NAME = "bom_store.sqlite3"
+# Composants par requête groupée (limite de paramètres SQLite : 999)
+WHERE_USED_BATCH = 500
+MAX_KEY = "\uffff"
+
+
+def normalize_root(reference):
+    """Référence racine telle qu'enregistrée (majuscules, sans espaces)."""
+    return reference.strip().upper()
+
+
+def read_bom_json(path):
+    """Lignes [ZTOPO, ZCOMP, ZDES] d'un data_ref.json (CP1252, écrit par SAP)."""
+    with open(path, 'r', encoding='cp1252') as jsonfile:
+        rows = json.load(jsonfile)
+    bom_rows = []
+    for row in rows:
+        if isinstance(row, list) and len(row) >= 2 and str(row[0]).strip():
+            description = str(row[2]).strip() if len(row) > 2 else ""
+            bom_rows.append((str(row[0]).strip(), str(row[1]).strip(), description))
+    return bom_rows
+
+
+class BomStore:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Connexion partagée entre threads, accès sérialisés par self._lock
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._create_schema()
+        # root -> (captured_at, BomIndex), pour rouvrir sans relire la base
+        self._indexes = {}
+
+    def _create_schema(self):
+        with self._lock, self._connection:
+            self._connection.executescript(f"""
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS boms (
+                    root TEXT PRIMARY KEY,
+                    captured_at REAL NOT NULL,
+                    source TEXT,
+                    positions INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS bom_rows (
+                    root TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    topology TEXT NOT NULL,
+                    component TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    PRIMARY KEY (root, seq)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS bom_rows_component
+                    ON bom_rows (component COLLATE NOCASE, root, seq, topology);
+                PRAGMA user_version={SCHEMA_VERSION};
+            """)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    # ----------------------------------------------------------------
+    #  Écriture
+    # ----------------------------------------------------------------
+
+    def put(self, reference, rows, source=None, captured_at=None):
+        """Remplace la nomenclature de reference par rows [(ZTOPO, ZCOMP, ZDES)]."""
+        root = normalize_root(reference)
+        captured_at = time.time() if captured_at is None else captured_at
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM bom_rows WHERE root = ?", (root,))
+            self._connection.executemany(
+                "INSERT INTO bom_rows (root, seq, topology, component, description) VALUES (?, ?, ?, ?, ?)",
+                ((root, seq, topology, component, description)
+                 for seq, (topology, component, description) in enumerate(rows)),
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO boms (root, captured_at, source, positions) VALUES (?, ?, ?, ?)",
+                (root, captured_at, source, len(rows)),
+            )
+            self._indexes.pop(root, None)
+        return root
+
+    def import_json(self, reference, json_path, captured_at=None):
+        """Enregistre le data_ref.json json_path comme nomenclature de reference."""
+        rows = read_bom_json(json_path)
+        return self.put(reference, rows, source=Path(json_path).name, captured_at=captured_at)
+
+    def delete(self, reference):
+        root = normalize_root(reference)
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM bom_rows WHERE root = ?", (root,))
+            self._connection.execute("DELETE FROM boms WHERE root = ?", (root,))
+            self._indexes.pop(root, None)
+
+    # ----------------------------------------------------------------
+    #  Lecture
+    # ----------------------------------------------------------------
+
+    def captured_at(self, reference):
+        """Date de capture (timestamp) de reference, ou None si absente."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT captured_at FROM boms WHERE root = ?", (normalize_root(reference),)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def is_fresh(self, reference, max_age_s):
+        """Vrai si reference a été capturée il y a moins de max_age_s secondes."""
+        captured_at = self.captured_at(reference)
+        return captured_at is not None and time.time() - captured_at < max_age_s
+
+    def rows(self, reference):
+        """Lignes (ZTOPO, ZCOMP, ZDES) de reference, dans l'ordre de capture."""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT topology, component, description FROM bom_rows WHERE root = ? ORDER BY seq",
+                (normalize_root(reference),),
+            ).fetchall()
+
+    def roots(self):
+        """[(référence racine, date de capture, nombre de positions)]."""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT root, captured_at, positions FROM boms ORDER BY root"
+            ).fetchall()
+
+    def index(self, reference):
+        """BomIndex de reference (gardé en mémoire jusqu'à la capture suivante), ou None."""
+        root = normalize_root(reference)
+        captured_at = self.captured_at(root)
+        if captured_at is None:
+            return None
+        cached = self._indexes.get(root)
+        if cached is not None and cached[0] == captured_at:
+            return cached[1]
+        index = BomIndex([list(row) for row in self.rows(root)])
+        self._indexes[root] = (captured_at, index)
+        return index
+
+    # ----------------------------------------------------------------
+    #  Cas d'emploi
+    # ----------------------------------------------------------------
+
+    def where_used(self, component, prefix=False, limit=None):
+        """
+        [(composant, racine, topologie, description)] des nomenclatures
+        enregistrées qui utilisent component (ou, avec prefix, une référence
+        commençant par component).
+        """
+        component = component.strip()
+        if not component:
+            return []
+        if prefix:
+            condition = "component >= ? COLLATE NOCASE AND component < ? COLLATE NOCASE"
+            params = [component, component + MAX_KEY]
+        else:
+            condition = "component = ? COLLATE NOCASE"
+            params = [component]
+        sql = ("SELECT component, root, topology, description FROM bom_rows "
+               f"WHERE {condition} ORDER BY component COLLATE NOCASE, root, seq")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def where_used_many(self, components):
+        """
+        {composant: [(racine, topologie)]} pour une liste de composants,
+        par requêtes groupées ; les composants inutilisés ont une liste vide.
+        """
+        keys = {}
+        for component in components:
+            if component.strip():
+                keys.setdefault(component.strip().upper(), component)
+        found = {component: [] for component in keys.values()}
+        names = list(keys)
+        with self._lock:
+            for start in range(0, len(names), WHERE_USED_BATCH):
+                batch = names[start:start + WHERE_USED_BATCH]
+                placeholders = ", ".join("?" * len(batch))
+                rows = self._connection.execute(
+                    "SELECT component, root, topology FROM bom_rows "
+                    f"WHERE component COLLATE NOCASE IN ({placeholders}) ORDER BY root, seq",
+                    batch,
+                )
+                for component, root, topology in rows:
+                    found[keys[component.upper()]].append((root, topology))
+        return found
+
+
+_bom_store = None
+
+
+def get_bom_store():
+    """Base partagée, dans Fichies_config/bom."""
+    global _bom_store
+    if _bom_store is None:
+        _bom_store = BomStore(get_resources_dir() / "bom" / STORE_FILE_NAME)
+    return _bom_store
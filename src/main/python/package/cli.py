@@ -0,0 +1,250 @@
+# cli/cli.py
+"""
+Interrogation de l'extraction OF en ligne de commande, sans Qt ni COM
+(utilisable dans les traitements batch).
+
+Même chargement (cache colonnes) et même moteur de filtrage que
+l'application : un filtre "Colonne=texte" se comporte comme la saisie de
+texte dans le filtre de la colonne.
+
+    python -m package.cli query -f Client=ACME --due-to 2025-02-23 --format json
+    python -m package.cli query --file extraction_OF_du_17_02_2025.xlsx -f Référence=5136 -c OF,Client
+    python -m package.cli values Client
+    python -m package.cli serve --host 0.0.0.0 --port 8765 --watch
+    python -m package.cli where-used 5136-001 5137-002 --format json
+
+Une fois le cache de l'extraction écrit (premier lancement), une requête ne
+relit que les colonnes en cache (mmap) et ne prépare que les colonnes filtrées.
+"""
+
+import sys
+from contextlib import redirect_stdout
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+import typer
+
+from package.data_extract_service import load_extract_file
+from package.filter_engine import FilterEngine, find_column
+from package.history_store import extract_date
+from package.perf import perf_span
+from package.resourcesPath import SOURCE_RESOURCES_DIR, get_resources_dir, set_resources_dir
+from package.settings import get_setting
+
+DUE_DATE_COLUMN = "DateFinOF"
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y"]
+
+app = typer.Typer(help="Requêtes sur l'extraction OF (sans interface graphique).")
+
+
+class OutputFormat(str, Enum):
+    csv = "csv"
+    json = "json"
+
+
+def find_latest_extract(directories):
+    """Extraction la plus récente (date du nom de fichier) parmi directories."""
+    candidates = []
+    for directory in directories:
+        if not directory or not Path(directory).is_dir():
+            continue
+        for path in Path(directory).glob("extraction_OF_du_*.xls*"):
+            day = extract_date(path)
+            if day is not None and not path.name.startswith("~$"):
+                # À date égale, le .xlsx (en cache) est préféré au .xls réseau
+                candidates.append((day, path.suffix.lower() == ".xlsx", path))
+    if not candidates:
+        return None
+    return max(candidates)[2]
+
+
+def resolve_column(columns, name):
+    """Colonne désignée par name (sans tenir compte de la casse ni des accents)."""
+    column = find_column(columns, name)
+    if column is not None:
+        return column
+    raise typer.BadParameter(f"Colonne inconnue : {name} (colonnes : {', '.join(columns)})")
+
+
+def parse_filters(columns, filters):
+    """{colonne: texte} à partir des options "Colonne=texte"."""
+    parsed = {}
+    for item in filters:
+        if "=" not in item:
+            raise typer.BadParameter(f"Filtre invalide : {item} (attendu Colonne=texte)")
+        name, text = item.split("=", 1)
+        parsed[resolve_column(columns, name)] = text
+    return parsed
+
+
+def query_extract(df, filters=None, due_from=None, due_to=None, columns=None, limit=None):
+    """
+    Lignes de df qui satisfont les filtres texte ({colonne: texte}) et la
+    plage de dates de fin d'OF (incluse).
+    """
+    filters = {name: text for name, text in (filters or {}).items() if text}
+    with perf_span("cli_query", filters=len(filters)) as span:
+        if filters:
+            # Moteur limité aux colonnes filtrées : rien n'est préparé pour les autres
+            names = list(filters)
+            engine = FilterEngine(df[names])
+            mask = engine.compute_mask([filters[name] for name in names])
+        else:
+            mask = None
+        if due_from is not None or due_to is not None:
+            if DUE_DATE_COLUMN not in df.columns:
+                raise Exception(f"Colonne {DUE_DATE_COLUMN} absente de l'extraction.")
+            due = df[DUE_DATE_COLUMN].to_numpy()
+            date_mask = ~df[DUE_DATE_COLUMN].isna().to_numpy()
+            if due_from is not None:
+                date_mask &= due >= due_from.to_datetime64()
+            if due_to is not None:
+                date_mask &= due <= due_to.to_datetime64()
+            mask = date_mask if mask is None else mask & date_mask
+        result = df if mask is None else df[mask]
+        if columns:
+            result = result[columns]
+        if limit is not None:
+            result = result.head(limit)
+        span["rows"] = len(result)
+    return result
+
+
+def parse_date(value):
+    if value is None:
+        return None
+    for date_format in DATE_FORMATS:
+        try:
+            return pd.Timestamp(datetime.strptime(value, date_format))
+        except ValueError:
+            continue
+    raise typer.BadParameter(f"Date invalide : {value} (AAAA-MM-JJ ou JJ/MM/AAAA)")
+
+
+def load_extract(file, resources_dir):
+    """Fixe le dossier des ressources (cache, paramètres) et charge l'extraction."""
+    set_resources_dir(resources_dir or SOURCE_RESOURCES_DIR)
+    if file is None:
+        file = find_latest_extract([get_resources_dir(), get_setting("extract_source_dir")])
+        if file is None:
+            raise typer.BadParameter("Aucune extraction trouvée : préciser --file.")
+    try:
+        # Messages de chargement sur stderr : stdout ne porte que le résultat
+        with redirect_stdout(sys.stderr):
+            return load_extract_file(file)
+    except FileNotFoundError as e:
+        raise typer.BadParameter(str(e))
+
+
+FILE_OPTION = typer.Option(None, "--file", help="Extraction à interroger (défaut : la plus récente)")
+RESOURCES_OPTION = typer.Option(None, "--resources-dir",
+                                help="Dossier Fichies_config (cache, paramètres)")
+
+
+@app.command()
+def query(
+    filters: List[str] = typer.Option([], "--filter", "-f", help="Filtre Colonne=texte (répétable)"),
+    due_from: Optional[str] = typer.Option(None, "--due-from", help="Fin d'OF à partir du (inclus)"),
+    due_to: Optional[str] = typer.Option(None, "--due-to", help="Fin d'OF jusqu'au (inclus)"),
+    columns: Optional[str] = typer.Option(None, "--columns", "-c", help="Colonnes affichées (séparées par des virgules)"),
+    output_format: OutputFormat = typer.Option(OutputFormat.csv, "--format", help="Format de sortie"),
+    separator: str = typer.Option(";", "--sep", help="Séparateur CSV"),
+    limit: Optional[int] = typer.Option(None, "--limit", help="Nombre maximal de lignes"),
+    file: Optional[Path] = FILE_OPTION,
+    resources_dir: Optional[Path] = RESOURCES_OPTION,
+):
+    """Lignes de l'extraction filtrées, en CSV ou JSON sur la sortie standard."""
+    df = load_extract(file, resources_dir)
+    selected = [resolve_column(df.columns, name) for name in columns.split(",")] if columns else None
+    result = query_extract(
+        df, parse_filters(df.columns, filters), parse_date(due_from), parse_date(due_to), selected, limit
+    )
+    if output_format == OutputFormat.json:
+        sys.stdout.write(result.to_json(orient="records", force_ascii=False, date_format="iso"))
+        sys.stdout.write("\n")
+    else:
+        result.to_csv(sys.stdout, sep=separator, index=False, date_format="%d/%m/%Y")
+
+
+@app.command()
+def values(
+    column: str = typer.Argument(..., help="Colonne"),
+    filters: List[str] = typer.Option([], "--filter", "-f", help="Filtre Colonne=texte (répétable)"),
+    file: Optional[Path] = FILE_OPTION,
+    resources_dir: Optional[Path] = RESOURCES_OPTION,
+):
+    """Valeurs distinctes d'une colonne et nombre de lignes (parmi les lignes filtrées)."""
+    df = load_extract(file, resources_dir)
+    name = resolve_column(df.columns, column)
+    result = query_extract(df, parse_filters(df.columns, filters))
+    engine = FilterEngine(result[[name]])
+    labels, counts = engine.catalogs[0].value_counts(None)
+    for label, count in zip(labels, counts):
+        sys.stdout.write(f"{label}\t{count}\n")
+
+
+@app.command("where-used")
+def where_used(
+    components: List[str] = typer.Argument(..., help="Références de composants (- : lues sur l'entrée standard)"),
+    prefix: bool = typer.Option(False, "--prefix", help="Références commençant par le texte saisi"),
+    output_format: OutputFormat = typer.Option(OutputFormat.csv, "--format", help="Format de sortie"),
+    separator: str = typer.Option(";", "--sep", help="Séparateur CSV"),
+    resources_dir: Optional[Path] = RESOURCES_OPTION,
+):
+    """Cas d'emploi hors ligne : nomenclatures capturées qui utilisent les composants."""
+    from package.bom_store import get_bom_store
+
+    set_resources_dir(resources_dir or SOURCE_RESOURCES_DIR)
+    if components == ["-"]:
+        components = [line.strip() for line in sys.stdin if line.strip()]
+    store = get_bom_store()
+    with perf_span("cli_where_used", components=len(components)) as span:
+        if prefix:
+            rows = [row[:3] for component in components for row in store.where_used(component, prefix=True)]
+        else:
+            rows = [(component, root, topology)
+                    for component, used in store.where_used_many(components).items()
+                    for root, topology in used]
+        span["rows"] = len(rows)
+    result = pd.DataFrame(rows, columns=["Composant", "Référence racine", "Topologie"])
+    if output_format == OutputFormat.json:
+        sys.stdout.write(result.to_json(orient="records", force_ascii=False))
+        sys.stdout.write("\n")
+    else:
+        result.to_csv(sys.stdout, sep=separator, index=False)
+
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host", help="Adresse d'écoute (0.0.0.0 : tous les postes)"),
+    port: int = typer.Option(8765, "--port", help="Port HTTP"),
+    watch: bool = typer.Option(False, "--watch", help="Recharge les nouvelles extractions du dossier"),
+    file: Optional[Path] = FILE_OPTION,
+    resources_dir: Optional[Path] = RESOURCES_OPTION,
+):
+    """Service HTTP/JSON partagé : l'extraction est chargée une fois pour tous les postes."""
+    from package.query_server import ExtractQueryService, serve as serve_http
+
+    df = load_extract(file, resources_dir)
+    service = ExtractQueryService(df)
+    print(f"Extraction servie : {Path(df.attrs['source_file']).name} ({len(df)} lignes)")
+    if watch:
+        from package.extract_watcher import ExtractFolderWatcher
+
+        def reload(path):
+            with redirect_stdout(sys.stderr):
+                service.set_extract(load_extract_file(path))
+            print(f"Extraction servie : {path.name}")
+
+        directory = Path(df.attrs['source_file']).parent if file else (
+            get_setting("watch_extract_dir") or get_setting("extract_source_dir"))
+        ExtractFolderWatcher(directory, on_new_file=reload,
+                             interval=get_setting("watch_interval_s")).start()
+    serve_http(service, host, port)
+
+
+if __name__ == "__main__":
+    app()
@@ -1,44 +1,182 @@
-from package.DataExtractOF import get_xlsx_of_the_day
+from package.extract_cache import load_cached_extract, save_extract_cache, cache_dir_for, cache_key
+from package.extract_diff import ExtractDiff, compute_diff, DIFF_FILE_NAME
+from package.history_store import get_history_store, extract_date
+from package.xlsx_stream_reader import read_xlsx_columns
+from package.xls_reader import read_xls_columns
+from package.perf import perf_span
+from package.settings import get_setting
+import datetime
 import pandas as pd
 from pathlib import Path
 import os
-from package.resourcesPath import AppContext
+from package.resourcesPath import get_resources_dir
 
-def load_excel_data():
-    """Récupère le nom du fichier du jour et charge la DataFrame."""
-    fichierExtractOF = get_xlsx_of_the_day()
-    ctx = AppContext.get()
-    resources_dir = Path(ctx.get_resource('Fichies_config/dummy.txt')).parent
+# Colonnes lues dans l'extraction, puis ordre d'affichage et renommage
+COLUMNS_TO_LOAD = [0, 1, 2, 3, 7, 9, 10, 11, 13]
+COLUMNS_ORDER = [0, 1, 2, 3, 7, 8, 5, 6, 4]
+NEW_COLUMN_NAMES = {
+    "Article": "Référence",
+    "Désignatio": "Designation",
+    "Numéroopér": "Opération",
+    "Designatio": "Désignation OP",
+    "Quantité": "Qté. prévu",
+    "Quantitéli": "Qté. livrée"
+}
+
+# Colonnes à faible cardinalité stockées en codes entiers + table de catégories
+CATEGORICAL_COLUMNS = ["Référence", "Designation", "Client", "Désignation OP"]
+
+
+def prepare_extract_columns(df):
+    """Réordonne et renomme les colonnes brutes de l'extraction."""
+    # Réarrangement des colonnes
+    df = df[[df.columns[i] for i in COLUMNS_ORDER]]
+    df = df.rename(columns=NEW_COLUMN_NAMES)
+
+    # Renommer la dernière colonne en 'DateFinOF'
+    df = df.rename(columns={df.columns[-1]: "DateFinOF"})
+    if get_setting("compact_columns"):
+        df = encode_categorical_columns(df)
+    return df
+
+
+def encode_categorical_columns(df, columns=CATEGORICAL_COLUMNS):
+    """
+    Encode les colonnes répétitives en 'category' (codes entiers + catégories).
+    Les valeurs sont converties en texte, comme à l'affichage, pour que les
+    catégories restent homogènes.
+    """
+    df = df.copy()
+    for name in columns:
+        if name in df.columns and not isinstance(df[name].dtype, pd.CategoricalDtype):
+            series = df[name]
+            nulls = series.isna()
+            text = series.astype(object).where(nulls, series.astype(str))
+            df[name] = text.astype("category")
+    return df
+
+
+def read_extract_file(file_path, on_preview=None):
+    """
+    Analyse le classeur d'extraction et retourne la DataFrame prête à l'affichage.
+    Un .xls est lu directement avec xlrd ; un .xlsx est lu en flux (colonnes
+    utiles uniquement) et on_preview reçoit le premier bloc de lignes dès
+    qu'il est décodé.
+    """
+    if Path(file_path).suffix.lower() == ".xls":
+        return prepare_extract_columns(read_xls_columns(file_path, COLUMNS_TO_LOAD))
+
+    preview_sent = False
+
+    def on_chunk(chunk):
+        nonlocal preview_sent
+        if on_preview and not preview_sent:
+            preview_sent = True
+            on_preview(prepare_extract_columns(chunk))
+
+    try:
+        df = read_xlsx_columns(file_path, COLUMNS_TO_LOAD, on_chunk=on_chunk)
+    except Exception as e:
+        print(f"Lecture en flux impossible ({e}), lecture avec pandas.")
+        df = pd.read_excel(file_path, usecols=COLUMNS_TO_LOAD)
+    return prepare_extract_columns(df)
+
+
+def load_excel_data(on_preview=None, on_progress=None):
+    """
+    Récupère le nom du fichier du jour et charge la DataFrame.
+    on_preview (optionnel) reçoit les premières lignes dès qu'elles sont lues,
+    on_progress (optionnel) reçoit des messages d'avancement.
+    """
+    if on_progress:
+        on_progress("Recherche de l'extraction du jour...")
+    # Import différé : la récupération de l'extraction du jour utilise Qt
+    from package.DataExtractOF import get_extract_of_the_day
+    with perf_span("extract_discovery") as span:
+        file_path = get_extract_of_the_day()
+        span["found"] = file_path is not None
+    resources_dir = get_resources_dir()
     # Si la fonction retourne None, on utilise le premier .xlsx trouvé dans le répertoire parent
-    if fichierExtractOF is None:
+    if file_path is None:
         potential_xlsx_files = list(resources_dir.glob("*.xlsx"))
         if not potential_xlsx_files:
             raise FileNotFoundError("Aucun fichier .xlsx trouvé dans le répertoire parent.")
         file_path = potential_xlsx_files[0]
-    else:
-        # Sinon, on construit le chemin comme d'habitude
-        file_path = resources_dir / fichierExtractOF
 
+    return load_extract_file(file_path, on_preview=on_preview, on_progress=on_progress)
+
+
+def load_extract_file(file_path, on_preview=None, on_progress=None):
+    """
+    Charge une extraction donnée (cache colonnes, sinon analyse du classeur).
+    Utilisé au démarrage et par la surveillance du dossier des extractions.
+    """
+    file_path = Path(file_path)
     if not file_path.exists():
         raise FileNotFoundError(f"Le fichier {file_path} est introuvable.")
 
-    columns_to_load = [0, 1, 2, 3, 7, 9, 10, 11, 13]
-    df = pd.read_excel(file_path, usecols=columns_to_load)
+    # Cache colonnes : évite de ré-analyser le classeur à chaque lancement
+    cache_root = get_resources_dir() / "cache"
+    with perf_span("cache_read", file=file_path.name) as span:
+        df = load_cached_extract(file_path, cache_root)
+        span["hit"] = df is not None
+    if df is None:
+        if on_progress:
+            on_progress(f"Lecture de {file_path.name}...")
+        with perf_span("excel_parse", file=file_path.name) as span:
+            df = read_extract_file(file_path, on_preview=on_preview)
+            span["rows"] = len(df)
+        try:
+            save_extract_cache(file_path, df, cache_root)
+        except Exception as e:
+            print(f"Echec de l'écriture du cache : {e}")
+
     df.attrs['source_file'] = str(file_path)  # Stocke le chemin complet du fichier
+    return df
 
-    # Réarrangement des colonnes
-    df = df[[df.columns[i] for i in [0, 1, 2, 3, 7, 8, 5, 6, 4]]]
-
-    new_column_names = {
-        "Article": "Référence",
-        "Désignatio": "Designation",
-        "Numéroopér": "Opération",
-        "Designatio": "Désignation OP",
-        "Quantité": "Qté. prévu",
-        "Quantitéli": "Qté. livrée"
-    }
-    df = df.rename(columns=new_column_names)
 
-    # Renommer la dernière colonne en 'DateFinOF'
-    df = df.rename(columns={df.columns[-1]: "DateFinOF"})
-    return df
+def load_extract_diff(df):
+    """
+    Comparaison de df avec l'extraction précédente de l'historique, ou None
+    s'il n'y en a pas. Pour l'extraction du jour, le résultat est mis en cache
+    dans le dossier cache de l'extraction (diff.npz).
+    """
+    history_date = df.attrs.get('history_date')
+    source = df.attrs.get('source_file', '')
+    day = datetime.date.fromisoformat(history_date) if history_date else extract_date(source)
+    if day is None:
+        return None
+
+    store = get_history_store()
+    previous_dates = [d for d in store.dates() if d < day]
+    if not previous_dates:
+        return None
+    previous_day = previous_dates[-1]
+    previous_label = previous_day.strftime('%d/%m/%Y')
+
+    diff_path = None
+    key = None
+    if not history_date and Path(source).exists():
+        cache_root = get_resources_dir() / "cache"
+        cache_dir = cache_dir_for(source, cache_root)
+        if cache_dir.exists():
+            diff_path = cache_dir / DIFF_FILE_NAME
+            key = {
+                "current": cache_key(source),
+                "previous": previous_day.isoformat(),
+                "previous_key": store.read_manifest(previous_day).get("key"),
+            }
+            diff = ExtractDiff.load(diff_path, key)
+            if diff is not None:
+                return diff
+
+    with perf_span("extract_diff", previous=previous_day.isoformat()) as span:
+        diff = compute_diff(store.load(previous_day), df, previous_label)
+        span.update(diff.summary())
+    if diff_path is not None:
+        try:
+            diff.save(diff_path, key)
+        except Exception as e:
+            print(f"Echec de l'écriture de la comparaison : {e}")
+    return diff
+
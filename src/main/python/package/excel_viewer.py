@@ -6,16 +6,25 @@ import re
 import pandas as pd
 
 from PySide6.QtWidgets import (
-    QMainWindow, QTableWidget, QTableWidgetItem, QVBoxLayout,
+    QMainWindow, QVBoxLayout,
     QWidget, QPushButton, QLineEdit, QHeaderView, QHBoxLayout, QMessageBox,
-    QFrame, QSizePolicy, QComboBox, QLabel, QDialog, QGridLayout, QApplication, QScrollArea
+    QFrame, QSizePolicy, QComboBox, QCheckBox, QLabel, QDialog, QGridLayout, QApplication, QScrollArea
     
 )
-from PySide6.QtCore import Qt, QTimer, Signal
-from PySide6.QtGui import QCursor, QKeyEvent, QWheelEvent
+from PySide6.QtCore import Qt, QTimer, Signal, QThreadPool, QItemSelectionModel
+from PySide6.QtGui import QCursor, QKeyEvent, QWheelEvent, QKeySequence, QShortcut
 
 from package.logic import BusinessLogic
-from package.resourcesPath import AppContext
+from package.action_executor import ActionExecutor
+from package.action_panel import ActionStatusPanel
+from package.table_model import DataFrameTableModel, LazyRowHeightTableView
+from package.workers import DataLoadWorker, ExtractIngestWorker, ExtractWatchSignals
+from package.extract_watcher import ExtractFolderWatcher
+from package.history_store import extract_date
+from package.settings import get_setting
+from package.perf import perf_span
+from package.value_popup import ValuePopup
+from package.resourcesPath import get_resources_dir
 
 
 
@@ -41,9 +50,7 @@ class CustomScrollArea(QScrollArea):
 
 
 def load_action_buttons_from_json(filename="action_buttons.json"):
-    ctx = AppContext.get()
-    resources_dir = ctx.get_resource('Fichies_config/dummy.txt')
-    json_path = Path(resources_dir).parent / filename
+    json_path = get_resources_dir() / filename
     with open(json_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
     return data.get("buttons", [])
@@ -72,8 +79,9 @@ class FilterContainer(QFrame):
 
 class FilterBox(QLineEdit):
     """
-    Champ de filtre avec un combo en double-clic (inchangé).
-    Permet d'afficher une liste de valeurs disponibles pour la colonne concernée.
+    Champ de filtre avec une liste de valeurs en double-clic.
+    Permet d'afficher les valeurs disponibles (et leur nombre de lignes)
+    pour la colonne concernée, parmi les lignes filtrées.
     """
     def __init__(self, column_name, main_window=None):
         super().__init__()
@@ -82,53 +90,28 @@ class FilterBox(QLineEdit):
         self.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
         self.column_name = column_name
         self.main_window = main_window
-        self.combo = QComboBox(self)
-        self.combo.setVisible(False)
-
-        self.combo.setStyleSheet("""
-        QComboBox {
-            background-color: #1e1e1e; color: white;
-            border: 1px solid #555; border-radius: 4px; padding: 5px;
-        }
-        QComboBox QAbstractItemView {
-            background-color: #1e1e1e; color: white; selection-background-color: #404040;
-        }
-        """)
-        self.combo.activated.connect(self.on_combo_activated)
+        self.popup = ValuePopup(self)
+        self.popup.valueSelected.connect(self.on_value_selected)
 
     def mouseDoubleClickEvent(self, event):
         """
-        Affiche une combo listant les valeurs uniques de la colonne filtrée.
+        Affiche la liste des valeurs distinctes de la colonne filtrée
+        (catalogue calculé au chargement, restreint au filtre courant).
         """
         self.clearFocus()
         if self.main_window:
             logic = self.main_window.logic
             if logic and not logic.filtered_df.empty:
-                unique_values = logic.filtered_df[self.column_name].dropna().astype(str).unique()
-                self.combo.clear()
-                self.combo.addItems(sorted(unique_values))
-                max_width = max(self.fontMetrics().boundingRect(val).width() for val in unique_values) + 30
-                self.combo.setFixedWidth(max(max_width, self.width()))
-                self.combo.move(0, self.height())
-                self.combo.setVisible(True)
-                self.combo.showPopup()
-
-    def on_combo_activated(self, index):
-        selected_value = self.combo.currentText()
+                labels, counts, longest_label, search_labels = logic.column_catalog(self.column_name)
+                self.popup.show_values(labels, counts, longest_label, self, self.width(),
+                                       search_labels)
+
+    def on_value_selected(self, selected_value):
         self.setText(selected_value)
-        self.combo.setVisible(False)
         if self.main_window:
             self.main_window.apply_filters_delayed()
         self.setCursorPosition(0)
 
-    def focusOutEvent(self, event):
-        super().focusOutEvent(event)
-        QTimer.singleShot(100, self.hide_combo)
-
-    def hide_combo(self):
-        if self.combo.isVisible() and not self.combo.view().isVisible():
-            self.combo.setVisible(False)
-
 
 class ActionSelectionDialog(QDialog):
     """
@@ -212,6 +195,10 @@ class ExcelViewerApp(QMainWindow):
 
         # -- Logique métier --
         self.logic = BusinessLogic()
+        # Actions SAP / IPR / Office exécutées en arrière-plan, par file
+        self.action_executor = ActionExecutor(
+            get_setting("action_concurrency"), get_setting("action_timeouts_s"), parent=self
+        )
 
         # -- Liste de boutons chargée depuis JSON --
         # (Adaptation du chemin si nécessaire)
@@ -235,6 +222,19 @@ class ExcelViewerApp(QMainWindow):
         self.init_ui()
         # Initialisation différée après l'affichage de la fenêtre
         self.loading_label = None
+        self.load_worker = None
+
+        # Surveillance du dossier des extractions (démarrée après le 1er chargement)
+        self.extract_watcher = None
+        self.watch_signals = ExtractWatchSignals()
+        self.watch_signals.new_file.connect(self.on_new_extract_file)
+        self.ingest_worker = None
+        self.pending_extract = None
+
+        # Overlay de performances, masqué : Ctrl+Maj+F12 pour l'afficher
+        self.perf_overlay = None
+        self.perf_shortcut = QShortcut(QKeySequence("Ctrl+Shift+F12"), self)
+        self.perf_shortcut.activated.connect(self.toggle_perf_overlay)
 
     def showEvent(self, event):
         """Déclenche le chargement des données après l'affichage initial"""
@@ -276,7 +276,7 @@ class ExcelViewerApp(QMainWindow):
         }
         QPushButton:hover { background-color: #0056b3; }
         QPushButton:pressed { background-color: #003d82; }
-        QTableWidget {
+        QTableView {
             border: 1px solid #ddd; gridline-color: #eee;
             background-color: white; alternate-background-color: #f9f9f9;
             color: #333; font-size: 13px;
@@ -339,9 +339,33 @@ class ExcelViewerApp(QMainWindow):
         self.reset_button.setFixedHeight(30)
         self.reset_button.clicked.connect(self.reset_filters)
 
+        # Groupe Historique : consultation d'une extraction précédente
+        history_group = QWidget()
+        history_layout = QVBoxLayout(history_group)
+        history_label = QLabel("EXTRACTION")
+        self.history_combo = QComboBox()
+        self.history_combo.setFixedHeight(30)
+        self.history_combo.addItem("Du jour", None)
+        self.history_combo.activated.connect(self.on_history_selected)
+        history_layout.addWidget(history_label)
+        history_layout.addWidget(self.history_combo)
+
+        # Groupe Comparaison avec l'extraction précédente
+        diff_group = QWidget()
+        diff_layout = QVBoxLayout(diff_group)
+        self.diff_label = QLabel("CHANGEMENTS")
+        self.only_changed_checkbox = QCheckBox("Lignes modifiées")
+        self.only_changed_checkbox.setFixedHeight(30)
+        self.only_changed_checkbox.setEnabled(False)
+        self.only_changed_checkbox.toggled.connect(self.on_only_changed_toggled)
+        diff_layout.addWidget(self.diff_label)
+        diff_layout.addWidget(self.only_changed_checkbox)
+
         # Disposition horizontale
         input_layout.addWidget(of_group, 50)
         input_layout.addWidget(ref_group, 50)
+        input_layout.addWidget(history_group, 30)
+        input_layout.addWidget(diff_group, 30)
         input_layout.addWidget(self.reset_button, 20)
 
         self.main_layout.addWidget(input_wrapper)
@@ -354,24 +378,49 @@ class ExcelViewerApp(QMainWindow):
         filter_wrapper_layout.addStretch()
         self.main_layout.addWidget(filter_wrapper)
 
-        # --- Tableau ---
-        self.table_widget = QTableWidget()
+        # --- Tableau (modèle virtuel : seules les lignes visibles sont rendues) ---
+        self.table_model = DataFrameTableModel(self)
+        self.table_widget = LazyRowHeightTableView()
+        self.table_widget.setModel(self.table_model)
         self.table_widget.setAlternatingRowColors(True)
         self.table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.Fixed)
         self.table_widget.verticalHeader().setDefaultSectionSize(self.row_height)
-        self.table_widget.cellDoubleClicked.connect(self.on_cell_double_clicked)
+        self.table_widget.doubleClicked.connect(self.on_cell_double_clicked)
         self.table_widget.verticalHeader().sectionDoubleClicked.connect(self.on_row_header_double_clicked)
         self.main_layout.addWidget(self.table_widget)
 
+        # --- État des actions en arrière-plan ---
+        self.action_panel = ActionStatusPanel(self.action_executor)
+        self.main_layout.addWidget(self.action_panel)
+
     # ----------------------------------------------------------------
     #  Chargement des données et mise à jour du tableau
     # ----------------------------------------------------------------
 
     def load_data_into_ui(self):
+        """Lance le chargement de l'extraction dans un thread de fond."""
+        self.set_filters_enabled(False)
+        self.load_worker = DataLoadWorker(self.logic)
+        self.load_worker.signals.progress.connect(self.on_load_progress)
+        self.load_worker.signals.preview.connect(self.on_preview_loaded)
+        self.load_worker.signals.finished.connect(self.on_data_loaded)
+        self.load_worker.signals.error.connect(self.on_load_error)
+        QThreadPool.globalInstance().start(self.load_worker)
+
+    def on_load_progress(self, message):
+        if self.loading_label:
+            self.loading_label.setText(message)
+
+    def on_preview_loaded(self, df):
+        """Affiche les premières lignes lues ; les filtres restent inactifs."""
+        self.update_table_structure(df)
+        self.table_model.set_dataframe(df)
+        self.set_filters_enabled(False)
+        self.hide_loading_message()
+        self.setWindowTitle("Excel Data Viewer (chargement en cours...)")
+
+    def on_data_loaded(self):
         try:
-            # Charger les données
-            self.logic.load_data()
-            
             # Afficher le message avec le fichier utilisé (nom seulement)
             fichier_source = Path(self.logic.current_df.attrs.get('source_file', 'inconnu')).name
             msg_box = QMessageBox(self)
@@ -384,16 +433,172 @@ class ExcelViewerApp(QMainWindow):
             self.update_table_structure()
             self.populate_table()
             self.adjust_window_size()
+            self.set_filters_enabled(True)
+            self.refresh_history_dates()
+            self.update_diff_summary()
+            self.start_extract_watcher()
         except Exception as e:
             QMessageBox.critical(self, "Erreur", f"Erreur lors de la lecture : {str(e)}")
         finally:
+            self.setWindowTitle(self.window_title())
             self.hide_loading_message()
+            self.load_worker = None
+
+    def on_load_error(self, message):
+        self.setWindowTitle("Excel Data Viewer")
+        self.hide_loading_message()
+        self.load_worker = None
+        QMessageBox.critical(self, "Erreur", f"Erreur lors de la lecture : {message}")
+
+    # ----------------------------------------------------------------
+    #  Surveillance du dossier des extractions
+    # ----------------------------------------------------------------
+
+    def start_extract_watcher(self):
+        """Surveille le dossier des extractions pour remplacer les données à chaud."""
+        if self.extract_watcher is not None or not get_setting("watch_extract"):
+            return
+        if self.logic.remote is not None:
+            # Le service partagé surveille lui-même les extractions
+            return
+        directory = get_setting("watch_extract_dir") or get_setting("extract_source_dir")
+        if not directory or not Path(directory).is_dir():
+            print(f"Surveillance des extractions désactivée : dossier {directory} inaccessible.")
+            return
+        self.extract_watcher = ExtractFolderWatcher(
+            directory,
+            on_new_file=lambda path: self.watch_signals.new_file.emit(str(path)),
+            interval=get_setting("watch_interval_s"),
+        )
+        self.extract_watcher.start()
+        print(f"Surveillance des extractions : {directory}")
+
+    def on_new_extract_file(self, file_path):
+        """Nouvelle extraction détectée : préparation en arrière-plan."""
+        current_day = extract_date(self.logic.live_df.attrs.get('source_file', ''))
+        new_day = extract_date(file_path)
+        if current_day and new_day and new_day < current_day:
+            print(f"Extraction ignorée (antérieure à celle affichée) : {Path(file_path).name}")
+            return
+        if self.load_worker is not None or self.ingest_worker is not None:
+            # Chargement en cours : seule la dernière extraction détectée est gardée
+            self.pending_extract = file_path
+            return
+        self.ingest_worker = ExtractIngestWorker(self.logic, file_path)
+        self.ingest_worker.signals.finished.connect(self.on_extract_ingested)
+        self.ingest_worker.signals.error.connect(self.on_extract_ingest_error)
+        QThreadPool.globalInstance().start(self.ingest_worker)
+
+    def on_extract_ingested(self):
+        """Installe l'extraction préparée en conservant filtres et sélection."""
+        worker, self.ingest_worker = self.ingest_worker, None
+        try:
+            df, diff, filter_engine = worker.result
+            old_columns = list(self.logic.current_df.columns)
+            filter_texts = [box.text() for box in self.filter_boxes]
+            selection = self.selected_cell_keys()
+            only_changed = self.only_changed_checkbox.isChecked()
+
+            if not self.logic.swap_extract(df, diff, filter_engine, filter_texts):
+                # Consultation de l'historique : l'extraction du jour est
+                # remplacée, l'affichage ne change pas
+                self.refresh_history_dates()
+                return
+            if list(df.columns) != old_columns:
+                self.update_table_structure()
+                self.logic.reset_filters()
+            self.populate_table()
+            self.update_diff_summary()
+            if only_changed and diff is not None:
+                self.only_changed_checkbox.setChecked(True)
+            self.refresh_history_dates()
+            self.restore_selected_cells(selection)
+            print(f"Extraction remplacée : {Path(df.attrs.get('source_file', '')).name}")
+        except Exception as e:
+            QMessageBox.warning(self, "Erreur", f"Erreur lors du remplacement de l'extraction : {e}")
+        finally:
+            self.run_pending_extract()
+
+    def on_extract_ingest_error(self, message):
+        self.ingest_worker = None
+        print(f"Echec du chargement de la nouvelle extraction : {message}")
+        self.run_pending_extract()
+
+    def run_pending_extract(self):
+        if self.pending_extract is not None:
+            file_path, self.pending_extract = self.pending_extract, None
+            self.on_new_extract_file(file_path)
 
-    def update_table_structure(self):
-        df = self.logic.current_df
-        self.table_widget.setRowCount(len(df))
-        self.table_widget.setColumnCount(len(df.columns))
-        self.table_widget.setHorizontalHeaderLabels(df.columns)
+    def selected_cell_keys(self):
+        """Cellules sélectionnées, repérées par (OF, Opération) et colonne."""
+        df = self.logic.filtered_df
+        if not all(col in df.columns for col in ["OF", "Opération"]):
+            return []
+        keys = []
+        for index in self.table_widget.selectionModel().selectedIndexes():
+            row = df.iloc[index.row()]
+            keys.append(((str(row["OF"]), str(row["Opération"])), df.columns[index.column()]))
+        return keys
+
+    def restore_selected_cells(self, keys):
+        """Resélectionne les cellules (OF, Opération, colonne) encore affichées."""
+        if not keys:
+            return
+        df = self.logic.filtered_df
+        positions = {}
+        for row, key in enumerate(zip(df["OF"].astype(str), df["Opération"].astype(str))):
+            positions.setdefault(key, row)
+        selection_model = self.table_widget.selectionModel()
+        selection_model.clearSelection()
+        for key, column_name in keys:
+            row = positions.get(key)
+            if row is None or column_name not in df.columns:
+                continue
+            index = self.table_model.index(row, df.columns.get_loc(column_name))
+            selection_model.select(index, QItemSelectionModel.SelectionFlag.Select)
+
+    def closeEvent(self, event):
+        if self.extract_watcher is not None:
+            self.extract_watcher.stop()
+        # Transactions / recherches encore en file ou en cours : arrêtées
+        self.action_executor.cancel_all()
+        super().closeEvent(event)
+
+    def refresh_history_dates(self):
+        """Liste des extractions précédentes disponibles dans l'historique."""
+        self.history_combo.clear()
+        self.history_combo.addItem("Du jour", None)
+        try:
+            for day in reversed(self.logic.history_dates()):
+                self.history_combo.addItem(f"Au {day.strftime('%d/%m/%Y')}", day)
+        except Exception as e:
+            print(f"Historique indisponible : {e}")
+
+    def on_history_selected(self, index):
+        day = self.history_combo.itemData(index)
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            self.logic.load_history(day)
+            self.update_table_structure()
+            self.populate_table()
+            self.update_diff_summary()
+            title = "Excel Data Viewer"
+            if day is not None:
+                title += f" (extraction au {day.strftime('%d/%m/%Y')})"
+            self.setWindowTitle(title)
+        except Exception as e:
+            QMessageBox.warning(self, "Erreur", f"Erreur de chargement de l'historique : {e}")
+        finally:
+            QApplication.restoreOverrideCursor()
+
+    def set_filters_enabled(self, enabled):
+        for filter_box in self.filter_boxes:
+            filter_box.setEnabled(enabled)
+
+    def update_table_structure(self, df=None):
+        if df is None:
+            df = self.logic.current_df
+        self.table_model.set_dataframe(df)
 
         # Largeurs de colonnes
         column_widths = {
@@ -407,16 +612,16 @@ class ExcelViewerApp(QMainWindow):
             "Qté. livrée": 80,
             "DateFinOF": 110
         }
-        for col_idx in range(self.table_widget.columnCount()):
+        for col_idx in range(self.table_model.columnCount()):
             col_name = df.columns[col_idx]
             if col_name in column_widths:
                 self.table_widget.setColumnWidth(col_idx, column_widths[col_name])
 
-        self.add_filter_boxes()
+        self.add_filter_boxes(df.columns)
 
         # Calcul de la largeur totale du tableau
         table_width = self.table_widget.verticalHeader().width()
-        for col in range(self.table_widget.columnCount()):
+        for col in range(self.table_model.columnCount()):
             table_width += self.table_widget.columnWidth(col)
         total_width = table_width + 40  # marges
         self.resize(total_width, 600)
@@ -424,39 +629,72 @@ class ExcelViewerApp(QMainWindow):
         self.vertical_header_width = self.table_widget.verticalHeader().width()
         self.table_widget.verticalHeader().setFixedWidth(self.vertical_header_width)
         self.adjust_filter_position()
-        self.adjust_filter_boxes_width()
+        self.adjust_filter_boxes_width(df.columns)
 
-    def add_filter_boxes(self):
+    def add_filter_boxes(self, columns):
         for box in self.filter_boxes:
             box.deleteLater()
         self.filter_boxes.clear()
         self.filter_container.layout().takeAt(0)
 
-        for col_name in self.logic.current_df.columns:
+        for col_name in columns:
             filter_box = FilterBox(col_name, main_window=self)
             filter_box.textChanged.connect(self.start_filtering_timer)
             self.filter_container.layout().addWidget(filter_box)
             self.filter_boxes.append(filter_box)
 
     def populate_table(self):
-        df = self.logic.filtered_df
-        self.table_widget.setRowCount(len(df))
-
-        for row_index, (_, row_data) in enumerate(df.iterrows()):
-            for col_index, cell_data in enumerate(row_data):
-                item = QTableWidgetItem(str(cell_data))
-                item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Rendre non éditable
-
-                column_name = df.columns[col_index]
-                if column_name == "DateFinOF":
-                    item.setTextAlignment(Qt.AlignCenter)
-                else:
-                    item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                    item.setData(Qt.TextWrapAnywhere, True)
+        # Simple reset du modèle : les hauteurs de lignes sont mesurées
+        # à la volée par la vue, uniquement pour les lignes visibles
+        with perf_span("table_render", rows=len(self.logic.filtered_df)):
+            row_status, changed = self.logic.filtered_diff()
+            diff_label = self.logic.diff.previous_label if self.logic.diff else ""
+            self.table_model.set_dataframe(self.logic.filtered_df, row_status, changed, diff_label)
+        if self.logic.remote is not None:
+            self.setWindowTitle(self.window_title())
+
+    def window_title(self):
+        """Titre de la fenêtre ; en mode service, nombre de lignes affichées / retenues."""
+        if self.logic.remote is None:
+            return "Excel Data Viewer"
+        shown = len(self.logic.filtered_df)
+        if shown < self.logic.remote_total:
+            return (f"Excel Data Viewer ({self.logic.remote.base_url} : "
+                    f"{shown} premières lignes sur {self.logic.remote_total})")
+        return f"Excel Data Viewer ({self.logic.remote.base_url})"
+
+    def update_diff_summary(self):
+        """Résumé des changements et activation du filtre « lignes modifiées »."""
+        diff = self.logic.diff
+        self.only_changed_checkbox.blockSignals(True)
+        self.only_changed_checkbox.setChecked(False)
+        self.only_changed_checkbox.blockSignals(False)
+        # Case décochée sans signal : la logique est alignée explicitement
+        self.logic.set_only_changed(False)
+        self.only_changed_checkbox.setEnabled(diff is not None)
+        if diff is None:
+            self.diff_label.setText("CHANGEMENTS")
+            self.diff_label.setToolTip("Aucune extraction précédente dans l'historique")
+            return
+        summary = diff.summary()
+        self.diff_label.setText(
+            f"+{summary['added']}  ~{summary['modified']}  -{summary['removed']}"
+        )
+        self.diff_label.setToolTip(
+            f"Depuis l'extraction du {diff.previous_label} :\n"
+            f"{summary['added']} lignes nouvelles, {summary['modified']} modifiées, "
+            f"{summary['removed']} disparues"
+        )
 
-                self.table_widget.setItem(row_index, col_index, item)
+    def on_only_changed_toggled(self, checked):
+        self.logic.set_only_changed(checked)
+        self.apply_filters_delayed()
 
-        self.table_widget.resizeRowsToContents()
+    def toggle_perf_overlay(self):
+        if self.perf_overlay is None:
+            from package.perf_overlay import PerfOverlay
+            self.perf_overlay = PerfOverlay(self)
+        self.perf_overlay.toggle()
 
     # ----------------------------------------------------------------
     #  Filtres
@@ -480,6 +718,9 @@ class ExcelViewerApp(QMainWindow):
             filter_box.blockSignals(False)
         self.of_input.clear()
         self.reference_input.clear()
+        self.only_changed_checkbox.blockSignals(True)
+        self.only_changed_checkbox.setChecked(False)
+        self.only_changed_checkbox.blockSignals(False)
 
         self.logic.reset_filters()
         self.populate_table()
@@ -502,12 +743,13 @@ class ExcelViewerApp(QMainWindow):
         except Exception as e:
             QMessageBox.warning(self, "Erreur", f"Erreur lors de la copie : {str(e)}")
 
-    def on_cell_double_clicked(self, row, column):
+    def on_cell_double_clicked(self, index):
         """
         Double-clic sur une cellule => applique le texte au filtre correspondant.
         """
         try:
-            cell_value = self.table_widget.item(row, column).text()
+            column = index.column()
+            cell_value = self.table_model.cell_text(index.row(), column)
             if column < len(self.filter_boxes):
                 filter_box = self.filter_boxes[column]
                 filter_box.setText(cell_value)
@@ -540,7 +782,7 @@ class ExcelViewerApp(QMainWindow):
         # Calcul position horizontale
         total_columns_width = sum(
             self.table_widget.columnWidth(i) 
-            for i in range(self.table_widget.columnCount())
+            for i in range(self.table_model.columnCount())
         )
         x_in_table = self.vertical_header_width + total_columns_width
         
@@ -597,9 +839,10 @@ class ExcelViewerApp(QMainWindow):
             QMessageBox.critical(self, "Erreur", "La valeur ne doit pas excéder 40 caractères.")
             return
         
-        # On délègue la logique métier
+        # On délègue la logique métier (SAP / IPR : file d'actions, résultat
+        # et erreurs dans le panneau d'état)
         try:
-            self.logic.execute_action(action_name, input_value)
+            self.logic.execute_action(action_name, input_value, self.action_executor)
         except Exception as e:
             QMessageBox.critical(self, "Erreur", str(e))
 
@@ -607,7 +850,7 @@ class ExcelViewerApp(QMainWindow):
     #  Ajustements layout
     # ----------------------------------------------------------------
 
-    def adjust_filter_boxes_width(self):
+    def adjust_filter_boxes_width(self, columns):
         column_widths = {
             "OF": 70,
             "Référence": 130,
@@ -620,7 +863,7 @@ class ExcelViewerApp(QMainWindow):
             "DateFinOF": 110
         }
         for i, filter_box in enumerate(self.filter_boxes):
-            col_name = self.logic.current_df.columns[i]
+            col_name = columns[i]
             if col_name in column_widths:
                 filter_box.setFixedWidth(column_widths[col_name])
 
@@ -631,6 +874,7 @@ class ExcelViewerApp(QMainWindow):
         total_height = (self.row_height * self.num_rows_display)
         total_height += self.table_widget.horizontalHeader().height()
         total_height += 200  # marge pour la zone filtres, etc.
+        total_height += self.action_panel.height()
         self.setFixedHeight(total_height)
 
 
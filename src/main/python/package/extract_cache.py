@@ -0,0 +1,186 @@
+# services/extract_cache.py
+"""
+Cache disque en colonnes de l'extraction OF du jour.
+
+Chaque extraction analysée est écrite une fois sous forme d'un dossier
+"<nom du fichier>.cache" contenant un tableau NumPy (.npy) par colonne et un
+manifest.json. Le cache est identifié par le nom, la taille et la date de
+modification du fichier source : tant que ceux-ci ne changent pas, les
+lancements suivants relisent les colonnes par memory-mapping au lieu de
+ré-analyser le XML du classeur.
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CACHE_VERSION = 2
+MANIFEST_NAME = "manifest.json"
+
+
+def cache_key(file_path):
+    """Clé d'invalidation du cache : nom, taille et mtime du fichier source."""
+    stat = Path(file_path).stat()
+    return {
+        "name": Path(file_path).name,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "version": CACHE_VERSION,
+    }
+
+
+def cache_dir_for(file_path, cache_root):
+    return Path(cache_root) / f"{Path(file_path).name}.cache"
+
+
+def load_cached_extract(file_path, cache_root):
+    """
+    Retourne le DataFrame mis en cache pour file_path, ou None si le cache
+    est absent, obsolète ou illisible.
+    """
+    cache_dir = cache_dir_for(file_path, cache_root)
+    manifest_path = cache_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("key") != cache_key(file_path):
+            return None
+
+        data = {}
+        for column in manifest["columns"]:
+            data[column["name"]] = _read_column(cache_dir, column)
+        return pd.DataFrame(data, columns=[c["name"] for c in manifest["columns"]])
+    except Exception as e:
+        print(f"Cache illisible pour {Path(file_path).name} : {e}")
+        return None
+
+
+def save_extract_cache(file_path, df, cache_root):
+    """
+    Écrit le cache colonnes de df pour file_path (écriture atomique via un
+    dossier temporaire), puis supprime les caches dont la source n'existe plus.
+    """
+    cache_root = Path(cache_root)
+    cache_root.mkdir(parents=True, exist_ok=True)
+    cache_dir = cache_dir_for(file_path, cache_root)
+    tmp_dir = cache_dir.with_name(cache_dir.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir()
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        columns.append(_write_column(tmp_dir, i, name, df.iloc[:, i]))
+
+    manifest = {
+        "key": cache_key(file_path),
+        "source": str(Path(file_path).resolve()),
+        "rows": len(df),
+        "columns": columns,
+    }
+    with open(tmp_dir / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    if cache_dir.exists():
+        shutil.rmtree(cache_dir)
+    os.replace(tmp_dir, cache_dir)
+    prune_stale_caches(cache_root)
+
+
+def prune_stale_caches(cache_root):
+    """Supprime les caches dont le fichier source a disparu."""
+    for manifest_path in Path(cache_root).glob(f"*.cache/{MANIFEST_NAME}"):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                source = json.load(f).get("source")
+            if source and not Path(source).exists():
+                shutil.rmtree(manifest_path.parent)
+                print(f"Cache supprimé : {manifest_path.parent.name}")
+        except Exception as e:
+            print(f"Echec du nettoyage du cache {manifest_path.parent.name} : {e}")
+
+
+# ----------------------------------------------------------------
+#  Encodage des colonnes (partagé avec l'historique, history_store.py)
+# ----------------------------------------------------------------
+
+def encode_column(series):
+    """
+    Décompose une colonne en tableaux NumPy sérialisables.
+    Retourne (description, {rôle: tableau}) ; le rôle "values" est toujours
+    présent, "mask" et "categories" selon le type de colonne.
+    """
+    column = {}
+    dtype = series.dtype
+
+    if isinstance(dtype, pd.CategoricalDtype) and all(isinstance(v, str) for v in dtype.categories):
+        # Colonne encodée : codes entiers + table des catégories
+        column["kind"] = "category"
+        return column, {
+            "values": series.cat.codes.to_numpy(),
+            "categories": dtype.categories.to_numpy(dtype=object).astype(str),
+        }
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        values = series.to_numpy()
+        column["kind"] = "datetime"
+        column["dtype"] = str(values.dtype)
+        return column, {"values": values.view("i8")}
+    if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        column["kind"] = "numeric"
+        return column, {"values": series.to_numpy()}
+
+    values = series.to_numpy(dtype=object)
+    nulls = pd.isna(values)
+    if all(isinstance(v, str) for v in values[~nulls]):
+        # Chaînes : tableau unicode de largeur fixe, compatible memory-map
+        column["kind"] = "string"
+        return column, {"values": np.where(nulls, "", values).astype(str), "mask": nulls}
+    # Colonne hétérogène : sérialisation objet (non memory-mappable)
+    column["kind"] = "object"
+    return column, {"values": values}
+
+
+def decode_column(column, load_array):
+    """
+    Reconstruit une colonne à partir de sa description ; load_array(rôle)
+    retourne le tableau correspondant.
+    """
+    kind = column["kind"]
+    if kind == "category":
+        categories = np.asarray(load_array("categories")).astype(object)
+        return pd.Categorical.from_codes(np.asarray(load_array("values")), categories=categories)
+    if kind == "datetime":
+        return load_array("values").view(column["dtype"])
+    if kind == "numeric":
+        return load_array("values")
+    if kind == "string":
+        values = load_array("values").astype(object)
+        values[load_array("mask")] = np.nan
+        return values
+    return load_array("values")
+
+
+def _write_column(cache_dir, position, name, series):
+    """Écrit une colonne et retourne sa description pour le manifest."""
+    column, arrays = encode_column(series)
+    column["name"] = name
+    for role, values in arrays.items():
+        key = "file" if role == "values" else role
+        column[key] = f"{position}.npy" if role == "values" else f"{position}.{role}.npy"
+        np.save(cache_dir / column[key], values, allow_pickle=column["kind"] == "object")
+    return column
+
+
+def _read_column(cache_dir, column):
+    def load_array(role):
+        path = cache_dir / column["file" if role == "values" else role]
+        if column["kind"] == "object":
+            return np.load(path, allow_pickle=True)
+        return np.load(path, mmap_mode="r")
+    return decode_column(column, load_array)
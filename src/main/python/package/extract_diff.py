@@ -0,0 +1,157 @@
+# business/extract_diff.py
+"""
+Comparaison de l'extraction du jour avec la précédente.
+
+Les lignes sont appariées sur (OF, Opération) ; une clé présente plusieurs
+fois est appariée dans l'ordre d'apparition. Chaque ligne du jour est
+classée nouvelle, modifiée ou inchangée, avec le détail des colonnes
+modifiées ; les clés disparues sont listées à part.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DIFF_KEY_COLUMNS = ["OF", "Opération"]
+DIFF_VERSION = 1
+DIFF_FILE_NAME = "diff.npz"
+
+UNCHANGED = 0
+ADDED = 1
+MODIFIED = 2
+
+
+class ExtractDiff:
+    def __init__(self, columns, row_status, changed, removed_keys, previous_label=""):
+        """
+        :param columns: colonnes de l'extraction du jour
+        :param row_status: UNCHANGED / ADDED / MODIFIED pour chaque ligne du jour
+        :param changed: matrice booléenne (lignes x colonnes) des cellules modifiées
+        :param removed_keys: DataFrame des clés (OF, Opération) disparues
+        :param previous_label: extraction de référence (ex. date)
+        """
+        self.columns = list(columns)
+        self.row_status = row_status
+        self.changed = changed
+        self.removed_keys = removed_keys
+        self.previous_label = previous_label
+
+    @property
+    def changed_rows(self):
+        """Masque des lignes nouvelles ou modifiées."""
+        return self.row_status != UNCHANGED
+
+    def summary(self):
+        return {
+            "added": int((self.row_status == ADDED).sum()),
+            "modified": int((self.row_status == MODIFIED).sum()),
+            "removed": len(self.removed_keys),
+        }
+
+    def subset(self, rows):
+        """(statuts, cellules modifiées) des lignes rows (positions ou masque)."""
+        return self.row_status[rows], self.changed[rows]
+
+    # ----------------------------------------------------------------
+    #  Cache
+    # ----------------------------------------------------------------
+
+    def save(self, path, key):
+        """Enregistre le résultat ; key identifie les deux extractions comparées."""
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp.npz")
+        meta = {
+            "version": DIFF_VERSION,
+            "key": key,
+            "columns": self.columns,
+            "previous_label": self.previous_label,
+        }
+        np.savez_compressed(
+            tmp_path,
+            meta=np.array(json.dumps(meta, ensure_ascii=False)),
+            row_status=self.row_status,
+            changed=self.changed,
+            **{f"removed_{i}": self.removed_keys.iloc[:, i].astype(str).to_numpy(dtype=str)
+               for i in range(len(DIFF_KEY_COLUMNS))},
+        )
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path, key):
+        """Résultat enregistré pour key, ou None s'il est absent ou obsolète."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as npz:
+                meta = json.loads(str(npz["meta"]))
+                if meta.get("version") != DIFF_VERSION or meta.get("key") != key:
+                    return None
+                removed = pd.DataFrame({
+                    name: npz[f"removed_{i}"] for i, name in enumerate(DIFF_KEY_COLUMNS)
+                })
+                return cls(meta["columns"], npz["row_status"], npz["changed"], removed,
+                           meta.get("previous_label", ""))
+        except Exception as e:
+            print(f"Comparaison en cache illisible : {e}")
+            return None
+
+
+def _keyed_positions(df):
+    """Clés (OF, Opération) en texte + rang d'apparition de la clé, et position de la ligne."""
+    keys = pd.DataFrame({name: df[name].astype(str).to_numpy() for name in DIFF_KEY_COLUMNS})
+    keys["_occurrence"] = keys.groupby(DIFF_KEY_COLUMNS, sort=False).cumcount().to_numpy()
+    keys["_position"] = np.arange(len(df))
+    return keys
+
+
+def _same_values(current, previous):
+    """
+    Égalité élément par élément, deux cellules vides étant égales.
+    Nombres et dates sont comparés en valeur (5 == 5.0), le reste en texte.
+    """
+    current_na = pd.isna(current).to_numpy()
+    previous_na = pd.isna(previous).to_numpy()
+    if pd.api.types.is_numeric_dtype(current.dtype) and pd.api.types.is_numeric_dtype(previous.dtype):
+        same = current.to_numpy() == previous.to_numpy()
+    elif pd.api.types.is_datetime64_any_dtype(current.dtype) and pd.api.types.is_datetime64_any_dtype(previous.dtype):
+        same = current.to_numpy() == previous.to_numpy()
+    else:
+        same = (current.astype(str).to_numpy(dtype=object) == previous.astype(str).to_numpy(dtype=object))
+    return np.where(current_na | previous_na, current_na & previous_na, same)
+
+
+def compute_diff(previous_df, current_df, previous_label=""):
+    """Compare current_df à previous_df (colonnes communes hors clé)."""
+    current_keys = _keyed_positions(current_df)
+    previous_keys = _keyed_positions(previous_df)
+    join_columns = DIFF_KEY_COLUMNS + ["_occurrence"]
+
+    # Jointure gauche : l'ordre des lignes du jour est conservé
+    merged = current_keys.merge(
+        previous_keys, on=join_columns, how="left", suffixes=("", "_previous")
+    )
+    previous_positions = merged["_position_previous"].to_numpy()
+    matched = ~np.isnan(previous_positions)
+    current_rows = np.flatnonzero(matched)
+    previous_rows = previous_positions[matched].astype(np.int64)
+
+    columns = list(current_df.columns)
+    changed = np.zeros((len(current_df), len(columns)), dtype=bool)
+    for i, name in enumerate(columns):
+        if name in DIFF_KEY_COLUMNS or name not in previous_df.columns:
+            continue
+        current_values = current_df[name].iloc[current_rows].reset_index(drop=True)
+        previous_values = previous_df[name].iloc[previous_rows].reset_index(drop=True)
+        changed[current_rows, i] = ~_same_values(current_values, previous_values)
+
+    row_status = np.full(len(current_df), UNCHANGED, dtype=np.int8)
+    row_status[changed.any(axis=1)] = MODIFIED
+    row_status[~matched] = ADDED
+
+    removed = np.ones(len(previous_df), dtype=bool)
+    removed[previous_rows] = False
+    removed_keys = previous_keys.loc[removed, DIFF_KEY_COLUMNS].reset_index(drop=True)
+    return ExtractDiff(columns, row_status, changed, removed_keys, previous_label)
@@ -0,0 +1,127 @@
+# services/extract_watcher.py
+"""
+Surveillance par scrutation du dossier où SAP dépose les extractions.
+
+Le dossier est relu à intervalle régulier (un simple listage : fonctionne
+aussi sur les partages réseau, où les notifications système ne sont pas
+fiables). Un fichier nouveau ou modifié n'est signalé qu'une fois sa taille
+et sa date stables entre deux passages, pour ne pas lire un fichier en cours
+d'écriture.
+
+Utilisable sur un dossier local, par exemple :
+    python -m package.extract_watcher C:/temp/extractions 5
+"""
+
+import datetime
+import sys
+import threading
+from pathlib import Path
+
+from package.history_store import extract_date
+
+EXTRACT_FILE_PATTERN = "extraction_OF_du_*.xls*"
+DEFAULT_POLL_INTERVAL = 60.0
+
+
+class ExtractFolderWatcher:
+    def __init__(self, directory, on_new_file=None, interval=DEFAULT_POLL_INTERVAL,
+                 pattern=EXTRACT_FILE_PATTERN):
+        """
+        :param directory: dossier surveillé
+        :param on_new_file: appelé (depuis le thread de surveillance) avec le Path
+            de chaque extraction nouvelle ou modifiée, une fois stable
+        :param interval: délai entre deux passages (s)
+        """
+        self.directory = Path(directory)
+        self.on_new_file = on_new_file
+        self.interval = interval
+        self.pattern = pattern
+        # nom -> (taille, mtime_ns) déjà signalé (ou présent au démarrage)
+        self._known = {}
+        # nom -> (taille, mtime_ns) vu au passage précédent, pas encore stable
+        self._pending = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def snapshot(self):
+        """{nom: (taille, mtime_ns)} des extractions présentes dans le dossier."""
+        files = {}
+        for path in self.directory.glob(self.pattern):
+            # Fichiers de verrouillage Excel (~$...)
+            if path.name.startswith("~$"):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files[path.name] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def prime(self):
+        """Considère les fichiers déjà présents comme connus (pas de signalement)."""
+        try:
+            self._known = self.snapshot()
+        except OSError as e:
+            print(f"Dossier des extractions inaccessible ({self.directory}) : {e}")
+            self._known = {}
+        self._pending = {}
+
+    def poll_once(self):
+        """
+        Un passage de surveillance ; retourne les extractions devenues
+        disponibles, de la plus ancienne à la plus récente.
+        """
+        try:
+            current = self.snapshot()
+        except OSError as e:
+            print(f"Dossier des extractions inaccessible ({self.directory}) : {e}")
+            return []
+
+        ready = []
+        pending = {}
+        for name, signature in current.items():
+            if self._known.get(name) == signature:
+                continue
+            if self._pending.get(name) == signature:
+                # Inchangé depuis le passage précédent : écriture terminée
+                self._known[name] = signature
+                ready.append(self.directory / name)
+            else:
+                pending[name] = signature
+        self._pending = pending
+        return sorted(ready, key=lambda p: (extract_date(p) or datetime.date.min, p.name))
+
+    def start(self):
+        """Lance la surveillance dans un thread de fond (après prime())."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.prime()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            for path in self.poll_once():
+                if self.on_new_file:
+                    try:
+                        self.on_new_file(path)
+                    except Exception as e:
+                        print(f"Erreur lors du traitement de {path.name} : {e}")
+
+
+if __name__ == "__main__":
+    watched_dir = sys.argv[1] if len(sys.argv) > 1 else "."
+    poll_interval = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    watcher = ExtractFolderWatcher(
+        watched_dir, on_new_file=lambda p: print(f"Nouvelle extraction : {p}"), interval=poll_interval
+    )
+    watcher.start()
+    print(f"Surveillance de {watched_dir} (Ctrl+C pour arrêter)")
+    try:
+        watcher._thread.join()
+    except KeyboardInterrupt:
+        watcher.stop()
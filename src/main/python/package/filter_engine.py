@@ -0,0 +1,146 @@
+# business/filter_engine.py
+
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from package.ngram_index import NgramIndex
+from package.value_catalog import ValueCatalog
+
+
+def normalize_text(text):
+    """Texte de recherche : minuscules et sans accents ("Dégrappage" -> "degrappage")."""
+    text = unicodedata.normalize('NFKD', str(text).lower())
+    return ''.join(c for c in text if not unicodedata.combining(c))
+
+
+def find_column(columns, name):
+    """Colonne désignée par name (casse et accents ignorés), ou None."""
+    wanted = normalize_text(name.strip())
+    for column in columns:
+        if normalize_text(column) == wanted:
+            return column
+    return None
+
+
+class FilterEngine:
+    """
+    Moteur de filtrage des colonnes de l'extraction.
+
+    Les colonnes sont converties une seule fois (au chargement) en tableaux de
+    chaînes normalisées ; chaque frappe dans un filtre se résume ensuite à une
+    recherche de sous-chaîne sur ces tableaux, sans conversion ni regex.
+
+    Un masque est conservé par colonne : quand le nouveau texte prolonge le
+    précédent, seules les lignes qui correspondaient encore sont réévaluées.
+
+    Les colonnes catégorielles (voir encode_categorical_columns) ne sont pas
+    recopiées par ligne : le filtre porte sur leurs catégories, puis les
+    lignes sont retenues par code.
+
+    Un index de trigrammes par colonne (optionnel, construit par build_indexes)
+    permet de répondre aux motifs de 3 caractères ou plus sans balayage.
+
+    Les mêmes codes alimentent un catalogue des valeurs distinctes par colonne
+    (ValueCatalog) pour les listes déroulantes des filtres.
+    """
+    def __init__(self, df):
+        self.columns = list(df.columns)
+        self.row_count = len(df)
+        self.search_columns = []
+        self.codes = []
+        self.distinct_values = []
+        self.catalogs = []
+        for i in range(len(df.columns)):
+            self._build_search_column(df.iloc[:, i])
+        # colonne -> (texte normalisé, masque des lignes correspondantes)
+        self._column_masks = {}
+        # colonne -> NgramIndex, rempli en arrière-plan par build_indexes
+        self._indexes = {}
+
+    def _build_search_column(self, series):
+        # Normalisation faite sur les valeurs distinctes uniquement, puis
+        # redistribuée sur les lignes. Les cellules vides (NaN) pointent vers
+        # la dernière valeur "" et ne correspondent donc à aucun filtre.
+        categorical = isinstance(series.dtype, pd.CategoricalDtype)
+        if categorical:
+            # Colonne déjà encodée : codes et catégories réutilisés tels quels.
+            # Aucune colonne de recherche par ligne : le filtre est évalué sur
+            # les catégories puis appliqué aux lignes par leur code.
+            codes = series.cat.codes.to_numpy().astype(np.int32)
+            uniques = [str(v) for v in series.cat.categories]
+        else:
+            codes, uniques = pd.factorize(series.astype(str))
+            codes[series.isna().to_numpy()] = -1
+        normalized = np.array([normalize_text(v) for v in uniques] + [""], dtype=str)
+        missing_code = len(normalized) - 1
+        codes = np.where(codes < 0, missing_code, codes)
+        self.codes.append(codes)
+        self.distinct_values.append(normalized)
+        self.search_columns.append(None if categorical else normalized[codes])
+        self.catalogs.append(ValueCatalog(list(uniques) + [""], codes, missing_code, normalized))
+
+    def build_indexes(self):
+        """Construit l'index de trigrammes de chaque colonne (appelé hors du thread GUI)."""
+        for i, values in enumerate(self.distinct_values):
+            self._indexes[i] = NgramIndex(values)
+
+    def _match_with_index(self, column_index, needle):
+        """Masque via l'index de trigrammes, ou None s'il n'est pas utilisable."""
+        index = self._indexes.get(column_index)
+        if index is None:
+            return None
+        value_ids = index.lookup(needle)
+        if value_ids is None:
+            return None
+        matching_values = np.zeros(len(self.distinct_values[column_index]), dtype=bool)
+        matching_values[value_ids] = True
+        return matching_values[self.codes[column_index]]
+
+    def match_column(self, column_index, text):
+        """Masque booléen des lignes dont la colonne contient text."""
+        needle = normalize_text(text)
+        column = self.search_columns[column_index]
+
+        if column is None:
+            # Colonne catégorielle : recherche sur les catégories, puis
+            # sélection des lignes dont le code correspond
+            mask = self._match_with_index(column_index, needle)
+            if mask is None:
+                matching_values = np.char.find(self.distinct_values[column_index], needle) >= 0
+                mask = matching_values[self.codes[column_index]]
+            self._column_masks[column_index] = (needle, mask)
+            return mask
+
+        cached = self._column_masks.get(column_index)
+        if cached is not None and cached[0] == needle:
+            return cached[1]
+
+        if cached is not None and cached[0] in needle:
+            # Le nouveau motif contient l'ancien : il ne peut que restreindre
+            # le résultat, on ne réévalue que les lignes encore retenues.
+            rows = np.flatnonzero(cached[1])
+            hits = np.char.find(column[rows], needle) >= 0
+            mask = np.zeros(self.row_count, dtype=bool)
+            mask[rows[hits]] = True
+        else:
+            mask = self._match_with_index(column_index, needle)
+            if mask is None:
+                # Index pas encore prêt ou motif < 3 caractères : balayage
+                mask = np.char.find(column, needle) >= 0
+
+        self._column_masks[column_index] = (needle, mask)
+        return mask
+
+    def compute_mask(self, filter_texts):
+        """Masque des lignes qui satisfont tous les filtres non vides (ET des masques)."""
+        mask = np.ones(self.row_count, dtype=bool)
+        for i, text in enumerate(filter_texts):
+            if i >= len(self.search_columns):
+                break
+            if text:
+                mask &= self.match_column(i, text)
+            else:
+                self._column_masks.pop(i, None)
+        return mask
@@ -0,0 +1,287 @@
+# services/history_store.py
+"""
+Historique des extractions OF, une partition compressée par jour.
+
+Chaque extraction chargée est ajoutée sous Fichies_config/history/AAAA-MM-JJ/
+(un data.npz compressé, une entrée par tableau de colonne, et un
+manifest.json). Les colonnes sont encodées comme dans le cache du jour
+(extract_cache.encode_column) et relues à la demande : un parcours sur une
+plage de dates ne décompresse que les colonnes demandées.
+
+Un résumé (of_dates.npz) garde pour chaque OF ses premières et dernières
+dates de présence, pour répondre sans relire les partitions à « depuis quand
+cet OF est-il ouvert ? ».
+
+Seules les history_days dernières partitions sont conservées (toutes si
+history_days vaut 0).
+"""
+
+import datetime
+import json
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from package.extract_cache import cache_key, decode_column, encode_column
+from package.resourcesPath import get_resources_dir
+from package.settings import get_setting
+
+HISTORY_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+DATA_NAME = "data.npz"
+OF_SUMMARY_NAME = "of_dates.npz"
+DEFAULT_HISTORY_DAYS = 30
+
+EXTRACT_DATE_PATTERN = re.compile(r"extraction_OF_du_(\d{2})_(\d{2})_(\d{4})", re.IGNORECASE)
+
+
+def extract_date(file_path):
+    """Date d'une extraction d'après son nom (extraction_OF_du_jj_mm_aaaa), sinon None."""
+    match = EXTRACT_DATE_PATTERN.search(Path(file_path).name)
+    if not match:
+        return None
+    day, month, year = (int(part) for part in match.groups())
+    return datetime.date(year, month, day)
+
+
+class HistoryStore:
+    def __init__(self, root, keep_days=DEFAULT_HISTORY_DAYS):
+        self.root = Path(root)
+        self.keep_days = keep_days
+        self._lock = threading.Lock()
+
+    # ----------------------------------------------------------------
+    #  Partitions
+    # ----------------------------------------------------------------
+
+    def partition_dir(self, day):
+        return self.root / day.isoformat()
+
+    def dates(self):
+        """Dates disponibles, de la plus ancienne à la plus récente."""
+        if not self.root.exists():
+            return []
+        dates = []
+        for entry in self.root.iterdir():
+            if (entry / MANIFEST_NAME).exists():
+                try:
+                    dates.append(datetime.date.fromisoformat(entry.name))
+                except ValueError:
+                    continue
+        return sorted(dates)
+
+    def read_manifest(self, day):
+        with open(self.partition_dir(day) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def has_extract(self, day, file_path=None):
+        """Vrai si la partition existe (et provient de file_path, s'il est donné)."""
+        manifest_path = self.partition_dir(day) / MANIFEST_NAME
+        if not manifest_path.exists():
+            return False
+        if file_path is None:
+            return True
+        try:
+            return self.read_manifest(day).get("key") == cache_key(file_path)
+        except Exception:
+            return False
+
+    def append(self, day, df, file_path=None):
+        """
+        Ajoute l'extraction du jour day. Une partition existante n'est
+        remplacée que si l'extraction de ce jour a été régénérée (file_path
+        différent) ; les partitions au-delà de keep_days sont supprimées.
+        """
+        with self._lock:
+            if self.has_extract(day, file_path):
+                return False
+            self.root.mkdir(parents=True, exist_ok=True)
+            final_dir = self.partition_dir(day)
+            tmp_dir = final_dir.with_name(final_dir.name + ".tmp")
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir)
+            tmp_dir.mkdir()
+
+            columns, arrays = [], {}
+            for i, name in enumerate(df.columns):
+                column, column_arrays = encode_column(df.iloc[:, i])
+                column["name"] = name
+                column["arrays"] = {}
+                for role, values in column_arrays.items():
+                    key = f"c{i}_{role}"
+                    column["arrays"][role] = key
+                    arrays[key] = values
+                columns.append(column)
+            np.savez_compressed(tmp_dir / DATA_NAME, **arrays)
+
+            manifest = {
+                "version": HISTORY_VERSION,
+                "date": day.isoformat(),
+                "key": cache_key(file_path) if file_path else None,
+                "source": Path(file_path).name if file_path else None,
+                "rows": len(df),
+                "columns": columns,
+            }
+            with open(tmp_dir / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+            if final_dir.exists():
+                shutil.rmtree(final_dir)
+            os.replace(tmp_dir, final_dir)
+            if "OF" in df.columns:
+                self._update_of_summary(day, df["OF"])
+            self.prune()
+            return True
+
+    def prune(self):
+        """
+        Supprime les partitions qui dépassent les keep_days plus récentes.
+        keep_days nul, négatif ou None : tout l'historique est conservé.
+        """
+        if not self.keep_days or self.keep_days <= 0:
+            return
+        for day in self.dates()[:-self.keep_days]:
+            shutil.rmtree(self.partition_dir(day), ignore_errors=True)
+            print(f"Historique supprimé : {day.isoformat()}")
+
+    # ----------------------------------------------------------------
+    #  Lecture
+    # ----------------------------------------------------------------
+
+    def load(self, day, columns=None):
+        """DataFrame de la partition day, limité à columns si précisé."""
+        manifest = self.read_manifest(day)
+        if manifest.get("version") != HISTORY_VERSION:
+            raise Exception(f"Version d'historique non prise en charge ({day.isoformat()}).")
+        wanted = [c for c in manifest["columns"] if columns is None or c["name"] in columns]
+        data = {}
+        with np.load(self.partition_dir(day) / DATA_NAME, allow_pickle=True) as npz:
+            for column in wanted:
+                data[column["name"]] = decode_column(column, lambda role: npz[column["arrays"][role]])
+        df = pd.DataFrame(data, columns=[c["name"] for c in wanted])
+        df.attrs['source_file'] = manifest.get("source") or day.isoformat()
+        df.attrs['history_date'] = day.isoformat()
+        return df
+
+    def load_as_of(self, day):
+        """Dernière extraction connue à la date day (incluse), ou None."""
+        candidates = [d for d in self.dates() if d <= day]
+        return self.load(candidates[-1]) if candidates else None
+
+    def scan(self, start=None, end=None, columns=None):
+        """
+        Concatène les partitions entre start et end (inclus) avec une
+        colonne "Date" ; seules les colonnes demandées sont décompressées.
+        """
+        frames = []
+        for day in self.dates():
+            if (start and day < start) or (end and day > end):
+                continue
+            df = self.load(day, columns)
+            df.insert(0, "Date", pd.Timestamp(day))
+            frames.append(df)
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    # ----------------------------------------------------------------
+    #  Résumé des dates de présence des OF
+    # ----------------------------------------------------------------
+
+    def _read_of_summary(self):
+        path = self.root / OF_SUMMARY_NAME
+        if not path.exists():
+            return None
+        with np.load(path) as npz:
+            return npz["of"], npz["first"], npz["last"]
+
+    def _write_of_summary(self, ofs, first, last):
+        tmp_path = self.root / (OF_SUMMARY_NAME + ".tmp.npz")
+        np.savez_compressed(tmp_path, of=ofs, first=first, last=last)
+        os.replace(tmp_path, self.root / OF_SUMMARY_NAME)
+
+    def _update_of_summary(self, day, of_series):
+        """Fusionne les OF du jour day dans le résumé (min/max des dates)."""
+        ofs = np.unique(of_series.dropna().astype(str).to_numpy(dtype=str))
+        day_value = np.datetime64(day, "D")
+        current = self._read_of_summary()
+        if current is None:
+            if len(self.dates()) > 1:
+                # Résumé absent alors que l'historique existe : reconstruction
+                self.rebuild_of_summary()
+                return
+            current = (np.array([], dtype=str), np.array([], dtype="datetime64[D]"),
+                       np.array([], dtype="datetime64[D]"))
+        known, first, last = current
+        all_ofs = np.union1d(known, ofs)
+        new_first = np.full(len(all_ofs), day_value)
+        new_last = np.full(len(all_ofs), day_value)
+        positions = np.searchsorted(all_ofs, known)
+        new_first[positions] = first
+        new_last[positions] = last
+        today_positions = np.searchsorted(all_ofs, ofs)
+        new_first[today_positions] = np.minimum(new_first[today_positions], day_value)
+        new_last[today_positions] = np.maximum(new_last[today_positions], day_value)
+        self._write_of_summary(all_ofs, new_first, new_last)
+
+    def rebuild_of_summary(self):
+        """Recalcule le résumé en relisant la colonne OF de chaque partition."""
+        summary_path = self.root / OF_SUMMARY_NAME
+        if summary_path.exists():
+            summary_path.unlink()
+        self._write_of_summary(np.array([], dtype=str), np.array([], dtype="datetime64[D]"),
+                               np.array([], dtype="datetime64[D]"))
+        for day in self.dates():
+            self._update_of_summary(day, self.load(day, ["OF"])["OF"])
+
+    def of_dates(self, values):
+        """
+        {OF: (première date, dernière date)} de présence dans l'historique,
+        par exemple pour savoir depuis quand un OF est ouvert.
+        """
+        summary = self._read_of_summary()
+        if summary is None:
+            return {}
+        known, first, last = summary
+        wanted = np.asarray([str(v) for v in values], dtype=str)
+        positions = np.clip(np.searchsorted(known, wanted), 0, max(len(known) - 1, 0))
+        result = {}
+        for value, position in zip(wanted, positions):
+            if len(known) and known[position] == value:
+                result[str(value)] = (first[position].item(), last[position].item())
+        return result
+
+
+_history_store = None
+
+
+def get_history_store():
+    """Historique partagé, dans Fichies_config/history."""
+    global _history_store
+    if _history_store is None:
+        _history_store = HistoryStore(get_resources_dir() / "history", get_setting("history_days"))
+    return _history_store
+
+
+def record_extract_in_background(df):
+    """Ajoute l'extraction chargée à l'historique, sans bloquer l'appelant."""
+    source = df.attrs.get('source_file')
+    day = extract_date(source) if source else None
+    if day is None:
+        return None
+
+    def record():
+        try:
+            if get_history_store().append(day, df, source):
+                print(f"Historique : extraction du {day.isoformat()} enregistrée.")
+        except Exception as e:
+            print(f"Echec de l'enregistrement de l'historique : {e}")
+
+    thread = threading.Thread(target=record, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,175 @@
+# services/ipr_index.py
+"""
+Index local des fichiers IPR (Excel et Word) du partage Méthodes.
+
+L'index associe chaque code normalisé à ses fichiers, répertoire par
+répertoire. Il est enregistré en JSON et rafraîchi de façon incrémentale :
+seuls les répertoires dont la date de modification a changé sont relistés.
+Les recherches sont servies par l'index courant ; sa mise à jour (listage du
+partage réseau) se fait dans un thread de fond, au plus toutes les
+REFRESH_INTERVAL_S secondes.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+from package.resourcesPath import get_resources_dir
+
+IPR_BASE_PATH = Path(r"S:\Methodes Production")
+
+# Répertoires par ordre de priorité de recherche
+IPR_DIRECTORIES = [
+    "0- IPR VALIDE",
+    "1- IPR AUTORISEES",
+    "2- IPR en COURS",
+    "3- IPR ARCHIVES",
+]
+
+INDEX_VERSION = 1
+# Délai minimal entre deux rafraîchissements déclenchés par lookup()
+REFRESH_INTERVAL_S = 60
+
+# "<code>.xls*" ou "<code>.doc*", comme les motifs de recherche d'origine
+IPR_FILE_PATTERN = re.compile(r"^(?P<code>.+)\.(?P<kind>xls|doc)", re.IGNORECASE)
+
+
+def normalize_code(code):
+    """Code IPR tel qu'indexé : '/' remplacé par '-', sans casse ni espaces."""
+    return code.replace('/', '-').strip().lower()
+
+
+class IprIndex:
+    def __init__(self, index_path, base_path=IPR_BASE_PATH, directories=IPR_DIRECTORIES):
+        self.index_path = Path(index_path)
+        self.base_path = Path(base_path)
+        self.directories = list(directories)
+        # répertoire -> {"mtime_ns": int, "files": {code: [[nom, type], ...]}}
+        self.directory_entries = {}
+        # code -> (répertoire, chemin, type), en respectant la priorité des répertoires
+        self._lookup = {}
+        self._lock = threading.Lock()
+        # Dernier rafraîchissement (time.monotonic()), None si jamais rafraîchi
+        self.refreshed_at = None
+        self._refresh_thread = None
+        self.load()
+
+    def load(self):
+        if not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION and data.get("base_path") == str(self.base_path):
+                self.directory_entries = data.get("directories", {})
+                self._rebuild_lookup()
+        except Exception as e:
+            print(f"Index IPR illisible, reconstruction : {e}")
+            self.directory_entries = {}
+
+    def save(self):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "base_path": str(self.base_path),
+                "directories": self.directory_entries,
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def refresh(self, force=False):
+        """
+        Relit les répertoires modifiés depuis la dernière indexation.
+        Un répertoire inaccessible conserve ses dernières entrées connues.
+        """
+        with self._lock:
+            changed = False
+            for dir_name in self.directories:
+                dir_full = self.base_path / dir_name
+                try:
+                    mtime_ns = dir_full.stat().st_mtime_ns
+                    known = self.directory_entries.get(dir_name)
+                    if not force and known and known.get("mtime_ns") == mtime_ns:
+                        continue
+                    self.directory_entries[dir_name] = {
+                        "mtime_ns": mtime_ns,
+                        "files": self._scan_directory(dir_full),
+                    }
+                    changed = True
+                except OSError as e:
+                    print(f"Répertoire IPR inaccessible ({dir_name}) : {e}")
+
+            if changed:
+                self._rebuild_lookup()
+                try:
+                    self.save()
+                except OSError as e:
+                    print(f"Echec de l'enregistrement de l'index IPR : {e}")
+            self.refreshed_at = time.monotonic()
+
+    def refresh_in_background(self, force=False):
+        """Lance refresh() dans un thread de fond, sauf si un rafraîchissement est déjà en cours."""
+        thread = self._refresh_thread
+        if thread is not None and thread.is_alive():
+            return thread
+        thread = threading.Thread(target=self.refresh, kwargs={"force": force}, daemon=True)
+        self._refresh_thread = thread
+        thread.start()
+        return thread
+
+    def lookup(self, code):
+        """
+        Retourne (répertoire, chemin, type) pour le code, type valant "xls" ou
+        "doc", ou None si aucun IPR n'existe.
+
+        La réponse vient de l'index courant ; s'il date de plus de
+        REFRESH_INTERVAL_S, un rafraîchissement est lancé en arrière-plan. Seul
+        un index encore vide (premier lancement) est construit avant de répondre.
+        """
+        if not self.directory_entries:
+            self.refresh()
+        elif self.refreshed_at is None or time.monotonic() - self.refreshed_at > REFRESH_INTERVAL_S:
+            self.refresh_in_background()
+        return self._lookup.get(normalize_code(code))
+
+    @staticmethod
+    def _scan_directory(dir_full):
+        files = {}
+        with os.scandir(dir_full) as entries:
+            for entry in entries:
+                match = IPR_FILE_PATTERN.match(entry.name)
+                if match and entry.is_file():
+                    code = normalize_code(match.group("code"))
+                    files.setdefault(code, []).append([entry.name, match.group("kind").lower()])
+        for candidates in files.values():
+            candidates.sort()
+        return files
+
+    def _rebuild_lookup(self):
+        lookup = {}
+        # Répertoires du moins prioritaire au plus prioritaire : le dernier écrit gagne
+        for dir_name in reversed(self.directories):
+            files = self.directory_entries.get(dir_name, {}).get("files", {})
+            for code, candidates in files.items():
+                # Dans un même répertoire, l'Excel est prioritaire sur le Word
+                for kind in ("doc", "xls"):
+                    names = [name for name, k in candidates if k == kind]
+                    if names:
+                        lookup[code] = (dir_name, str(self.base_path / dir_name / names[0]), kind)
+        self._lookup = lookup
+
+
+_ipr_index = None
+
+
+def get_ipr_index():
+    """Index IPR partagé, enregistré dans Fichies_config/cache/ipr_index.json."""
+    global _ipr_index
+    if _ipr_index is None:
+        resources_dir = get_resources_dir()
+        _ipr_index = IprIndex(resources_dir / "cache" / "ipr_index.json")
+    return _ipr_index
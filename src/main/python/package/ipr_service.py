@@ -1,8 +1,17 @@
 # services/ipr_service.py
 
-from package.IPR import rech_ipr
+from package.ipr_index import get_ipr_index
 
 def run_ipr(ref):
     """Exécute la recherche IPR sur la référence."""
+    # Import différé : IPR charge COM (win32com, pythoncom) au premier appel
+    from package.IPR import rech_ipr
     # Tu peux gérer ici exceptions, logs, etc.
     rech_ipr(ref)
+
+def refresh_ipr_index():
+    """Met à jour l'index IPR en arrière-plan (répertoires modifiés uniquement)."""
+    try:
+        get_ipr_index().refresh_in_background()
+    except Exception as e:
+        print(f"Echec du rafraîchissement de l'index IPR : {e}")
@@ -0,0 +1,138 @@
+# services/job_control.py
+"""
+Jobs d'action (ActionJob) et contrôle de leur exécution depuis le thread de
+fond, sans Qt : les services (sap_service, IPR, zp20_extractor) appellent
+check_cancelled() ou run_process() et s'arrêtent si le job qui les exécute
+a été annulé ou a dépassé son délai. Appelés hors d'un job, ils se
+comportent comme avant (aucun contrôle, subprocess.run).
+"""
+
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+QUEUED = "en attente"
+RUNNING = "en cours"
+# Annulation demandée, le thread n'est pas encore revenu
+CANCELLING = "annulation..."
+DONE = "terminée"
+FAILED = "erreur"
+CANCELLED = "annulée"
+TIMED_OUT = "délai dépassé"
+FINISHED_STATES = (DONE, FAILED, CANCELLED, TIMED_OUT)
+
+PROCESS_POLL_S = 0.1
+
+
+class ActionCancelled(Exception):
+    """Job annulé (par l'utilisateur ou délai dépassé)."""
+    pass
+
+
+class ActionJob:
+    def __init__(self, job_id, target, label, func, on_done=None, timeout=None):
+        """
+        :param func: travail exécuté dans un thread de fond, retourne le résultat
+        :param on_done: appelé dans le thread GUI avec le résultat ; retourne
+            le message affiché (ou (message, niveau "info" | "warning"))
+        :param timeout: délai maximal d'exécution (s), None = sans limite
+        """
+        self.id = job_id
+        self.target = target
+        self.label = label
+        self.func = func
+        self.on_done = on_done
+        self.timeout = timeout
+        self.state = QUEUED
+        self.message = ""
+        self.level = "info"
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.deadline = None
+        self.cancel_event = threading.Event()
+        self.cancel_reason = ""
+
+    @property
+    def finished(self):
+        return self.state in FINISHED_STATES
+
+    def elapsed(self):
+        """Durée d'exécution (s), None si le job n'a pas démarré."""
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.time()) - self.started_at
+
+    def request_cancel(self, reason):
+        self.cancel_reason = reason
+        self.cancel_event.set()
+
+    def overdue(self):
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+
+# ----------------------------------------------------------------
+#  Côté thread de fond
+# ----------------------------------------------------------------
+
+_current = threading.local()
+
+
+@contextmanager
+def running_job(job):
+    """Rattache job au thread courant pendant son exécution."""
+    _current.job = job
+    try:
+        yield job
+    finally:
+        _current.job = None
+
+
+def current_job():
+    """Job exécuté par le thread courant, ou None (appel direct)."""
+    return getattr(_current, "job", None)
+
+
+def check_cancelled():
+    """Lève ActionCancelled si le job courant a été annulé ou a dépassé son délai."""
+    job = current_job()
+    if job is None:
+        return
+    if job.overdue() and not job.cancel_event.is_set():
+        job.request_cancel(TIMED_OUT)
+    if job.cancel_event.is_set():
+        raise ActionCancelled(f"{job.label} : {job.cancel_reason}")
+
+
+def _kill_process(process):
+    if os.name == "nt":
+        # shell=True : cmd.exe lance cscript, tout l'arbre est arrêté
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output=True)
+    else:
+        process.kill()
+    process.wait()
+
+
+def run_process(args, **kwargs):
+    """
+    Équivalent de subprocess.run(args, check=True, **kwargs), mais le
+    processus est arrêté si le job courant est annulé ou dépasse son délai.
+    """
+    if current_job() is None:
+        return subprocess.run(args, check=True, **kwargs)
+    process = subprocess.Popen(args, **kwargs)
+    while True:
+        try:
+            returncode = process.wait(timeout=PROCESS_POLL_S)
+            break
+        except subprocess.TimeoutExpired:
+            try:
+                check_cancelled()
+            except ActionCancelled:
+                _kill_process(process)
+                raise
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, args)
+    return subprocess.CompletedProcess(args, returncode)
@@ -1,25 +1,38 @@
 # business/logic.py
 
-import re
-import pandas as pd
-
-from package.ipr_service import run_ipr
-from package.sap_service import run_sap_transaction
-from package.data_extract_service import load_excel_data
+import threading
 from pathlib import Path
-from package.resourcesPath import AppContext
-from package.ZP20_json import nom_app
-import subprocess
+import pandas as pd
 
-ctx = AppContext.get()
-resources_dir = ctx.get_resource('Fichies_config/dummy.txt')
-vbs_path = Path(resources_dir).parent / "Transaction.vbs"
+from package.ipr_service import refresh_ipr_index
+from package.data_extract_service import load_excel_data, load_extract_file, load_extract_diff
+from package.filter_engine import FilterEngine
+from package.history_store import get_history_store, record_extract_in_background, extract_date
+from package.job_control import ActionCancelled
+from package.perf import perf_span
+from package.settings import get_setting
 
 class BusinessLogic:
-    def __init__(self, parent_window=None):
+    def __init__(self, parent_window=None, use_search_index=True):
         self.parent_window = parent_window
+        self.use_search_index = use_search_index
         self.current_df = pd.DataFrame()
         self.filtered_df = pd.DataFrame()
+        # Extraction du jour, conservée pendant la consultation de l'historique
+        self.live_df = pd.DataFrame()
+        self.history_date = None
+        # Comparaison avec l'extraction précédente (ExtractDiff ou None)
+        self.diff = None
+        self.only_changed = False
+        self.filter_engine = FilterEngine(self.current_df)
+        # Masque du dernier filtrage (None = aucune ligne écartée)
+        self.current_mask = None
+        # Mode service partagé (query_server_url) : filtres évalués à distance
+        self.remote = None
+        # Lignes retenues par le dernier filtre / lignes de l'extraction servie
+        self.remote_total = 0
+        self.remote_row_count = 0
+        self.filter_texts = []
 
         # Mapping action -> argument pour SAP
         self.action_mapping = {
@@ -42,72 +55,319 @@ class BusinessLogic:
             "Nomenclature interactive": "Nomenclature_interactive"
         }
 
-    def load_data(self):
-        """Charge le DataFrame depuis un service spécialisé."""
-        df = load_excel_data()  # Appel service/data_extract_service.py
+    def load_data(self, on_preview=None, on_progress=None):
+        """
+        Charge le DataFrame depuis un service spécialisé.
+        Peut être appelé hors du thread GUI : les attributs ne sont remplacés
+        qu'une fois le chargement et la préparation des filtres terminés.
+        """
+        server_url = get_setting("query_server_url")
+        if server_url:
+            self._load_remote(server_url, on_progress)
+            return
+        df = load_excel_data(on_preview=on_preview, on_progress=on_progress)  # Appel service/data_extract_service.py
+        if on_progress:
+            on_progress("Comparaison avec l'extraction précédente...")
+        diff = self._load_diff(df)
+        if on_progress:
+            on_progress("Préparation des filtres...")
+        self.live_df = df
+        self.history_date = None
+        self.set_data(df, diff)
+        # Historique multi-jours alimenté en arrière-plan
+        record_extract_in_background(df)
+        # Index des fichiers IPR tenu à jour pour des recherches instantanées
+        refresh_ipr_index()
+
+    def _load_remote(self, server_url, on_progress=None):
+        """
+        Utilise l'extraction chargée par le service partagé : seules les
+        lignes retenues par les filtres (au plus query_server_row_limit) sont
+        transférées. Historique et comparaison restent propres au service.
+        """
+        from package.query_client import RemoteExtractClient
+        if on_progress:
+            on_progress(f"Connexion au service {server_url}...")
+        client = RemoteExtractClient(server_url)
+        client.info()
+        df, total = client.query([], get_setting("query_server_row_limit"))
+        self.remote = client
+        self.remote_total = total
+        self.remote_row_count = total
+        self.filter_texts = []
+        self.live_df = df
+        self.history_date = None
+        self.filter_engine = FilterEngine(df.iloc[:0])
+        self.current_df = df
+        self.filtered_df = df
+        self.current_mask = None
+        self.diff = None
+
+    def prepare_extract(self, file_path, on_progress=None):
+        """
+        Charge une nouvelle extraction sans toucher aux données affichées
+        (appelé hors du thread GUI). Retourne (df, diff, filter_engine), à
+        installer ensuite par swap_extract.
+        """
+        df = load_extract_file(file_path, on_progress=on_progress)
+        if on_progress:
+            on_progress("Comparaison avec l'extraction précédente...")
+        diff = self._load_diff(df)
+        if on_progress:
+            on_progress("Préparation des filtres...")
+        return df, diff, FilterEngine(df)
+
+    def swap_extract(self, df, diff, filter_engine, filter_texts=None):
+        """
+        Remplace l'extraction du jour par celle préparée par prepare_extract,
+        puis réapplique les filtres en cours. Pendant la consultation de
+        l'historique, seule l'extraction du jour conservée est remplacée.
+        """
+        self.live_df = df
+        record_extract_in_background(df)
+        if self.history_date is not None:
+            return False
+        self.set_data(df, diff, filter_engine)
+        if filter_texts is not None:
+            self.filter_data(filter_texts)
+        return True
+
+    def set_data(self, df, diff=None, filter_engine=None):
+        """
+        Installe un DataFrame déjà chargé et prépare son moteur de filtrage.
+        diff : comparaison de df avec l'extraction précédente (optionnelle).
+        filter_engine : moteur déjà construit pour df (optionnel).
+        """
+        # Colonnes de recherche normalisées, construites une seule fois
+        if filter_engine is None:
+            filter_engine = FilterEngine(df)
+
+        self.filter_engine = filter_engine
         self.current_df = df
         self.filtered_df = df.copy()
+        self.current_mask = None
+        self.diff = diff
+        # Nouvelle comparaison : le filtre « lignes modifiées » repart décoché
+        self.only_changed = False
+        if self.use_search_index:
+            # Index de trigrammes construit en arrière-plan ; tant qu'il n'est
+            # pas prêt, le filtrage reste sur le balayage des colonnes
+            threading.Thread(target=filter_engine.build_indexes, daemon=True).start()
+
+    def history_dates(self):
+        """Dates consultables dans l'historique, hors extraction du jour."""
+        if self.remote is not None:
+            return []
+        live_date = extract_date(self.live_df.attrs.get('source_file', ''))
+        return [day for day in get_history_store().dates() if day != live_date]
+
+    def load_history(self, day):
+        """
+        Affiche l'extraction telle qu'elle était à la date day (dernière
+        partition connue à cette date) ; None revient à l'extraction du jour.
+        """
+        if day is None:
+            self.history_date = None
+            self.set_data(self.live_df, self._load_diff(self.live_df))
+            return
+        df = get_history_store().load_as_of(day)
+        if df is None:
+            raise Exception(f"Aucune extraction dans l'historique au {day.strftime('%d/%m/%Y')}.")
+        self.history_date = day
+        self.set_data(df, self._load_diff(df))
+
+    @staticmethod
+    def _load_diff(df):
+        try:
+            return load_extract_diff(df)
+        except Exception as e:
+            print(f"Comparaison avec l'extraction précédente impossible : {e}")
+            return None
+
+    def set_only_changed(self, enabled):
+        """Limite (ou non) l'affichage aux lignes nouvelles ou modifiées."""
+        self.only_changed = enabled
+
+    def filtered_diff(self):
+        """(statuts, cellules modifiées) alignés sur filtered_df, ou (None, None)."""
+        if self.diff is None:
+            return None, None
+        if self.current_mask is None:
+            return self.diff.row_status, self.diff.changed
+        return self.diff.subset(self.current_mask)
 
     def filter_data(self, filter_texts):
         """Applique la recherche sur chaque colonne (>=3 char)."""
-        df = self.current_df.copy()
-        for i, text in enumerate(filter_texts):
-            if text:
-                safe_pattern = re.escape(text)
-                df = df[df.iloc[:, i].astype(str).str.contains(
-                    safe_pattern, case=False, na=False, regex=True
-                )]
+        if self.remote is not None:
+            return self._filter_remote(filter_texts)
+        with perf_span("filter", active=sum(1 for t in filter_texts if t)) as span:
+            mask = self.filter_engine.compute_mask(filter_texts)
+            if self.only_changed and self.diff is not None:
+                mask &= self.diff.changed_rows
+            df = self.current_df[mask]
+            span["rows"] = len(df)
+        self.filtered_df = df
+        self.current_mask = mask
+        return df
+
+    def _filter_remote(self, filter_texts):
+        df, total = self.remote.query(filter_texts, get_setting("query_server_row_limit"))
+        self.filter_texts = list(filter_texts)
+        self.remote_total = total
         self.filtered_df = df
+        self.current_mask = None
         return df
 
     def reset_filters(self):
         """Réinitialise le DataFrame filtré."""
         self.filtered_df = self.current_df
+        self.current_mask = None
+        self.only_changed = False
+        if self.remote is not None:
+            self.filter_texts = []
+            self.remote_total = self.remote_row_count
 
-    def execute_action(self, action_name, input_value):
-        """Gère l’exécution d’une action (IPR, SAP, ou Note infos)."""
+    def column_catalog(self, column_name):
+        """
+        Valeurs distinctes de la colonne parmi les lignes filtrées :
+        (libellés triés, nombre de lignes par libellé, plus long libellé,
+        libellés normalisés ou None).
+        """
+        if self.remote is not None:
+            # Libellés normalisés non transmis par le serveur : calculés par la liste
+            return (*self.remote.values(column_name, self.filter_texts), None)
+        engine = self.filter_engine
+        if column_name not in engine.columns:
+            return [], [], "", None
+        catalog = engine.catalogs[engine.columns.index(column_name)]
+        labels, search_labels, counts = catalog.value_entries(self.current_mask)
+        return labels, counts, catalog.longest_label, search_labels
+
+    def execute_action(self, action_name, input_value, executor=None):
+        """
+        Gère l’exécution d’une action (IPR, SAP, ou Note infos).
+        Avec executor (ActionExecutor), les actions SAP et IPR sont placées
+        dans sa file sans bloquer l'appelant ; le job est retourné.
+        """
         arg1 = self.action_mapping.get(action_name, "")
+        if executor is not None and arg1 != "infos":
+            return self._submit_action(executor, action_name, arg1, input_value)
+        with perf_span("action", action=action_name):
+            self._dispatch_action(arg1, input_value)
+        return None
 
+    def _dispatch_action(self, arg1, input_value):
+        # Services chargés à la première action (COM, SAP, widget ZP20)
         if arg1 == "IPR":
             # IPR => appel direct
+            from package.ipr_service import run_ipr
             run_ipr(input_value)
         elif arg1 == "infos":
             # Afficher la note infos
             self.show_infos(input_value)
         elif arg1 == "Nomenclature_interactive":
-            subprocess.run(
-                ["cscript", str(vbs_path), input_value],
-                check=True,
-                shell=True,
-                encoding='utf-8'
-            )
-            self.my_zp20_widget = nom_app()
+            self.open_interactive_bom(input_value)
         else:
             # Exécuter la transaction SAP
+            from package.sap_service import run_sap_transaction
             run_sap_transaction(arg1, input_value)
 
-    def show_infos(self, of_value):
-        """Logique pour afficher la note infos (data sur l'OF)."""
-        df = self.filtered_df if not self.filtered_df.empty else self.current_df
+    def _submit_action(self, executor, action_name, arg1, input_value):
+        """Action placée dans la file de sa cible ("SAP" ou "IPR")."""
+        label = f"{action_name} {input_value}"
+        if arg1 == "IPR":
+            from package.IPR import find_ipr
+            return executor.submit(
+                "IPR", label, lambda: find_ipr(input_value),
+                on_done=lambda result: self._open_ipr_result(executor, result),
+            )
+        if arg1 == "Nomenclature_interactive":
+            return self.open_interactive_bom(input_value, executor=executor)
+        from package.sap_service import run_sap_transaction
+        return executor.submit("SAP", label, lambda: run_sap_transaction(arg1, input_value))
+
+    def _open_ipr_result(self, executor, result):
+        """IPR trouvé : ouverture du document dans la file "Office"."""
+        from package.IPR import ipr_status, open_ipr_document
+        message, level = ipr_status(result)
+        if result is not None and level != "warning":
+            executor.submit("Office", f"Ouverture {Path(result[1]).name}",
+                            lambda: open_ipr_document(result), on_done=lambda _: "Document ouvert")
+        return message, level
+
+    def open_interactive_bom(self, reference, force_refresh=False, executor=None):
+        """
+        Ouvre la recherche de composants sur la nomenclature de reference :
+        depuis la base locale si la capture est récente, sinon (ou sur
+        demande) après une nouvelle capture dans SAP. Avec executor, la
+        capture passe par la file "SAP" et la fenêtre s'ouvre à la fin.
+        """
+        from package.bom_store import get_bom_store
+
+        reference = reference.strip()
+        max_age_s = get_setting("bom_max_age_hours") * 3600
+        if not force_refresh and get_bom_store().is_fresh(reference, max_age_s):
+            self.show_interactive_bom(reference, executor)
+            return None
+        if executor is None:
+            self.refresh_bom(reference)
+            self.show_interactive_bom(reference)
+            return None
+
+        def on_captured(outcome):
+            self.show_interactive_bom(reference, executor)
+            return outcome
+
+        return executor.submit("SAP", f"Nomenclature interactive {reference}",
+                               lambda: self.refresh_bom(reference), on_done=on_captured)
+
+    def refresh_bom(self, reference):
+        """
+        Nouvelle capture de reference ; si elle échoue, la dernière capture
+        connue est conservée. Retourne (message, niveau).
+        """
+        from package.bom_store import get_bom_store
         try:
-            # Filtre sur la colonne 'OF' ou 'Référence'
-            result = df[
-                (df['OF'].astype(str) == of_value) |
-                (df['Référence'].astype(str) == of_value)
-            ][['OF', 'Référence', 'Designation', 'Client']].drop_duplicates()
+            self.capture_bom(reference)
+        except ActionCancelled:
+            raise
+        except Exception as e:
+            if get_bom_store().captured_at(reference) is None:
+                raise
+            # Capture impossible (SAP fermé...) : dernière capture connue
+            print(f"Nomenclature {reference} non actualisée : {e}")
+            return f"Nomenclature non actualisée, dernière capture conservée : {e}", "warning"
+        return "Nomenclature capturée", "info"
 
-            if result.empty:
-                raise Exception("Aucune donnée trouvée pour cette référence/OF.")
+    def show_interactive_bom(self, reference, executor=None):
+        """Fenêtre de recherche de composants sur la nomenclature enregistrée."""
+        from package.bom_store import get_bom_store
+        from package.ZP20_json import nom_app
 
-            note_content = "INFOS PRODUCTION\n\n"
-            for _, row in result.iterrows():
-                note_content += (
-                    f"Numéro d'OF: {row['OF']}\n"
-                    f"Référence: {row['Référence']}\n"
-                    f"Désignation: {row['Designation']}\n"
-                    f"Client: {row['Client']}\n"
-                    "--------------------------------------------------\n"
-                )
+        store = get_bom_store()
+        self.my_zp20_widget = nom_app(
+            index=store.index(reference),
+            captured_at=store.captured_at(reference),
+            on_refresh=lambda: self.open_interactive_bom(reference, force_refresh=True, executor=executor),
+            where_used=store.where_used,
+        )
+
+    def capture_bom(self, reference):
+        """Capture la nomenclature dans SAP (bom_capture) et l'enregistre."""
+        from package.bom_store import get_bom_store
+        json_path = self.bom_capture(reference)
+        get_bom_store().import_json(reference, json_path)
+
+    @staticmethod
+    def bom_capture(reference):
+        """Capture SAP -> chemin du data_ref.json (remplaçable, ex. fichiers de test)."""
+        from package.sap_service import run_bom_capture
+        return run_bom_capture(reference)
+
+    def show_infos(self, of_value):
+        """Logique pour afficher la note infos (data sur l'OF)."""
+        try:
+            note_content = self.build_infos_note(of_value)
 
             # Création d'un fichier temporaire
             import tempfile, os
@@ -120,3 +380,42 @@ class BusinessLogic:
         except Exception as e:
             # On relance l'exception pour remonter le message dans l'UI
             raise Exception(f"Erreur infos : {e}")
+
+    def build_infos_note(self, of_value):
+        """Texte de la note infos pour un OF ou une référence."""
+        df = self.filtered_df if not self.filtered_df.empty else self.current_df
+        if self.remote is not None:
+            # Lignes partielles côté poste : recherche faite par le service
+            df = self.remote.lookup(of_value, ["OF", "Référence"])
+        # Filtre sur la colonne 'OF' ou 'Référence'
+        result = df[
+            (df['OF'].astype(str) == of_value) |
+            (df['Référence'].astype(str) == of_value)
+        ][['OF', 'Référence', 'Designation', 'Client']].drop_duplicates()
+
+        if result.empty:
+            raise Exception("Aucune donnée trouvée pour cette référence/OF.")
+
+        try:
+            # Dates de présence des OF dans l'historique des extractions
+            of_dates = get_history_store().of_dates(result['OF'].astype(str).unique())
+        except Exception as e:
+            print(f"Historique indisponible : {e}")
+            of_dates = {}
+
+        note_content = "INFOS PRODUCTION\n\n"
+        for _, row in result.iterrows():
+            note_content += (
+                f"Numéro d'OF: {row['OF']}\n"
+                f"Référence: {row['Référence']}\n"
+                f"Désignation: {row['Designation']}\n"
+                f"Client: {row['Client']}\n"
+            )
+            if str(row['OF']) in of_dates:
+                first, last = of_dates[str(row['OF'])]
+                note_content += (
+                    f"Présent dans les extractions du {first.strftime('%d/%m/%Y')}"
+                    f" au {last.strftime('%d/%m/%Y')}\n"
+                )
+            note_content += "--------------------------------------------------\n"
+        return note_content
@@ -0,0 +1,48 @@
+# gui/message_box.py
+"""
+Messages non modaux affichés par les actions (IPR...). Module léger (Qt
+uniquement) : main.py y rattache la fenêtre principale sans charger COM.
+"""
+
+from PySide6.QtWidgets import QMessageBox
+from PySide6.QtCore import Qt
+
+class NonModalMessageBox:
+    def __init__(self):
+        self.root = None
+        self._current_msg = None  # Pour garder une référence aux messages
+
+    def show_message(self, title, message, icon="info"):
+        if not self.root:
+            return
+            
+        # Fermer le message précédent s'il existe
+        if self._current_msg:
+            self._current_msg.close()
+            
+        msg = QMessageBox(self.root)
+        msg.setWindowTitle(title)
+        msg.setText(message)
+        msg.setStandardButtons(QMessageBox.Ok)
+        msg.setMinimumWidth(400)  # Largeur minimum
+        
+        if icon == "error":
+            msg.setIcon(QMessageBox.Critical)
+        elif icon == "warning":
+            msg.setIcon(QMessageBox.Warning)
+        else:
+            msg.setIcon(QMessageBox.Information)
+        
+        msg.setWindowModality(Qt.NonModal)
+        
+        # Connecter le signal finished pour nettoyer la référence
+        msg.finished.connect(lambda: self._clear_message(msg))
+        
+        self._current_msg = msg
+        msg.show()
+        
+    def _clear_message(self, msg):
+        if self._current_msg == msg:
+            self._current_msg = None
+
+message_box = NonModalMessageBox()
@@ -0,0 +1,59 @@
+# business/ngram_index.py
+
+from collections import defaultdict
+
+import numpy as np
+
+NGRAM_SIZE = 3
+
+
+def ngrams(text, size=NGRAM_SIZE):
+    """Ensemble des n-grammes (trigrammes par défaut) d'un texte."""
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class NgramIndex:
+    """
+    Index inversé de trigrammes sur les valeurs distinctes d'une colonne.
+
+    Une recherche "contient X" intersecte les listes de valeurs associées à
+    chaque trigramme de X, puis confirme les candidats par une vraie
+    recherche de sous-chaîne.
+    """
+    def __init__(self, values):
+        self.values = list(values)
+        postings = defaultdict(list)
+        for value_id, value in enumerate(self.values):
+            for gram in ngrams(value):
+                postings[gram].append(value_id)
+        self.postings = {
+            gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()
+        }
+
+    def lookup(self, needle):
+        """
+        Identifiants des valeurs qui contiennent needle.
+        Retourne None si needle est trop court pour utiliser l'index.
+        """
+        if len(needle) < NGRAM_SIZE:
+            return None
+
+        # Les listes les plus courtes d'abord : l'intersection se réduit vite
+        posting_lists = []
+        for gram in ngrams(needle):
+            ids = self.postings.get(gram)
+            if ids is None:
+                return np.empty(0, dtype=np.int32)
+            posting_lists.append(ids)
+        posting_lists.sort(key=len)
+
+        candidates = posting_lists[0]
+        for ids in posting_lists[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+
+        return np.array(
+            [value_id for value_id in candidates if needle in self.values[value_id]],
+            dtype=np.int32
+        )
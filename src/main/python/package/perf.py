@@ -0,0 +1,128 @@
+# services/perf.py
+"""
+Mesures de durée légères des étapes clés (recherche de l'extraction,
+lecture Excel, filtrage, affichage, actions SAP/IPR).
+
+    with perf_span("excel_parse", file=path.name):
+        ...
+
+Chaque mesure est gardée en mémoire (dernières MAX_RECENT_SPANS) pour
+l'overlay de performances et écrite dans un journal JSONL tournant
+(Fichies_config/logs/perf_spans.jsonl).
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+MAX_RECENT_SPANS = 500
+LOG_MAX_BYTES = 2 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+_recent_spans = deque(maxlen=MAX_RECENT_SPANS)
+_lock = threading.Lock()
+_logger = None
+
+
+def configure_perf_log(log_path, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+    """Active l'écriture des mesures dans log_path (None pour la désactiver)."""
+    global _logger
+    logger = logging.getLogger("package.perf")
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    if log_path is None:
+        _logger = logger
+        return logger
+
+    log_path = Path(log_path)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    _logger = logger
+    return logger
+
+
+def _get_logger():
+    if _logger is None:
+        # Journal par défaut dans les ressources de l'application
+        try:
+            from package.resourcesPath import get_resources_dir
+            from package.settings import get_setting
+            if get_setting("perf_log"):
+                return configure_perf_log(get_resources_dir() / "logs" / "perf_spans.jsonl")
+            return configure_perf_log(None)
+        except Exception as e:
+            print(f"Journal de performances indisponible : {e}")
+            return configure_perf_log(None)
+    return _logger
+
+
+def record_span(stage, seconds, **fields):
+    """Enregistre une mesure déjà calculée."""
+    span = {
+        "ts": round(time.time(), 3),
+        "stage": stage,
+        "ms": round(seconds * 1000, 2),
+        "thread": threading.current_thread().name,
+    }
+    span.update(fields)
+    with _lock:
+        _recent_spans.append(span)
+    try:
+        _get_logger().info(json.dumps(span, ensure_ascii=False, default=str))
+    except Exception as e:
+        print(f"Echec d'écriture de la mesure {stage} : {e}")
+    return span
+
+
+@contextmanager
+def perf_span(stage, **fields):
+    """Mesure la durée du bloc ; une exception est notée dans le champ "error"."""
+    start = time.perf_counter()
+    try:
+        yield fields
+    except Exception as e:
+        fields["error"] = type(e).__name__
+        raise
+    finally:
+        record_span(stage, time.perf_counter() - start, **fields)
+
+
+def recent_spans(count=None):
+    """Dernières mesures, de la plus ancienne à la plus récente."""
+    with _lock:
+        spans = list(_recent_spans)
+    return spans if count is None else spans[-count:]
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def stage_statistics():
+    """{étape: {"count", "p50", "p95", "max"}} en ms sur les mesures récentes."""
+    durations = {}
+    for span in recent_spans():
+        durations.setdefault(span["stage"], []).append(span["ms"])
+    statistics = {}
+    for stage, values in durations.items():
+        values.sort()
+        statistics[stage] = {
+            "count": len(values),
+            "p50": _percentile(values, 0.50),
+            "p95": _percentile(values, 0.95),
+            "max": values[-1],
+        }
+    return statistics
@@ -0,0 +1,84 @@
+# gui/perf_overlay.py
+"""
+Overlay de diagnostic des performances : p50/p95 par étape et dernières
+mesures. Masqué par défaut, affiché par raccourci (Ctrl+Maj+F12) depuis
+la fenêtre principale.
+"""
+
+import time
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QHeaderView
+)
+
+from package.perf import recent_spans, stage_statistics
+
+RECENT_SPANS_SHOWN = 30
+REFRESH_INTERVAL_MS = 1000
+
+
+class PerfOverlay(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.Tool | Qt.WindowStaysOnTopHint)
+        self.setWindowTitle("Performances")
+        self.resize(520, 560)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Par étape (ms)"))
+        self.stats_table = self._create_table(["Étape", "Nb", "p50", "p95", "max"])
+        layout.addWidget(self.stats_table)
+        layout.addWidget(QLabel(f"{RECENT_SPANS_SHOWN} dernières mesures"))
+        self.spans_table = self._create_table(["Heure", "Étape", "ms", "Détails"])
+        layout.addWidget(self.spans_table)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    @staticmethod
+    def _create_table(headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    def toggle(self):
+        if self.isVisible():
+            self.hide()
+        else:
+            self.refresh()
+            self.show()
+            self.raise_()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh_timer.start(REFRESH_INTERVAL_MS)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+
+    def refresh(self):
+        statistics = stage_statistics()
+        self.stats_table.setRowCount(len(statistics))
+        for row, stage in enumerate(sorted(statistics)):
+            values = statistics[stage]
+            cells = [stage, str(values["count"]), f"{values['p50']:.1f}",
+                     f"{values['p95']:.1f}", f"{values['max']:.1f}"]
+            for col, text in enumerate(cells):
+                self.stats_table.setItem(row, col, QTableWidgetItem(text))
+
+        spans = list(reversed(recent_spans(RECENT_SPANS_SHOWN)))
+        self.spans_table.setRowCount(len(spans))
+        for row, span in enumerate(spans):
+            details = ", ".join(
+                f"{key}={value}" for key, value in span.items()
+                if key not in ("ts", "stage", "ms", "thread")
+            )
+            cells = [time.strftime("%H:%M:%S", time.localtime(span["ts"])),
+                     span["stage"], f"{span['ms']:.1f}", details]
+            for col, text in enumerate(cells):
+                self.spans_table.setItem(row, col, QTableWidgetItem(text))
@@ -0,0 +1,90 @@
+# services/query_client.py
+"""
+Client du service de requêtes partagé (query_server).
+
+Les réponses sont mémorisées avec leur ETag ; une requête identique est
+renvoyée avec If-None-Match et un 304 réutilise la réponse mémorisée.
+"""
+
+import json
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+
+from package.perf import perf_span
+from package.query_server import frame_from_payload
+
+RESPONSE_CACHE_SIZE = 32
+
+
+class RemoteExtractClient:
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        # url -> (etag, réponse décodée)
+        self._responses = OrderedDict()
+        self.columns = []
+        self.source = ""
+
+    def _get(self, path, params=None):
+        url = f"{self.base_url}{path}"
+        if params:
+            url += "?" + urllib.parse.urlencode(params, doseq=True)
+        request = urllib.request.Request(url, headers={"Accept": "application/json"})
+        cached = self._responses.get(url)
+        if cached is not None:
+            request.add_header("If-None-Match", cached[0])
+        with perf_span("remote_request", path=path) as span:
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    payload = json.loads(response.read().decode("utf-8"))
+                    etag = response.headers.get("ETag")
+            except urllib.error.HTTPError as e:
+                if e.code == 304 and cached is not None:
+                    span["not_modified"] = True
+                    self._responses.move_to_end(url)
+                    return cached[1]
+                try:
+                    message = json.loads(e.read().decode("utf-8")).get("error", e.reason)
+                except Exception:
+                    message = e.reason
+                raise Exception(f"Erreur du service de requêtes ({e.code}) : {message}")
+            except urllib.error.URLError as e:
+                raise Exception(f"Service de requêtes injoignable ({self.base_url}) : {e.reason}")
+        if etag:
+            self._responses[url] = (etag, payload)
+            while len(self._responses) > RESPONSE_CACHE_SIZE:
+                self._responses.popitem(last=False)
+        return payload
+
+    def _filter_params(self, filter_texts):
+        """Paires "Colonne=texte" des filtres non vides (textes alignés sur les colonnes)."""
+        return [f"{column}={text}" for column, text in zip(self.columns, filter_texts) if text]
+
+    def info(self):
+        info = self._get("/api/info")
+        self.columns = info["columns"]
+        self.source = info["source"]
+        return info
+
+    def query(self, filter_texts, limit=None):
+        """(lignes filtrées, nombre total de lignes retenues par le service)."""
+        params = {"f": self._filter_params(filter_texts)}
+        if limit:
+            params["limit"] = limit
+        payload = self._get("/api/query", params)
+        df = frame_from_payload(payload)
+        df.attrs['source_file'] = self.source
+        return df, payload["meta"]["total"]
+
+    def values(self, column, filter_texts):
+        """(libellés, nombre de lignes, plus long libellé), pour BusinessLogic.column_catalog."""
+        payload = self._get(f"/api/values/{urllib.parse.quote(column)}",
+                            {"f": self._filter_params(filter_texts)})
+        return payload["labels"], payload["counts"], payload["longest"]
+
+    def lookup(self, value, columns):
+        """Lignes dont l'une des colonnes vaut value."""
+        payload = self._get("/api/lookup", {"value": value, "column": list(columns)})
+        return frame_from_payload(payload)
@@ -0,0 +1,285 @@
+# services/query_server.py
+"""
+Service HTTP/JSON de requêtes sur l'extraction OF, partagé entre postes.
+
+L'extraction est chargée une fois (cache colonnes) avec son moteur de
+filtrage ; les postes envoient leurs filtres et ne reçoivent que les lignes
+retenues. Aucune dépendance Qt : lancé par la ligne de commande
+
+    python -m package.cli serve --port 8765 --watch
+
+Routes (filtres f=Colonne=texte, répétables, comme dans l'application) :
+    GET /api/info                       colonnes, nombre de lignes, source
+    GET /api/query?f=...&offset=&limit= lignes filtrées
+    GET /api/values/<colonne>?f=...     valeurs distinctes et nombre de lignes
+    GET /api/lookup?value=...&column=   lignes dont une colonne vaut value
+
+Chaque réponse porte un ETag (version de l'extraction + requête, filtres
+résolus par colonne) : un client qui renvoie If-None-Match reçoit 304 sans
+recalcul. Les dernières réponses sont gardées en cache jusqu'au rechargement
+de l'extraction ; les réponses sont calculées hors du verrou, qui ne protège
+que le cache et l'extraction servie.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from package.extract_cache import cache_key
+from package.filter_engine import FilterEngine, find_column
+from package.perf import perf_span
+
+RESULT_CACHE_SIZE = 64
+DEFAULT_PORT = 8765
+
+
+# ----------------------------------------------------------------
+#  Format d'échange (partagé avec query_client)
+# ----------------------------------------------------------------
+
+def column_kind(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return "category"
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return "datetime"
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return "number"
+    return "text"
+
+
+def frame_to_json(df, **meta):
+    """Lignes de df + types de colonnes (pour les reconstruire côté client)."""
+    meta["kinds"] = {name: column_kind(df[name]) for name in df.columns}
+    frame = df.to_json(orient="split", index=False, date_format="iso", force_ascii=False)
+    return '{"meta": ' + json.dumps(meta, ensure_ascii=False) + ', "frame": ' + frame + '}'
+
+
+def frame_from_payload(payload):
+    """DataFrame reconstruite à partir d'une réponse frame_to_json décodée."""
+    frame = payload["frame"]
+    df = pd.DataFrame(frame["data"], columns=frame["columns"])
+    for name, kind in payload["meta"]["kinds"].items():
+        if kind == "datetime":
+            df[name] = pd.to_datetime(df[name])
+        elif kind == "number":
+            df[name] = pd.to_numeric(df[name])
+        elif kind == "category":
+            df[name] = df[name].astype("category")
+    return df
+
+
+# ----------------------------------------------------------------
+#  Service
+# ----------------------------------------------------------------
+
+class ExtractQueryService:
+    def __init__(self, df, cache_size=RESULT_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+        self.df = None
+        self.engine = None
+        self.version = ""
+        self.set_extract(df)
+
+    def set_extract(self, df):
+        """Installe (ou remplace) l'extraction servie ; vide le cache des réponses."""
+        engine = FilterEngine(df)
+        engine.build_indexes()
+        source = df.attrs.get('source_file', '')
+        try:
+            identity = json.dumps(cache_key(source), sort_keys=True)
+        except OSError:
+            identity = f"{source}:{len(df)}:{id(df)}"
+        with self._lock:
+            self.df = df
+            self.engine = engine
+            self.version = hashlib.sha1(identity.encode("utf-8")).hexdigest()[:12]
+            self._results.clear()
+
+    def filter_texts(self, filters):
+        """Textes de filtre par colonne à partir de paires "Colonne=texte"."""
+        columns = self.engine.columns
+        texts = [""] * len(columns)
+        for item in filters:
+            if "=" not in item:
+                raise ValueError(f"Filtre invalide : {item} (attendu Colonne=texte)")
+            name, text = item.split("=", 1)
+            column = find_column(columns, name)
+            if column is None:
+                raise ValueError(f"Colonne inconnue : {name}")
+            texts[columns.index(column)] = text
+        return texts
+
+    def etag(self, request_key):
+        digest = hashlib.sha1(json.dumps(request_key, ensure_ascii=False).encode("utf-8")).hexdigest()
+        return f'"{self.version}-{digest[:16]}"'
+
+    def respond(self, request_key, build):
+        """
+        (etag, corps JSON) de la requête, depuis le cache si possible.
+        build() est appelé sans tenir le verrou : des requêtes différentes
+        sont calculées en parallèle.
+        """
+        with self._lock:
+            version = self.version
+            etag = self.etag(request_key)
+            body = self._results.get(etag)
+            if body is not None:
+                self._results.move_to_end(etag)
+                return etag, body
+        body = build()
+        with self._lock:
+            # Extraction remplacée pendant le calcul : réponse non mémorisée
+            if self.version == version:
+                self._results[etag] = body
+                while len(self._results) > self.cache_size:
+                    self._results.popitem(last=False)
+        return etag, body
+
+    def _current(self):
+        """(df, moteur) cohérents, même si set_extract intervient pendant un calcul."""
+        with self._lock:
+            return self.df, self.engine
+
+    # -- Réponses -----------------------------------------------------
+
+    def info(self):
+        with self._lock:
+            df, engine, version = self.df, self.engine, self.version
+        return json.dumps({
+            "columns": engine.columns,
+            "rows": len(df),
+            "source": str(df.attrs.get('source_file', '')),
+            "version": version,
+        }, ensure_ascii=False)
+
+    def query(self, texts, offset=0, limit=None):
+        df, engine = self._current()
+        with perf_span("server_query", filters=sum(1 for t in texts if t)) as span:
+            positions = np.flatnonzero(engine.compute_mask(texts))
+            total = len(positions)
+            end = None if limit is None else offset + limit
+            rows = df.iloc[positions[offset:end]]
+            span["rows"] = len(rows)
+            return frame_to_json(rows, total=total, offset=offset)
+
+    def values(self, column, texts):
+        _, engine = self._current()
+        index = engine.columns.index(column)
+        catalog = engine.catalogs[index]
+        labels, counts = catalog.value_counts(engine.compute_mask(texts))
+        return json.dumps({
+            "labels": [str(label) for label in labels],
+            "counts": counts.tolist(),
+            "longest": catalog.longest_label,
+        }, ensure_ascii=False)
+
+    def lookup(self, value, columns):
+        df, _ = self._current()
+        mask = np.zeros(len(df), dtype=bool)
+        for column in columns:
+            mask |= (df[column].astype(str) == value).to_numpy()
+        return frame_to_json(df[mask], total=int(mask.sum()), offset=0)
+
+
+# ----------------------------------------------------------------
+#  Application bottle
+# ----------------------------------------------------------------
+
+def create_app(service):
+    """Application WSGI (bottle) exposant service."""
+    import bottle
+
+    app = bottle.Bottle()
+
+    def json_error(status, message):
+        bottle.response.status = status
+        bottle.response.content_type = "application/json; charset=utf-8"
+        return json.dumps({"error": message}, ensure_ascii=False)
+
+    def conditional(request_key, build):
+        # L'ETag ne dépend que de la version et de la requête : un client à
+        # jour reçoit 304 sans que la réponse soit recalculée
+        etag = service.etag(request_key)
+        bottle.response.set_header("Cache-Control", "no-cache")
+        if etag in bottle.request.headers.get("If-None-Match", ""):
+            bottle.response.set_header("ETag", etag)
+            bottle.response.status = 304
+            return ""
+        try:
+            etag, body = service.respond(request_key, build)
+        except ValueError as e:
+            return json_error(400, str(e))
+        bottle.response.set_header("ETag", etag)
+        bottle.response.content_type = "application/json; charset=utf-8"
+        return body
+
+    def query_params():
+        # Paramètres décodés en UTF-8 (bottle les fournit en latin-1)
+        return bottle.request.query.decode()
+
+    def int_param(params, name, default=None):
+        value = params.get(name)
+        if value in (None, ""):
+            return default
+        try:
+            return max(int(value), 0)
+        except ValueError:
+            raise bottle.HTTPError(400, f"Paramètre {name} invalide : {value}")
+
+    @app.get("/api/info")
+    def info():
+        return conditional(["info"], service.info)
+
+    @app.get("/api/query")
+    def query():
+        params = query_params()
+        offset = int_param(params, "offset", 0)
+        limit = int_param(params, "limit")
+        try:
+            # Clé sur les textes résolus par colonne (colonne répétée : le dernier l'emporte)
+            texts = service.filter_texts(params.getall("f"))
+        except ValueError as e:
+            return json_error(400, str(e))
+        key = ["query", texts, offset, limit]
+        return conditional(key, lambda: service.query(texts, offset, limit))
+
+    @app.get("/api/values/<column>")
+    def values(column):
+        params = query_params()
+        column = find_column(service.engine.columns, column)
+        if column is None:
+            raise bottle.HTTPError(404, "Colonne inconnue")
+        try:
+            texts = service.filter_texts(params.getall("f"))
+        except ValueError as e:
+            return json_error(400, str(e))
+        key = ["values", column, texts]
+        return conditional(key, lambda: service.values(column, texts))
+
+    @app.get("/api/lookup")
+    def lookup():
+        params = query_params()
+        value = params.get("value", "")
+        columns = []
+        for name in params.getall("column") or ["OF"]:
+            column = find_column(service.engine.columns, name)
+            if column is None:
+                raise bottle.HTTPError(400, f"Colonne inconnue : {name}")
+            columns.append(column)
+        key = ["lookup", value, columns]
+        return conditional(key, lambda: service.lookup(value, columns))
+
+    return app
+
+
+def serve(service, host="127.0.0.1", port=DEFAULT_PORT):
+    """Lance le service (bloquant)."""
+    import bottle
+    print(f"Service de requêtes sur http://{host}:{port}/api/info")
+    bottle.run(create_app(service), host=host, port=port, quiet=True)
@@ -1,4 +1,4 @@
-from fbs_runtime.application_context.PySide6 import ApplicationContext
+from pathlib import Path
 
 class AppContext:
     _instance = None
@@ -6,6 +6,29 @@ class AppContext:
     @classmethod
     def get(cls):
         if not cls._instance:
+            # Import différé : fbs charge PySide6 (inutile en ligne de commande)
+            from fbs_runtime.application_context.PySide6 import ApplicationContext
             cls._instance = ApplicationContext()
         return cls._instance
 
+
+# Dossier des ressources fixé sans contexte fbs (ligne de commande, batch)
+_resources_dir = None
+# Ressources de l'arborescence source (src/main/resources/base/Fichies_config)
+SOURCE_RESOURCES_DIR = Path(__file__).resolve().parents[2] / "resources" / "base" / "Fichies_config"
+
+
+def set_resources_dir(path):
+    """Utilise path comme dossier Fichies_config, sans créer d'AppContext."""
+    global _resources_dir
+    _resources_dir = Path(path)
+
+
+def get_resources_dir():
+    """
+    Dossier Fichies_config des ressources. À appeler au moment de l'usage
+    (et non à l'import d'un module) pour ne pas créer l'AppContext trop tôt.
+    """
+    if _resources_dir is not None:
+        return _resources_dir
+    return Path(AppContext.get().get_resource('Fichies_config/dummy.txt')).parent
@@ -1,27 +1,95 @@
 # services/sap_service.py
 
+import atexit
 import subprocess
-from pathlib import Path
-from  package.resourcesPath import AppContext
+from package.job_control import ActionCancelled, run_process
+from package.resourcesPath import get_resources_dir
+from package.sap_worker import SapWorkerClient, SapWorkerError, SapWorkerStartError, SapTransactionError
+from package.settings import get_setting
+from package.perf import perf_span
 
-ctx = AppContext.get()
-resources_dir = ctx.get_resource('Fichies_config/dummy.txt')
+_sap_worker = None
+
+def get_sap_worker():
+    """Worker SAP partagé, arrêté à la fermeture de l'application."""
+    global _sap_worker
+    if _sap_worker is None:
+        command = get_setting("sap_worker_command")
+        if not command:
+            worker_path = get_resources_dir() / "SAPWorker.vbs"
+            command = ["cscript", "//NoLogo", str(worker_path)]
+        _sap_worker = SapWorkerClient(command)
+        atexit.register(_sap_worker.stop)
+    return _sap_worker
 
 def run_sap_transaction(arg1, arg2):
-    """Exécute TransactionSAP.vbs avec les arguments donnés."""
+    """Exécute la transaction via le worker persistant (si activé) ou TransactionSAP.vbs."""
+    with perf_span("sap_transaction", transaction=arg1) as span:
+        span["mode"] = _run_sap_transaction(arg1, arg2)
+
+def _run_sap_transaction(arg1, arg2):
+    """Retourne le mode d'exécution utilisé ("worker" ou "cscript")."""
+    if get_setting("sap_worker"):
+        try:
+            get_sap_worker().run_transaction(arg1, arg2)
+            return "worker"
+        except SapTransactionError as e:
+            raise Exception(f"Erreur d'exécution SAP : {str(e)}")
+        except SapWorkerStartError as e:
+            # Worker non démarré, transaction pas encore envoyée : exécution directe
+            print(f"Worker SAP indisponible, exécution directe : {e}")
+        except SapWorkerError as e:
+            # Délai dépassé ou arrêt en cours de transaction : pas de nouvelle exécution
+            raise Exception(f"Erreur du worker SAP : {str(e)}")
+
     try:
         # Chemin d'accès au script VBS dans le dossier parent du parent
-        vbs_path = Path(resources_dir).parent / "TransactionSAP.vbs"
+        vbs_path = get_resources_dir() / "TransactionSAP.vbs"
         if not vbs_path.exists():
             raise FileNotFoundError("Fichier TransactionSAP.vbs introuvable !")
 
-        subprocess.run(
+        # Arrêté si l'action est annulée ou dépasse son délai (action_executor)
+        run_process(
             ["cscript", str(vbs_path), arg1, arg2],
-            check=True,
             shell=True,
             encoding='utf-8'
         )
+        return "cscript"
     except subprocess.CalledProcessError as e:
         raise Exception(f"Erreur d'exécution VBS : {str(e)}")
+    except ActionCancelled:
+        raise
     except Exception as e:
         raise Exception(f"Erreur inattendue SAP : {str(e)}")
+
+def run_bom_capture(reference):
+    """
+    Capture la nomenclature ZP20 de reference dans data_ref.json et retourne
+    le chemin du fichier : extracteur Python (zp20_extractor) si activé,
+    sinon (ou s'il échoue) Transaction.vbs.
+    """
+    json_path = get_resources_dir() / "data_ref.json"
+    if get_setting("bom_capture_python"):
+        try:
+            from package.zp20_extractor import SapGuiSession, extract_bom
+            extract_bom(SapGuiSession(), reference, json_path)
+            return json_path
+        except ActionCancelled:
+            raise
+        except Exception as e:
+            print(f"Extraction ZP20 Python impossible, exécution de Transaction.vbs : {e}")
+
+    vbs_path = get_resources_dir() / "Transaction.vbs"
+    previous_mtime = json_path.stat().st_mtime_ns if json_path.exists() else None
+    with perf_span("bom_capture", reference=reference):
+        try:
+            run_process(
+                ["cscript", str(vbs_path), reference],
+                shell=True,
+                encoding='utf-8'
+            )
+        except subprocess.CalledProcessError as e:
+            raise Exception(f"Erreur d'exécution VBS : {str(e)}")
+    if not json_path.exists() or json_path.stat().st_mtime_ns == previous_mtime:
+        raise Exception(f"Nomenclature de {reference} non capturée (data_ref.json inchangé).")
+    return json_path
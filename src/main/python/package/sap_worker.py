@@ -0,0 +1,227 @@
+# services/sap_worker.py
+"""
+Client du worker SAP persistant (SAPWorker.vbs).
+
+Le worker est lancé une fois, se rattache à la session SAP, puis reçoit les
+transactions sous forme de lignes JSON sur son entrée standard. Le client
+vérifie régulièrement qu'il répond (ping) et le relance automatiquement
+s'il s'est arrêté ou ne répond plus.
+
+Appelé depuis un job de l'exécuteur d'actions, l'attente d'une réponse
+s'interrompt si le job est annulé ou dépasse son délai : le worker est alors
+arrêté (comme cscript par job_control.run_process) et relancé à la requête
+suivante.
+"""
+
+import itertools
+import json
+import queue
+import subprocess
+import threading
+import time
+
+from package.job_control import ActionCancelled, check_cancelled
+
+
+class SapWorkerError(Exception):
+    """Worker indisponible : arrêt, délai dépassé, démarrage impossible."""
+    pass
+
+
+class SapWorkerStartError(SapWorkerError):
+    """Démarrage du worker impossible : aucune requête ne lui a été envoyée."""
+    pass
+
+
+class SapWorkerTimeout(SapWorkerError):
+    """Le worker n'a pas répondu dans le délai imparti."""
+    pass
+
+
+class SapTransactionError(SapWorkerError):
+    """Le worker répond mais la transaction a échoué dans SAP."""
+    pass
+
+
+class SapWorkerClient:
+    def __init__(self, command, timeout=120.0, ping_timeout=5.0, start_timeout=60.0,
+                 ping_interval=30.0, encoding="utf-8"):
+        """
+        :param command: ligne de commande du worker (ex. ["cscript", "//NoLogo", "SAPWorker.vbs"])
+        :param timeout: délai maximal d'exécution d'une transaction (s)
+        :param ping_interval: au-delà de ce délai d'inactivité, un ping précède la requête
+        """
+        self.command = list(command)
+        self.timeout = timeout
+        self.ping_timeout = ping_timeout
+        self.start_timeout = start_timeout
+        self.ping_interval = ping_interval
+        self.encoding = encoding
+        self.process = None
+        self._responses = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._last_exchange = 0.0
+
+    # ----------------------------------------------------------------
+    #  Cycle de vie du processus
+    # ----------------------------------------------------------------
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        """
+        Lance le worker et attend qu'il signale être rattaché à SAP.
+        Lève SapWorkerStartError si le worker ne démarre pas.
+        """
+        self.stop()
+        self._responses = queue.Queue()
+        try:
+            self.process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                encoding=self.encoding,
+                errors="replace",
+                bufsize=1,
+            )
+        except OSError as e:
+            raise SapWorkerStartError(f"Démarrage du worker SAP impossible : {e}")
+        threading.Thread(
+            target=self._read_stdout, args=(self.process, self._responses), daemon=True
+        ).start()
+
+        try:
+            message = self._wait_for(lambda m: m.get("event") == "ready" or "id" in m, self.start_timeout)
+        except SapWorkerError as e:
+            self.stop()
+            raise SapWorkerStartError(f"Démarrage du worker SAP impossible : {e}")
+        if message.get("event") != "ready":
+            self.stop()
+            raise SapWorkerStartError(f"Démarrage du worker SAP impossible : {message.get('error', message)}")
+        self._last_exchange = time.monotonic()
+
+    def stop(self, force=False):
+        """Arrête le worker ; force : sans lui demander de quitter (worker bloqué)."""
+        if self.process is None:
+            return
+        if self.is_alive() and not force:
+            try:
+                self.process.stdin.write(json.dumps({"id": 0, "cmd": "quit"}) + "\n")
+                self.process.stdin.flush()
+                self.process.wait(timeout=2)
+            except Exception:
+                pass
+        if self.is_alive():
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def restart(self):
+        print("Redémarrage du worker SAP.")
+        self.start()
+
+    # ----------------------------------------------------------------
+    #  Requêtes
+    # ----------------------------------------------------------------
+
+    def ping(self):
+        """Vrai si le worker répond et que sa session SAP est disponible."""
+        if not self.is_alive():
+            return False
+        try:
+            return self._request({"cmd": "ping"}, self.ping_timeout).get("ok", False)
+        except SapWorkerError:
+            return False
+
+    def ensure_running(self):
+        """Démarre ou relance le worker si besoin (processus arrêté ou ping en échec)."""
+        if not self.is_alive():
+            self.start()
+        elif time.monotonic() - self._last_exchange > self.ping_interval and not self.ping():
+            self.restart()
+
+    def run_transaction(self, transaction, value=""):
+        """
+        Exécute une transaction (/nzp20, /nmd04, ...) dans la session SAP du worker.
+        Une seule nouvelle tentative est faite après relance si le worker s'est
+        arrêté ; un délai dépassé n'est pas rejoué.
+
+        SapWorkerStartError n'est levée que si le worker n'a pas pu démarrer
+        avant l'envoi de la transaction : elle seule permet de l'exécuter
+        autrement (TransactionSAP.vbs) sans risque de la jouer deux fois.
+        """
+        with self._lock:
+            self.ensure_running()
+            payload = {"cmd": "run", "transaction": transaction, "value": value}
+            try:
+                response = self._request(payload, self.timeout)
+            except SapWorkerTimeout:
+                raise
+            except SapWorkerError:
+                try:
+                    self.restart()
+                except SapWorkerStartError as e:
+                    # Transaction déjà envoyée : elle a pu être exécutée en partie
+                    raise SapWorkerError(f"Le worker SAP s'est arrêté pendant la transaction : {e}")
+                response = self._request(payload, self.timeout)
+
+        if not response.get("ok"):
+            raise SapTransactionError(response.get("error", "Erreur inconnue du worker SAP"))
+        return response
+
+    def _request(self, payload, timeout):
+        if not self.is_alive():
+            raise SapWorkerError("Le worker SAP n'est pas démarré.")
+        request_id = next(self._ids)
+        message = dict(payload, id=request_id)
+        try:
+            self.process.stdin.write(json.dumps(message) + "\n")
+            self.process.stdin.flush()
+        except OSError as e:
+            raise SapWorkerError(f"Worker SAP injoignable : {e}")
+
+        try:
+            response = self._wait_for(lambda m: m.get("id") == request_id, timeout)
+        except SapWorkerError:
+            # Réponse perdue ou worker bloqué : on l'arrête, il sera relancé
+            self.stop()
+            raise
+        self._last_exchange = time.monotonic()
+        return response
+
+    def _wait_for(self, predicate, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise SapWorkerTimeout("Le worker SAP ne répond pas (délai dépassé).")
+            try:
+                message = self._responses.get(timeout=min(remaining, 0.5))
+            except queue.Empty:
+                if not self.is_alive():
+                    raise SapWorkerError("Le worker SAP s'est arrêté.")
+                try:
+                    check_cancelled()
+                except ActionCancelled:
+                    # Job annulé ou délai de l'action dépassé : la transaction
+                    # en cours est abandonnée avec le worker
+                    self.stop(force=True)
+                    raise
+                continue
+            if predicate(message):
+                return message
+
+    @staticmethod
+    def _read_stdout(process, responses):
+        for line in process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                responses.put(json.loads(line))
+            except json.JSONDecodeError:
+                # Sortie parasite (messages cscript, etc.)
+                print(f"Worker SAP : {line}")
@@ -0,0 +1,59 @@
+# services/sap_worker_stub.py
+"""
+Worker SAP factice, même protocole que SAPWorker.vbs, sans SAP ni Windows.
+Permet de tester SapWorkerClient (ex. python -m package.sap_worker_stub).
+
+Valeurs spéciales pour simuler les incidents :
+  "__error__" -> réponse en erreur, "__hang__" -> ne répond plus,
+  "__crash__" -> arrêt brutal du processus.
+"""
+
+import json
+import sys
+import time
+
+KNOWN_TRANSACTIONS = {
+    "/nzp20", "/ncs03", "/nmd04", "/nls24", "/ncs15", "/nmb51",
+    "/ncoois_ref", "/ncoois_of", "/nmcbz", "/nzpan", "nom_inter",
+}
+
+
+def reply(message):
+    sys.stdout.write(json.dumps(message) + "\n")
+    sys.stdout.flush()
+
+
+def main():
+    reply({"event": "ready"})
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        request_id = request.get("id", 0)
+        command = request.get("cmd")
+
+        if command == "ping":
+            reply({"id": request_id, "ok": True})
+        elif command == "quit":
+            reply({"id": request_id, "ok": True})
+            break
+        elif command == "run":
+            transaction = request.get("transaction", "").lower()
+            value = request.get("value", "")
+            if value == "__crash__":
+                sys.exit(1)
+            if value == "__hang__":
+                time.sleep(3600)
+            if value == "__error__":
+                reply({"id": request_id, "ok": False, "error": "Erreur simulée"})
+            elif transaction not in KNOWN_TRANSACTIONS:
+                reply({"id": request_id, "ok": False,
+                       "error": f"Code transaction inconnu : {transaction}"})
+            else:
+                reply({"id": request_id, "ok": True})
+        else:
+            reply({"id": request_id, "ok": False, "error": f"Commande inconnue : {command}"})
+
+
+if __name__ == "__main__":
+    main()
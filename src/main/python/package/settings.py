@@ -0,0 +1,59 @@
+# services/settings.py
+
+import json
+
+from package.resourcesPath import get_resources_dir
+
+# Valeurs utilisées si app_settings.json est absent ou incomplet
+DEFAULT_SETTINGS = {
+    # Dossier réseau où SAP dépose extraction_OF_du_dd_mm_yyyy.xls
+    "extract_source_dir": "W:/CHARGE_SAP/Extraction_OF",
+    # Conserver une copie .xlsx locale (conversion via Excel) en plus du cache
+    "keep_xlsx_copy": False,
+    # Worker SAP persistant (SAPWorker.vbs) au lieu d'un cscript par action
+    "sap_worker": False,
+    # Commande du worker ; vide = cscript SAPWorker.vbs (ex. worker factice pour les tests)
+    "sap_worker_command": None,
+    # Journal des mesures de durée (Fichies_config/logs/perf_spans.jsonl)
+    "perf_log": True,
+    # Colonnes répétitives (Référence, Client...) encodées en catégories
+    "compact_columns": True,
+    # Nombre de jours d'extractions conservés dans Fichies_config/history
+    # (0 : aucune suppression, tout l'historique est conservé)
+    "history_days": 30,
+    # Surveillance du dossier des extractions (vide = extract_source_dir)
+    "watch_extract": True,
+    "watch_extract_dir": None,
+    "watch_interval_s": 60,
+    # Service de requêtes partagé (ex. "http://serveur:8765") ; vide = chargement local
+    "query_server_url": None,
+    "query_server_row_limit": 20000,
+    # Nomenclatures ZP20 capturées : réutilisées pendant bom_max_age_hours
+    "bom_max_age_hours": 24,
+    # Capture ZP20 en Python (SAP GUI Scripting) ; false = Transaction.vbs
+    "bom_capture_python": True,
+    # Exécution des actions en arrière-plan : jobs simultanés et délai (s) par cible
+    "action_concurrency": {"SAP": 1, "IPR": 2, "Office": 1},
+    "action_timeouts_s": {"SAP": 300, "IPR": 120, "Office": 120},
+}
+
+_settings = None
+
+
+def load_settings(filename="app_settings.json"):
+    """Paramètres de l'application (Fichies_config/app_settings.json + valeurs par défaut)."""
+    global _settings
+    if _settings is None:
+        json_path = get_resources_dir() / filename
+        _settings = dict(DEFAULT_SETTINGS)
+        if json_path.exists():
+            try:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    _settings.update(json.load(f))
+            except Exception as e:
+                print(f"Paramètres illisibles ({json_path.name}) : {e}")
+    return _settings
+
+
+def get_setting(name):
+    return load_settings().get(name, DEFAULT_SETTINGS.get(name))
@@ -0,0 +1,175 @@
+# gui/table_model.py
+
+import numpy as np
+import pandas as pd
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import QTableView
+
+from package.perf import perf_span
+from package.extract_diff import ADDED
+
+# Couleurs des changements par rapport à l'extraction précédente
+ADDED_ROW_COLOR = QColor("#d4edda")
+CHANGED_CELL_COLOR = QColor("#ffe0b2")
+
+
+class DataFrameTableModel(QAbstractTableModel):
+    """
+    Modèle virtuel adossé à un DataFrame.
+    Les valeurs sont lues directement dans les tableaux de colonnes au moment
+    où la vue les demande : seules les cellules visibles sont converties en texte.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._df = pd.DataFrame()
+        self._headers = []
+        self._columns = []
+        self._datetime_columns = set()
+        # colonne catégorielle -> catégories (+ NaN en dernière position pour le code -1)
+        self._category_tables = {}
+        self._row_count = 0
+        # Statut (nouvelle/modifiée) et cellules modifiées de chaque ligne affichée
+        self._row_status = None
+        self._changed = None
+        self._diff_label = ""
+
+    def set_dataframe(self, df, row_status=None, changed=None, diff_label=""):
+        """
+        Remplace les données affichées (simple reset du modèle, sans reconstruction).
+        row_status / changed (optionnels) : comparaison avec l'extraction
+        précédente, alignée sur les lignes de df, pour la surbrillance.
+        """
+        self.beginResetModel()
+        self._df = df
+        self._row_status = row_status
+        self._changed = changed
+        self._diff_label = diff_label
+        self._headers = [str(col) for col in df.columns]
+        self._columns = []
+        self._category_tables = {}
+        for i in range(len(df.columns)):
+            series = df.iloc[:, i]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # Codes conservés tels quels : pas de matérialisation des chaînes
+                self._columns.append(series.cat.codes.to_numpy())
+                self._category_tables[i] = np.append(series.cat.categories.to_numpy(dtype=object), np.nan)
+            else:
+                self._columns.append(series.to_numpy())
+        self._datetime_columns = {
+            i for i in range(len(df.columns))
+            if pd.api.types.is_datetime64_any_dtype(df.iloc[:, i].dtype)
+        }
+        self._row_count = len(df)
+        self.endResetModel()
+
+    def dataframe(self):
+        return self._df
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def cell_text(self, row, column):
+        """Texte d'une cellule, identique à str(valeur) sur la ligne du DataFrame."""
+        value = self._columns[column][row]
+        if column in self._category_tables:
+            value = self._category_tables[column][value]
+        elif column in self._datetime_columns:
+            # to_numpy() renvoie des datetime64 : on repasse par Timestamp
+            # pour conserver le format "AAAA-MM-JJ HH:MM:SS" habituel
+            value = pd.Timestamp(value)
+        return str(value)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.cell_text(index.row(), index.column())
+        if role == Qt.TextAlignmentRole:
+            if self._headers[index.column()] == "DateFinOF":
+                return int(Qt.AlignCenter)
+            return int(Qt.AlignLeft | Qt.AlignVCenter)
+        if role in (Qt.BackgroundRole, Qt.ToolTipRole) and self._row_status is not None:
+            return self._diff_data(index.row(), index.column(), role)
+        return None
+
+    def _diff_data(self, row, column, role):
+        since = f" depuis l'extraction du {self._diff_label}" if self._diff_label else ""
+        if self._row_status[row] == ADDED:
+            return ADDED_ROW_COLOR if role == Qt.BackgroundRole else f"Nouvelle ligne{since}"
+        if self._changed[row, column]:
+            return CHANGED_CELL_COLOR if role == Qt.BackgroundRole else f"Valeur modifiée{since}"
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            if 0 <= section < len(self._headers):
+                return self._headers[section]
+            return None
+        return str(section + 1)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        # Cellules sélectionnables mais non éditables
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+
+class LazyRowHeightTableView(QTableView):
+    """
+    QTableView qui ajuste la hauteur des lignes à leur contenu uniquement
+    pour les lignes visibles (au lieu de resizeRowsToContents sur tout le tableau).
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWordWrap(True)
+        self._measured_rows = set()
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.timeout.connect(self.resize_visible_rows)
+        self.verticalScrollBar().valueChanged.connect(self.schedule_resize_visible_rows)
+
+    def setModel(self, model):
+        super().setModel(model)
+        model.modelReset.connect(self._on_model_reset)
+
+    def _on_model_reset(self):
+        self._measured_rows.clear()
+        self.schedule_resize_visible_rows()
+
+    def schedule_resize_visible_rows(self, *args):
+        self._resize_timer.start(0)
+
+    def resize_visible_rows(self):
+        """Mesure les lignes visibles qui ne l'ont pas encore été."""
+        model = self.model()
+        if model is None or model.rowCount() == 0:
+            return
+        first = self.rowAt(0)
+        if first < 0:
+            return
+        last = self.rowAt(self.viewport().height() - 1)
+        if last < 0:
+            last = model.rowCount() - 1
+        # Quelques lignes d'avance pour un défilement fluide
+        last = min(last + 10, model.rowCount() - 1)
+        rows = [row for row in range(first, last + 1) if row not in self._measured_rows]
+        if rows:
+            with perf_span("row_heights", rows=len(rows)):
+                for row in rows:
+                    self._measured_rows.add(row)
+                    self.resizeRowToContents(row)
+        # Si des lignes ont rétréci, de nouvelles lignes sont devenues visibles
+        new_last = self.rowAt(self.viewport().height() - 1)
+        if new_last >= 0 and new_last not in self._measured_rows:
+            self.schedule_resize_visible_rows()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.schedule_resize_visible_rows()
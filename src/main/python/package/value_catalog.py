@@ -0,0 +1,53 @@
+# business/value_catalog.py
+
+import numpy as np
+
+
+class ValueCatalog:
+    """
+    Catalogue des valeurs distinctes d'une colonne (listes des FilterBox).
+
+    Construit une seule fois au chargement à partir des codes de factorisation
+    du moteur de filtrage : libellés triés, plus long libellé, et comptage des
+    lignes par valeur. Restreindre le catalogue à un masque de filtre revient
+    à un simple bincount sur les codes des lignes retenues.
+
+    Les libellés normalisés du moteur (search_labels) sont conservés pour la
+    recherche dans les listes, sans renormaliser à chaque ouverture.
+    """
+    def __init__(self, labels, codes, missing_code=None, search_labels=None):
+        """
+        :param labels: libellé affiché de chaque code
+        :param codes: code de chaque ligne de la colonne
+        :param missing_code: code des cellules vides, exclu du catalogue
+        :param search_labels: libellé normalisé (normalize_text) de chaque code
+        """
+        self.labels = np.asarray(labels, dtype=object)
+        self.search_labels = None if search_labels is None else np.asarray(search_labels, dtype=str)
+        self.codes = codes
+        self.missing_code = missing_code
+        order = np.argsort(self.labels.astype(str), kind="stable")
+        if missing_code is not None:
+            order = order[order != missing_code]
+        self.sorted_codes = order
+        self.longest_label = max((str(label) for label in self.labels[order]), key=len, default="")
+
+    def value_counts(self, mask=None):
+        """
+        Libellés triés et nombre de lignes de chacun, limités aux lignes du
+        masque (toutes les lignes si mask est None).
+        """
+        labels, _, counts = self.value_entries(mask)
+        return labels, counts
+
+    def value_entries(self, mask=None):
+        """
+        Comme value_counts, avec les libellés normalisés correspondants :
+        (libellés, libellés normalisés ou None, nombres de lignes).
+        """
+        codes = self.codes if mask is None else self.codes[mask]
+        counts = np.bincount(codes, minlength=len(self.labels))[self.sorted_codes]
+        present = counts > 0
+        kept = self.sorted_codes[present]
+        search_labels = None if self.search_labels is None else self.search_labels[kept]
+        return self.labels[kept], search_labels, counts[present]
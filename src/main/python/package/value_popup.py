@@ -0,0 +1,144 @@
+# gui/value_popup.py
+
+import numpy as np
+
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, Signal
+from PySide6.QtWidgets import QFrame, QVBoxLayout, QLineEdit, QListView
+
+from package.filter_engine import normalize_text
+
+
+class ValueListModel(QAbstractListModel):
+    """
+    Modèle virtuel des valeurs d'un catalogue : seules les lignes visibles
+    sont converties en texte. La recherche restreint la liste par sous-chaîne
+    (sans accents ni casse) sur les libellés normalisés : ceux du catalogue
+    (FilterEngine) quand ils sont fournis, sinon calculés à la première
+    recherche.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._labels = np.array([], dtype=object)
+        self._counts = np.array([], dtype=np.int64)
+        self._search_labels = None
+        self._rows = np.array([], dtype=np.int64)
+
+    def set_values(self, labels, counts, search_labels=None):
+        """
+        :param search_labels: libellés normalisés (normalize_text), alignés sur
+            labels ; None pour les calculer à la première recherche
+        """
+        self.beginResetModel()
+        self._labels = np.asarray(labels, dtype=object)
+        self._counts = np.asarray(counts)
+        self._search_labels = None if search_labels is None else np.asarray(search_labels, dtype=str)
+        self._rows = np.arange(len(self._labels))
+        self.endResetModel()
+
+    def set_search_text(self, text):
+        self.beginResetModel()
+        needle = normalize_text(text)
+        if needle and len(self._labels):
+            if self._search_labels is None:
+                self._search_labels = np.array([normalize_text(v) for v in self._labels], dtype=str)
+            self._rows = np.flatnonzero(np.char.find(self._search_labels, needle) >= 0)
+        else:
+            self._rows = np.arange(len(self._labels))
+        self.endResetModel()
+
+    def value(self, row):
+        return str(self._labels[self._rows[row]])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            position = self._rows[index.row()]
+            return f"{self._labels[position]}  ({self._counts[position]})"
+        if role == Qt.UserRole:
+            return self.value(index.row())
+        return None
+
+
+class ValuePopup(QFrame):
+    """
+    Liste déroulante des valeurs d'une colonne, avec champ de recherche.
+    Remplace le QComboBox des filtres : la liste est virtualisée, l'ouverture
+    ne dépend plus du nombre de valeurs.
+    """
+    valueSelected = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.Popup)
+        self.setFrameStyle(QFrame.Box)
+        self.setStyleSheet("""
+        QFrame { background-color: #1e1e1e; border: 1px solid #555; }
+        QLineEdit {
+            background-color: #2b2b2b; color: white;
+            border: 1px solid #555; border-radius: 4px; padding: 4px;
+        }
+        QListView {
+            background-color: #1e1e1e; color: white; border: none;
+            selection-background-color: #404040;
+        }
+        """)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(2, 2, 2, 2)
+        layout.setSpacing(2)
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Rechercher...")
+        self.search_input.textChanged.connect(self.on_search_changed)
+        self.search_input.returnPressed.connect(self.select_current)
+        layout.addWidget(self.search_input)
+
+        self.model = ValueListModel(self)
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        # Hauteur de ligne fixe : la vue ne mesure pas chaque élément
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.clicked.connect(self.on_item_clicked)
+        self.list_view.activated.connect(self.on_item_clicked)
+        layout.addWidget(self.list_view)
+
+    def show_values(self, labels, counts, longest_label, anchor, min_width, search_labels=None):
+        """Affiche la liste sous anchor (QWidget) ; largeur tirée du plus long libellé."""
+        self.model.set_values(labels, counts, search_labels)
+        self.search_input.blockSignals(True)
+        self.search_input.clear()
+        self.search_input.blockSignals(False)
+
+        max_count = max(counts) if len(counts) else 0
+        text_width = self.fontMetrics().horizontalAdvance(f"{longest_label}  ({max_count})")
+        self.resize(max(text_width + 40, min_width), 300)
+        self.move(anchor.mapToGlobal(anchor.rect().bottomLeft()))
+        self.show()
+        self.search_input.setFocus()
+        if self.model.rowCount():
+            self.list_view.setCurrentIndex(self.model.index(0))
+
+    def on_search_changed(self, text):
+        self.model.set_search_text(text)
+        if self.model.rowCount():
+            self.list_view.setCurrentIndex(self.model.index(0))
+
+    def select_current(self):
+        index = self.list_view.currentIndex()
+        if index.isValid():
+            self.on_item_clicked(index)
+
+    def on_item_clicked(self, index):
+        value = self.model.value(index.row())
+        self.hide()
+        self.valueSelected.emit(value)
+
+    def keyPressEvent(self, event):
+        # Flèches depuis le champ de recherche : navigation dans la liste
+        if event.key() in (Qt.Key_Down, Qt.Key_Up, Qt.Key_PageDown, Qt.Key_PageUp):
+            self.list_view.setFocus()
+            self.list_view.keyPressEvent(event)
+            return
+        super().keyPressEvent(event)
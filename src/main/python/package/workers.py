@@ -0,0 +1,62 @@
+# gui/workers.py
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+
+class DataLoadSignals(QObject):
+    """Signaux émis par DataLoadWorker (reçus dans le thread GUI)."""
+    progress = Signal(str)
+    preview = Signal(object)
+    finished = Signal()
+    error = Signal(str)
+
+
+class DataLoadWorker(QRunnable):
+    """
+    Charge l'extraction (BusinessLogic.load_data) dans un thread du QThreadPool
+    pour ne pas figer la fenêtre pendant l'analyse du fichier.
+    """
+    def __init__(self, logic):
+        super().__init__()
+        self.logic = logic
+        self.signals = DataLoadSignals()
+
+    def run(self):
+        try:
+            self.logic.load_data(
+                on_preview=self.signals.preview.emit,
+                on_progress=self.signals.progress.emit
+            )
+        except Exception as e:
+            self.signals.error.emit(str(e))
+            return
+        self.signals.finished.emit()
+
+
+class ExtractWatchSignals(QObject):
+    """Relais vers le thread GUI des extractions détectées par la surveillance."""
+    new_file = Signal(str)
+
+
+class ExtractIngestWorker(QRunnable):
+    """
+    Prépare une nouvelle extraction (BusinessLogic.prepare_extract) dans un
+    thread du QThreadPool ; le résultat est conservé dans self.result et
+    installé par le thread GUI à la réception de finished.
+    """
+    def __init__(self, logic, file_path):
+        super().__init__()
+        self.logic = logic
+        self.file_path = file_path
+        self.result = None
+        self.signals = DataLoadSignals()
+
+    def run(self):
+        try:
+            self.result = self.logic.prepare_extract(
+                self.file_path, on_progress=self.signals.progress.emit
+            )
+        except Exception as e:
+            self.signals.error.emit(str(e))
+            return
+        self.signals.finished.emit()
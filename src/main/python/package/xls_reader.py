@@ -0,0 +1,59 @@
+# services/xls_reader.py
+"""
+Lecture directe d'un classeur .xls (format BIFF) avec xlrd, sans Excel.
+Produit les mêmes colonnes typées que le lecteur .xlsx en flux.
+"""
+
+import xlrd
+import pandas as pd
+
+from package.xlsx_stream_reader import NA_STRINGS, ColumnBuffer, make_header
+
+
+def read_xls_columns(file_path, usecols):
+    """
+    Lit les colonnes usecols (index à partir de 0) de la première feuille.
+    La première ligne non vide fournit les noms de colonnes.
+    """
+    book = xlrd.open_workbook(str(file_path), on_demand=True)
+    try:
+        sheet = book.sheet_by_index(0)
+        columns = [col for col in sorted(usecols) if col < sheet.ncols]
+        raw_columns = [
+            [_convert_cell(value, cell_type, book.datemode)
+             for value, cell_type in zip(sheet.col_values(col), sheet.col_types(col))]
+            for col in columns
+        ]
+    finally:
+        book.release_resources()
+
+    buffers = [ColumnBuffer() for _ in columns]
+    header = None
+    for row_values in zip(*raw_columns):
+        if all(v is None for v in row_values):
+            continue
+        if header is None:
+            header = make_header(row_values)
+            continue
+        for buffer, value in zip(buffers, row_values):
+            buffer.append(value)
+
+    if header is None:
+        return pd.DataFrame()
+    data = {name: buffer.to_array() for name, buffer in zip(header, buffers)}
+    return pd.DataFrame(data, columns=header)
+
+
+def _convert_cell(value, cell_type, datemode):
+    """Valeur Python d'une cellule xlrd, avec les mêmes règles que pd.read_excel."""
+    if cell_type in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+        return None
+    if cell_type == xlrd.XL_CELL_TEXT:
+        return None if value in NA_STRINGS else value
+    if cell_type == xlrd.XL_CELL_DATE:
+        return xlrd.xldate_as_datetime(value, datemode)
+    if cell_type == xlrd.XL_CELL_BOOLEAN:
+        return bool(value)
+    if float(value).is_integer():
+        return int(value)
+    return value
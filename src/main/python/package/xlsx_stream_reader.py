@@ -0,0 +1,318 @@
+# services/xlsx_stream_reader.py
+"""
+Lecteur .xlsx en flux, limité à quelques colonnes.
+
+Le XML de la feuille est lu avec iterparse : seules les cellules des
+colonnes demandées sont décodées, et leurs valeurs sont rangées par blocs
+dans des tableaux typés (entiers, réels, dates, texte). Aucun objet cellule
+n'est construit pour les autres colonnes, contrairement à pd.read_excel.
+"""
+
+import posixpath
+import re
+import zipfile
+from datetime import datetime, timedelta
+from xml.etree.ElementTree import iterparse, parse
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 5000
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# Formats de date intégrés à Excel (numFmtId)
+BUILTIN_DATE_FORMATS = set(range(14, 23)) | set(range(27, 37)) | {45, 46, 47} | set(range(50, 59))
+
+# Valeurs texte considérées comme vides par pandas.read_excel
+NA_STRINGS = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"
+}
+
+EXCEL_EPOCH = datetime(1899, 12, 30)
+EXCEL_EPOCH_1904 = datetime(1904, 1, 1)
+
+
+def column_index(cell_ref):
+    """'N12' -> 13 (index de colonne à partir de 0)."""
+    index = 0
+    for char in cell_ref:
+        if not char.isalpha():
+            break
+        index = index * 26 + (ord(char.upper()) - 64)
+    return index - 1
+
+
+def is_date_format(format_code):
+    """Vrai si un format personnalisé affiche une date ou une heure."""
+    # Retire les textes entre guillemets, les caractères échappés et les couleurs/conditions
+    code = re.sub(r'"[^"]*"|\\.|\[[^\]]*\]', "", format_code)
+    return re.search(r"[dmyhs]", code, re.IGNORECASE) is not None
+
+
+def read_xlsx_columns(file_path, usecols, chunk_rows=CHUNK_ROWS, on_chunk=None):
+    """
+    Lit les colonnes usecols (index à partir de 0) de la première feuille.
+    La première ligne fournit les noms de colonnes, comme pd.read_excel.
+    on_chunk (optionnel) reçoit un DataFrame pour chaque bloc de chunk_rows lignes.
+    """
+    wanted = {col: position for position, col in enumerate(sorted(usecols))}
+
+    with zipfile.ZipFile(file_path) as archive:
+        sheet_path, epoch = _first_sheet(archive)
+        shared_strings = _read_shared_strings(archive)
+        date_styles = _read_date_styles(archive)
+
+        buffers = [ColumnBuffer() for _ in wanted]
+        header = None
+        row_values = [None] * len(wanted)
+        rows_in_chunk = 0
+
+        with archive.open(sheet_path) as sheet:
+            cell_col = None
+            cell_type = None
+            cell_style = 0
+            cell_value = None
+            position_in_row = 0
+
+            for event, elem in iterparse(sheet, events=("start", "end")):
+                tag = elem.tag
+                if event == "start":
+                    if tag == NS_MAIN + "c":
+                        ref = elem.get("r")
+                        cell_col = column_index(ref) if ref else position_in_row
+                        position_in_row = cell_col + 1
+                        cell_type = elem.get("t", "n")
+                        cell_style = int(elem.get("s", 0))
+                        cell_value = None
+                    elif tag == NS_MAIN + "row":
+                        position_in_row = 0
+                    continue
+
+                if tag == NS_MAIN + "v" or (tag == NS_MAIN + "t" and cell_type == "inlineStr"):
+                    if cell_col in wanted:
+                        cell_value = elem.text
+                elif tag == NS_MAIN + "c":
+                    if cell_col in wanted:
+                        row_values[wanted[cell_col]] = _convert_cell(
+                            cell_value, cell_type, cell_style in date_styles,
+                            shared_strings, epoch
+                        )
+                    elem.clear()
+                elif tag == NS_MAIN + "row":
+                    elem.clear()
+                    if all(v is None for v in row_values):
+                        continue
+                    if header is None:
+                        header = make_header(row_values)
+                    else:
+                        for buffer, value in zip(buffers, row_values):
+                            buffer.append(value)
+                        rows_in_chunk += 1
+                        if rows_in_chunk == chunk_rows:
+                            chunks = [buffer.flush() for buffer in buffers]
+                            if on_chunk:
+                                on_chunk(pd.DataFrame(dict(zip(header, chunks)), columns=header))
+                            rows_in_chunk = 0
+                    row_values = [None] * len(wanted)
+
+    if header is None:
+        return pd.DataFrame()
+
+    last_chunks = [buffer.flush() for buffer in buffers]
+    if on_chunk and rows_in_chunk:
+        on_chunk(pd.DataFrame(dict(zip(header, last_chunks)), columns=header))
+
+    data = {name: buffer.to_array() for name, buffer in zip(header, buffers)}
+    return pd.DataFrame(data, columns=header)
+
+
+# ----------------------------------------------------------------
+#  Métadonnées du classeur
+# ----------------------------------------------------------------
+
+def _first_sheet(archive):
+    """Chemin XML de la première feuille et époque des dates (1900 ou 1904)."""
+    with archive.open("xl/workbook.xml") as f:
+        workbook = parse(f).getroot()
+    pr = workbook.find(f"{NS_MAIN}workbookPr")
+    epoch = EXCEL_EPOCH
+    if pr is not None and pr.get("date1904") in ("1", "true"):
+        epoch = EXCEL_EPOCH_1904
+    rel_id = workbook.find(f"{NS_MAIN}sheets/{NS_MAIN}sheet").get(f"{NS_REL}id")
+
+    with archive.open("xl/_rels/workbook.xml.rels") as f:
+        rels = parse(f).getroot()
+    for rel in rels.iter(f"{NS_PKG_REL}Relationship"):
+        if rel.get("Id") == rel_id:
+            target = rel.get("Target")
+            if target.startswith("/"):
+                return target.lstrip("/"), epoch
+            return posixpath.normpath(posixpath.join("xl", target)), epoch
+    raise ValueError("Feuille introuvable dans le classeur.")
+
+
+def _read_shared_strings(archive):
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as f:
+        for event, elem in iterparse(f, events=("end",)):
+            if elem.tag == NS_MAIN + "si":
+                # Texte simple (<t>) ou riche (<r><t>) ; les annotations phonétiques sont ignorées
+                text = elem.findtext(NS_MAIN + "t")
+                if text is None:
+                    text = "".join(r.findtext(NS_MAIN + "t") or "" for r in elem.findall(NS_MAIN + "r"))
+                strings.append(text)
+                elem.clear()
+    return strings
+
+
+def _read_date_styles(archive):
+    """Index des styles de cellule (attribut s) qui correspondent à un format date."""
+    if "xl/styles.xml" not in archive.namelist():
+        return set()
+    with archive.open("xl/styles.xml") as f:
+        styles = parse(f).getroot()
+    custom_formats = {
+        int(fmt.get("numFmtId")): fmt.get("formatCode", "")
+        for fmt in styles.iter(f"{NS_MAIN}numFmt")
+    }
+    date_styles = set()
+    cell_xfs = styles.find(f"{NS_MAIN}cellXfs")
+    if cell_xfs is None:
+        return date_styles
+    for style_index, xf in enumerate(cell_xfs.findall(f"{NS_MAIN}xf")):
+        fmt_id = int(xf.get("numFmtId", 0))
+        if fmt_id in custom_formats:
+            if is_date_format(custom_formats[fmt_id]):
+                date_styles.add(style_index)
+        elif fmt_id in BUILTIN_DATE_FORMATS:
+            date_styles.add(style_index)
+    return date_styles
+
+
+def make_header(values):
+    header = []
+    for i, value in enumerate(values):
+        name = f"Unnamed: {i}" if value is None else str(value)
+        base, n = name, 1
+        while name in header:
+            name = f"{base}.{n}"
+            n += 1
+        header.append(name)
+    return header
+
+
+# ----------------------------------------------------------------
+#  Conversion des cellules
+# ----------------------------------------------------------------
+
+def _convert_cell(raw, cell_type, is_date, shared_strings, epoch):
+    """Valeur Python d'une cellule, avec les mêmes règles que pd.read_excel/openpyxl."""
+    if raw is None:
+        return None
+    if cell_type == "s":
+        text = shared_strings[int(raw)]
+        return None if text in NA_STRINGS else text
+    if cell_type in ("str", "inlineStr"):
+        return None if raw in NA_STRINGS else raw
+    if cell_type == "b":
+        return raw == "1"
+    if cell_type == "e":
+        return None
+    if cell_type == "d":
+        return datetime.fromisoformat(raw)
+
+    number = float(raw)
+    if is_date:
+        if epoch == EXCEL_EPOCH and number < 60:
+            # Excel considère à tort 1900 comme bissextile
+            number += 1
+        return epoch + timedelta(days=number)
+    if number.is_integer():
+        return int(number)
+    return number
+
+
+class ColumnBuffer:
+    """
+    Tampon d'une colonne : les valeurs sont accumulées dans une liste Python
+    le temps d'un bloc, puis converties en tableau typé.
+    """
+    def __init__(self):
+        self.pending = []
+        self.chunks = []
+
+    def append(self, value):
+        self.pending.append(value)
+
+    def flush(self):
+        """Convertit le bloc en cours en tableau typé et le retourne."""
+        chunk = _typed_chunk(self.pending)
+        self.chunks.append(chunk)
+        self.pending = []
+        return chunk[1]
+
+    def to_array(self):
+        if self.pending:
+            self.flush()
+        kinds = {kind for kind, _ in self.chunks if kind != "empty"}
+        arrays = [array for _, array in self.chunks]
+        has_empty = any(kind == "empty" for kind, _ in self.chunks)
+
+        if not arrays:
+            return np.array([], dtype=object)
+        if not kinds:
+            return np.concatenate(arrays)
+        if kinds == {"int"} and not has_empty:
+            return np.concatenate(arrays)
+        if kinds <= {"int", "float"}:
+            return np.concatenate([a.astype("float64") for a in arrays])
+        if kinds == {"datetime"}:
+            return pd.to_datetime(np.concatenate([a.astype(object) for a in arrays])).to_numpy() \
+                if has_empty else np.concatenate(arrays)
+        if kinds == {"bool"} and not has_empty:
+            return np.concatenate(arrays)
+        # Texte ou types mélangés : colonne objet
+        array = np.concatenate([_to_object(kind, a) for kind, a in self.chunks])
+        if kinds <= {"object", "int", "float"}:
+            # Comme pd.read_excel : une colonne de texte entièrement numérique
+            # ("0070", "0085"...) est convertie en nombres
+            try:
+                return np.asarray(pd.to_numeric(array))
+            except (ValueError, TypeError):
+                pass
+        return array
+
+
+def _typed_chunk(values):
+    """(type, tableau) pour une liste de valeurs d'un bloc."""
+    types = {type(v) for v in values if v is not None}
+    has_none = any(v is None for v in values)
+
+    if not types:
+        return "empty", np.full(len(values), np.nan)
+    if types == {int} and not has_none:
+        return "int", np.array(values, dtype="int64")
+    if types <= {int, float}:
+        return ("int" if types == {int} else "float"), \
+            np.array([np.nan if v is None else v for v in values], dtype="float64")
+    if types == {datetime}:
+        return "datetime", pd.to_datetime(values).to_numpy()
+    if types == {bool} and not has_none:
+        return "bool", np.array(values, dtype=bool)
+    array = np.empty(len(values), dtype=object)
+    array[:] = [np.nan if v is None else v for v in values]
+    return "object", array
+
+
+def _to_object(kind, array):
+    if kind == "datetime":
+        return np.array([pd.NaT if pd.isna(v) else pd.Timestamp(v) for v in array], dtype=object)
+    if kind == "object":
+        return array
+    return array.astype(object)
@@ -0,0 +1,197 @@
+# services/zp20_extractor.py
+"""
+Extraction de l'arborescence ZP20 (nomenclature interactive) en Python.
+
+Remplace la boucle de Transaction.vbs / ZP20_Dic, qui relit le contrôle
+arbre (session.findById(".../shell")) trois fois par nœud puis construit le
+JSON par concaténation de chaînes : le contrôle est résolu une seule fois,
+les clés de nœuds sont lues en une fois, chaque colonne ZTOPO/ZCOMP/ZDES en
+un seul appel (GuiColumnTree.GetColumnCol ; lecture nœud par nœud en
+secours), et les lignes sont écrites au fil de l'eau dans le fichier.
+
+La session est une interface (Zp20Session) :
+  - SapGuiSession : session SAP GUI Scripting (COM, Windows) ;
+  - zp20_tree_stub.FakeZp20Session : arbres en mémoire, pour tester sous
+    Linux sur de grandes nomenclatures synthétiques.
+
+Le fichier produit a le format de data_ref.json ([[ZTOPO, ZCOMP, ZDES], ...],
+CP1252) ; comme dans le script VBS, la première ligne d'une topologie
+l'emporte sur les suivantes.
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from package.job_control import check_cancelled
+from package.perf import perf_span
+
+TREE_SHELL_ID = "wnd[0]/usr/cntlTREE_CONTAINER/shellcont/shell"
+COLUMNS = ("ZTOPO", "ZCOMP", "ZDES")
+# Lignes écrites entre deux vérifications d'annulation
+BATCH_SIZE = 500
+# Les clés de nœuds sont cadrées à droite sur 11 caractères (cf. Transaction.vbs)
+NODE_KEY_WIDTH = 11
+
+
+class Zp20Session(ABC):
+    """Interface d'une session capable d'afficher et de lire l'arbre ZP20."""
+
+    @abstractmethod
+    def open_tree(self, reference):
+        """Lance ZP20 sur reference et retourne l'arbre affiché (Zp20Tree)."""
+
+    def close_tree(self):
+        """Quitte la transaction."""
+        pass
+
+
+class Zp20Tree(ABC):
+    """Interface de l'arbre ZP20 déjà résolu."""
+
+    @abstractmethod
+    def node_keys(self):
+        """Clés de tous les nœuds, dans l'ordre de l'arbre."""
+
+    @abstractmethod
+    def column_texts(self, column):
+        """Textes de la colonne column pour tous les nœuds, dans l'ordre de node_keys()."""
+
+
+# ----------------------------------------------------------------
+#  SAP GUI Scripting
+# ----------------------------------------------------------------
+
+class SapGuiTree(Zp20Tree):
+    def __init__(self, shell):
+        self.shell = shell
+        self._keys = None
+
+    @staticmethod
+    def _elements(collection):
+        try:
+            # Énumération COM : les éléments arrivent par paquets
+            return list(collection)
+        except TypeError:
+            return [collection.ElementAt(i) for i in range(collection.Length)]
+
+    def node_keys(self):
+        keys = self._elements(self.shell.GetAllNodeKeys())
+        self._keys = [str(key).rjust(NODE_KEY_WIDTH) for key in keys]
+        return self._keys
+
+    def column_texts(self, column):
+        keys = self._keys if self._keys is not None else self.node_keys()
+        try:
+            # Toute la colonne en un appel COM, dans l'ordre de GetAllNodeKeys
+            texts = self._elements(self.shell.GetColumnCol(column))
+            if len(texts) == len(keys):
+                return ["" if text is None else str(text) for text in texts]
+            print(f"Colonne ZP20 {column} incomplète ({len(texts)}/{len(keys)}), lecture nœud par nœud")
+        except Exception as e:
+            print(f"Colonne ZP20 {column} illisible en une fois, lecture nœud par nœud : {e}")
+        get_item_text = self.shell.GetItemText
+        return [get_item_text(key, column) for key in keys]
+
+
+class SapGuiSession(Zp20Session):
+    def __init__(self, session=None):
+        """
+        :param session: session SAP GUI Scripting ; par défaut, la première
+            session de la première connexion ouverte
+        """
+        self.session = session if session is not None else self.connect()
+
+    @staticmethod
+    def connect():
+        # Import différé : COM n'existe que sous Windows
+        import pythoncom
+        import win32com.client
+        pythoncom.CoInitialize()
+        try:
+            engine = win32com.client.GetObject("SAPGUI").GetScriptingEngine
+            return engine.Children(0).Children(0)
+        except Exception as e:
+            raise Exception(f"Session SAP introuvable : {str(e)}")
+
+    def open_tree(self, reference):
+        session = self.session
+        session.findById("wnd[0]").maximize()
+        session.findById("wnd[0]/tbar[0]/okcd").text = "/nzp20"
+        session.findById("wnd[0]/tbar[0]/btn[0]").press()
+        session.findById("wnd[0]/usr/ctxtP_RACINE").text = reference
+        session.findById("wnd[0]/tbar[1]/btn[8]").press()
+        try:
+            return SapGuiTree(session.findById(TREE_SHELL_ID))
+        except Exception as e:
+            raise Exception(f"Arborescence ZP20 de {reference} introuvable : {str(e)}")
+
+    def close_tree(self):
+        self.session.findById("wnd[0]/tbar[0]/btn[15]").press()
+
+
+# ----------------------------------------------------------------
+#  Extraction
+# ----------------------------------------------------------------
+
+def iter_tree_rows(tree, batch_size=BATCH_SIZE):
+    """Lignes [ZTOPO, ZCOMP, ZDES] de l'arbre (topologies dédoublonnées)."""
+    count = len(tree.node_keys())
+    columns = []
+    for column in COLUMNS:
+        # Capture lancée par l'exécuteur d'actions : arrêt possible entre deux lectures
+        check_cancelled()
+        texts = tree.column_texts(column)
+        if len(texts) != count:
+            raise Exception(f"Colonne ZP20 {column} incomplète ({len(texts)} nœuds sur {count})")
+        columns.append(texts)
+    seen = set()
+    for position, (topology, component, description) in enumerate(zip(*columns)):
+        if position % batch_size == 0:
+            check_cancelled()
+        if topology in seen:
+            continue
+        seen.add(topology)
+        yield [topology, component, description]
+
+
+def write_bom_json(rows, path):
+    """
+    Écrit rows dans path (JSON, CP1252) au fur et à mesure, via un fichier
+    temporaire remplacé à la fin : le fichier n'est jamais lu à moitié écrit.
+    Retourne le nombre de lignes.
+    """
+    path = Path(path)
+    temporary = path.with_name(path.name + ".tmp")
+    count = 0
+    try:
+        with open(temporary, "w", encoding="cp1252", errors="replace") as jsonfile:
+            jsonfile.write("[")
+            for row in rows:
+                if count:
+                    jsonfile.write(",")
+                jsonfile.write(json.dumps(row, ensure_ascii=False))
+                count += 1
+            jsonfile.write("]\n")
+    except BaseException:
+        # Capture interrompue (annulation, erreur SAP) : data_ref.json inchangé
+        temporary.unlink(missing_ok=True)
+        raise
+    os.replace(temporary, path)
+    return count
+
+
+def extract_bom(session, reference, path, batch_size=BATCH_SIZE):
+    """
+    Capture la nomenclature ZP20 de reference via session (Zp20Session) dans
+    path (format data_ref.json). Retourne le nombre de lignes écrites.
+    """
+    with perf_span("zp20_extract", reference=reference) as span:
+        tree = session.open_tree(reference)
+        try:
+            count = write_bom_json(iter_tree_rows(tree, batch_size), path)
+        finally:
+            session.close_tree()
+        span["rows"] = count
+    return count
@@ -0,0 +1,101 @@
+# services/zp20_tree_stub.py
+"""
+Session ZP20 factice (arbres en mémoire), même interface que SapGuiSession.
+Permet de tester zp20_extractor sans SAP ni Windows, y compris sur de très
+grandes nomenclatures synthétiques :
+
+    python -m package.zp20_tree_stub --positions 50000
+
+Chaque appel à l'arbre (clés, puis une lecture par colonne) est compté, et
+peut être ralenti de latency secondes pour simuler l'aller-retour COM vers
+SAP GUI.
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from package.resourcesPath import SOURCE_RESOURCES_DIR, set_resources_dir
+from package.zp20_extractor import COLUMNS, NODE_KEY_WIDTH, Zp20Session, Zp20Tree, extract_bom
+
+
+class FakeZp20Tree(Zp20Tree):
+    def __init__(self, rows, latency=0.0):
+        """
+        :param rows: lignes [ZTOPO, ZCOMP, ZDES], une par nœud
+        """
+        self.latency = latency
+        self.calls = 0
+        self.nodes = {str(number).rjust(NODE_KEY_WIDTH): row
+                      for number, row in enumerate(rows, start=1)}
+
+    def _call(self):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def node_keys(self):
+        self._call()
+        return list(self.nodes)
+
+    def column_texts(self, column):
+        self._call()
+        position = COLUMNS.index(column)
+        return [row[position] for row in self.nodes.values()]
+
+
+class FakeZp20Session(Zp20Session):
+    def __init__(self, trees, latency=0.0):
+        """
+        :param trees: {référence racine: lignes [ZTOPO, ZCOMP, ZDES]}
+        """
+        self.trees = trees
+        self.latency = latency
+        self.opened = []
+        self.closed = 0
+        self.current = None
+
+    def open_tree(self, reference):
+        if reference not in self.trees:
+            raise Exception(f"Arborescence ZP20 de {reference} introuvable")
+        self.opened.append(reference)
+        self.current = FakeZp20Tree(self.trees[reference], self.latency)
+        return self.current
+
+    def close_tree(self):
+        self.closed += 1
+
+
+def synthetic_rows(positions, seed=0):
+    """Nomenclature synthétique : racine puis positions composants (C1, R2...)."""
+    rng = random.Random(seed)
+    rows = [["", "", ""], ["0001", "5136CMS00000000V01", "PCBA SYNTHETIQUE"]]
+    part_numbers = [f"5136C26202{rng.randint(10000, 99999)}" for _ in range(max(10, positions // 5))]
+    for number in range(1, positions + 1):
+        prefix = rng.choice("CRULQD")
+        rows.append([f"{prefix}{number:03d}", rng.choice(part_numbers), f"COMPOSANT {prefix} {number}"])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extraction ZP20 sur une nomenclature synthétique")
+    parser.add_argument("--positions", type=int, default=50_000)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--latency", type=float, default=0.0, help="durée simulée d'un appel à l'arbre (s)")
+    args = parser.parse_args()
+    # Sans contexte fbs (journal perf_spans dans le dossier source, comme la CLI)
+    set_resources_dir(SOURCE_RESOURCES_DIR)
+
+    session = FakeZp20Session({"SYNTH": synthetic_rows(args.positions)}, args.latency)
+    path = Path(tempfile.gettempdir()) / "zp20_synthetic.json"
+    options = {} if args.batch_size is None else {"batch_size": args.batch_size}
+    start = time.perf_counter()
+    count = extract_bom(session, "SYNTH", path, **options)
+    elapsed = time.perf_counter() - start
+    print(f"{count} lignes écrites dans {path} en {elapsed:.3f} s ({session.current.calls} appels à l'arbre)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# tests/conftest.py
+"""
+Configuration commune des tests : sources dans le chemin d'import, Qt sans
+affichage, dossier Fichies_config temporaire par test (sans contexte fbs).
+
+    python -m pytest -q
+"""
+
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "src" / "main" / "python"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from package import settings  # noqa: E402
+from package.perf import configure_perf_log  # noqa: E402
+from package.resourcesPath import SOURCE_RESOURCES_DIR, set_resources_dir  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+@pytest.fixture(autouse=True)
+def resources_dir(tmp_path):
+    """Dossier Fichies_config vide propre au test ; paramètres relus depuis celui-ci."""
+    directory = tmp_path / "Fichies_config"
+    directory.mkdir()
+    set_resources_dir(directory)
+    settings._settings = None
+    configure_perf_log(None)
+    yield directory
+    settings._settings = None
+
+
+@pytest.fixture
+def write_settings(resources_dir):
+    """Écrit app_settings.json dans le dossier des ressources du test."""
+    def write(**values):
+        with open(resources_dir / "app_settings.json", "w", encoding="utf-8") as f:
+            json.dump(values, f)
+        settings._settings = None
+    return write
+
+
+@pytest.fixture
+def source_resource(resources_dir):
+    """Copie un fichier des ressources du dépôt dans le dossier du test."""
+    def copy(name):
+        return Path(shutil.copy(SOURCE_RESOURCES_DIR / name, resources_dir / name))
+    return copy
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
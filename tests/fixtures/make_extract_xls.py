@@ -0,0 +1,40 @@
+# tests/fixtures/make_extract_xls.py
+"""
+Régénère extraction_OF_du_17_02_2025.xls (format BIFF, tel que déposé par
+SAP sur le réseau) à partir de l'extraction .xlsx des ressources, cellule
+par cellule (texte, nombre, date), pour les tests du lecteur xlrd.
+
+    pip install xlwt openpyxl
+    python tests/fixtures/make_extract_xls.py
+"""
+
+import datetime
+from pathlib import Path
+
+import openpyxl
+import xlwt
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SOURCE = REPO_ROOT / "src" / "main" / "resources" / "base" / "Fichies_config" / "extraction_OF_du_17_02_2025.xlsx"
+TARGET = Path(__file__).resolve().parent / "extraction_OF_du_17_02_2025.xls"
+
+
+def main():
+    source = openpyxl.load_workbook(SOURCE, read_only=True).active
+    book = xlwt.Workbook(encoding="utf-8")
+    sheet = book.add_sheet("Feuil1")
+    date_style = xlwt.easyxf(num_format_str="DD/MM/YYYY")
+    for row, values in enumerate(source.iter_rows(values_only=True)):
+        for col, value in enumerate(values):
+            if value is None:
+                continue
+            if isinstance(value, datetime.datetime):
+                sheet.write(row, col, value, date_style)
+            else:
+                sheet.write(row, col, value)
+    book.save(str(TARGET))
+    print(f"{TARGET.name} écrit ({TARGET.stat().st_size} octets)")
+
+
+if __name__ == "__main__":
+    main()
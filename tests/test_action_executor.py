@@ -0,0 +1,154 @@
+# tests/test_action_executor.py
+"""ActionExecutor : limite par cible, annulation et délai maximal."""
+
+import sys
+import threading
+import time
+
+import pytest
+
+from package.action_executor import ActionExecutor
+from package.job_control import (
+    CANCELLED, CANCELLING, DONE, QUEUED, RUNNING, TIMED_OUT, check_cancelled
+)
+from package.sap_worker import SapWorkerClient
+
+from conftest import REPO_ROOT
+
+
+def wait_until(qapp, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Condition non atteinte dans le délai")
+        qapp.processEvents()
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def executor(qapp):
+    executor = ActionExecutor(limits={"SAP": 1}, timeouts={"SAP": None})
+    yield executor
+    executor.cancel_all()
+    executor.pool.waitForDone(5000)
+
+
+class StuckAction:
+    """Action qui ignore l'annulation (appel COM bloqué) jusqu'à release."""
+    def __init__(self, active):
+        self.release = threading.Event()
+        self.active = active
+
+    def __call__(self):
+        self.active.append(self)
+        try:
+            self.release.wait(5)
+        finally:
+            self.active.remove(self)
+        return "fini"
+
+
+def test_cancelled_job_keeps_target_until_thread_returns(qapp, executor):
+    active = []
+    stuck = StuckAction(active)
+    concurrent = []
+    first = executor.submit("SAP", "ZP20", stuck)
+    second = executor.submit("SAP", "MD04", lambda: len(active), on_done=concurrent.append)
+    wait_until(qapp, lambda: active)
+
+    executor.cancel(first)
+    assert first.state == CANCELLING
+    qapp.processEvents()
+    time.sleep(0.1)
+    qapp.processEvents()
+    # Le thread du premier job tourne encore : le second attend
+    assert second.state == QUEUED
+    assert executor.running_jobs() == [first]
+
+    stuck.release.set()
+    wait_until(qapp, lambda: second.finished)
+    assert first.state == CANCELLED
+    assert second.state == DONE
+    # Jamais deux jobs SAP en même temps
+    assert concurrent == [0]
+
+
+def test_timeout_is_final_only_when_thread_returns(qapp, executor):
+    active = []
+    stuck = StuckAction(active)
+    first = executor.submit("SAP", "ZP20", stuck, timeout=0.2)
+    second = executor.submit("SAP", "MD04", lambda: "ok")
+
+    wait_until(qapp, lambda: first.state == CANCELLING)
+    assert second.state == QUEUED
+
+    stuck.release.set()
+    wait_until(qapp, lambda: second.finished)
+    assert first.state == TIMED_OUT
+    assert first.level == "error"
+    assert second.state == DONE
+
+
+def test_cooperative_job_stops_at_check_cancelled(qapp, executor):
+    started = threading.Event()
+
+    def loop():
+        started.set()
+        while True:
+            check_cancelled()
+            time.sleep(0.01)
+
+    job = executor.submit("SAP", "Boucle", loop)
+    wait_until(qapp, started.is_set)
+    assert job.state == RUNNING
+    executor.cancel(job)
+    wait_until(qapp, lambda: job.finished)
+    assert job.state == CANCELLED
+    assert executor.running_jobs() == []
+
+
+def test_result_of_cancelled_job_is_ignored(qapp, executor):
+    active = []
+    stuck = StuckAction(active)
+    outcomes = []
+    job = executor.submit("SAP", "ZP20", stuck, on_done=outcomes.append)
+    wait_until(qapp, lambda: active)
+    executor.cancel(job)
+    stuck.release.set()
+    wait_until(qapp, lambda: job.finished)
+    assert job.state == CANCELLED
+    assert outcomes == []
+
+
+@pytest.fixture
+def sap_worker(monkeypatch):
+    monkeypatch.setenv("PYTHONPATH", str(REPO_ROOT / "src" / "main" / "python"))
+    client = SapWorkerClient([sys.executable, "-m", "package.sap_worker_stub"],
+                             timeout=60.0, start_timeout=10.0)
+    yield client
+    client.stop()
+
+
+@pytest.mark.parametrize("reason", [CANCELLED, TIMED_OUT])
+def test_hung_sap_worker_is_stopped(qapp, executor, sap_worker, reason):
+    # Worker démarré avant le job : seule la transaction bloque
+    assert sap_worker.run_transaction("/nzp20", "A")["ok"]
+    hung = sap_worker.process
+    timeout = 0.5 if reason == TIMED_OUT else None
+    job = executor.submit("SAP", "ZP20 bloquée",
+                          lambda: sap_worker.run_transaction("/nzp20", "__hang__"), timeout=timeout)
+    wait_until(qapp, lambda: job.state == RUNNING)
+    if reason == CANCELLED:
+        time.sleep(0.2)
+        executor.cancel(job)
+
+    # Arrêt bien avant le délai propre du worker (60 s)
+    wait_until(qapp, lambda: job.finished, timeout=10)
+    assert job.state == reason
+    assert hung.poll() is not None
+    assert sap_worker.process is None
+
+    # Cible SAP libérée ; worker relancé à la transaction suivante
+    after = executor.submit("SAP", "MD04", lambda: sap_worker.run_transaction("/nmd04", "X"))
+    wait_until(qapp, lambda: after.finished, timeout=15)
+    assert after.state == DONE
@@ -0,0 +1,87 @@
+# tests/test_bom_index.py
+"""Index de nomenclature ZP20 : préfixes, plages, recherche inverse et cache par fichier."""
+
+import json
+import os
+
+import pytest
+
+from package.bom_index import BomIndex, get_bom_index
+
+
+def make_rows():
+    rows = [["", "", ""], ["0001", "5136CMS00000000V01", "PCBA"]]
+    rows += [[f"C{n:03d}", f"5136C262{n:05d}", f"COND {n}"] for n in (1, 2, *range(10, 20))]
+    rows += [[f"R{n:03d}", "5136R10K" if n % 2 else "5136R22K", f"RES {n}"] for n in range(1, 26)]
+    rows.append(["U1", "5136U555", "CI"])
+    return rows
+
+
+@pytest.fixture
+def index():
+    return BomIndex(make_rows())
+
+
+def topologies(index, positions):
+    return [index.entries[position][0] for position in positions]
+
+
+def test_prefix_on_topologies(index):
+    assert topologies(index, index.prefix("C01")) == [f"C{n:03d}" for n in range(10, 20)]
+    assert topologies(index, index.prefix("c01", limit=3)) == ["C010", "C011", "C012"]
+    assert index.prefix("  ") == []
+
+
+def test_prefix_falls_back_to_normalized_keys(index):
+    # Aucune topologie ne commence par "C1" : "c1" = C001, C010 à C019
+    assert topologies(index, index.prefix("c1")) == ["C001"] + [f"C{n:03d}" for n in range(10, 20)]
+    assert index.get("c12") == ("C012", "5136C26200012", "COND 12")
+    assert index.get("U001")[1] == "5136U555"
+
+
+def test_topology_ranges(index):
+    expected = [f"C{n:03d}" for n in range(10, 20)]
+    assert topologies(index, index.topology_range("C10", "C19")) == expected
+    # Borne haute sans lettres, bornes inversées
+    assert topologies(index, index.topology_range("C10", "19")) == expected
+    assert topologies(index, index.topology_range("C19", "C10")) == expected
+    assert topologies(index, index.topology_range("R1", "R20")) == [f"R{n:03d}" for n in range(1, 21)]
+    assert index.topology_range("C10", "R19") == []
+
+    exact, candidates = index.search("C10-C19")
+    assert topologies(index, candidates) == expected
+    assert exact is None
+    assert topologies(index, index.search("R1..R20")[1]) == [f"R{n:03d}" for n in range(1, 21)]
+    assert topologies(index, index.search("R5:R7")[1]) == ["R005", "R006", "R007"]
+
+
+def test_reverse_lookup_by_reference(index):
+    assert topologies(index, index.where_reference("5136r10k")) == [f"R{n:03d}" for n in range(1, 26, 2)]
+    assert len(index.where_reference("5136R")) == 25
+    assert len(index.where_reference("5136R", limit=4)) == 4
+    # Saisie libre : ni plage ni topologie, donc référence de composant
+    exact, candidates = index.search("5136U5")
+    assert exact is None and topologies(index, candidates) == ["U1"]
+
+
+def test_shared_index_rebuilt_only_when_file_changes(tmp_path):
+    path = tmp_path / "data_ref.json"
+    with open(path, "w", encoding="cp1252") as f:
+        json.dump(make_rows(), f)
+
+    first = get_bom_index(path)
+    assert get_bom_index(path) is first
+
+    # Même taille, date modifiée
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    second = get_bom_index(path)
+    assert second is not first
+    assert get_bom_index(path) is second
+
+    # Taille modifiée
+    with open(path, "w", encoding="cp1252") as f:
+        json.dump(make_rows() + [["Z9", "5136Z", ""]], f)
+    third = get_bom_index(path)
+    assert third is not second
+    assert third.get("Z9") is not None
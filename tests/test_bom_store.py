@@ -0,0 +1,82 @@
+# tests/test_bom_store.py
+"""Nomenclatures capturées (BomStore) : import, fraîcheur et cas d'emploi."""
+
+import json
+import time
+
+import pytest
+
+from package.bom_index import BomIndex
+from package.bom_store import BomStore, read_bom_json
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = BomStore(tmp_path / "bom" / "bom_store.sqlite3")
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def data_ref(source_resource):
+    return source_resource("data_ref.json")
+
+
+def test_import_json_rows_and_index(store, data_ref):
+    expected = read_bom_json(data_ref)
+    root = store.import_json(" 5136cms87733288v01 ", data_ref)
+
+    assert root == "5136CMS87733288V01"
+    rows = store.rows("5136CMS87733288V01")
+    assert rows == expected
+    # Ligne de titre sans topologie ignorée
+    assert all(topology for topology, _, _ in rows)
+    assert store.roots()[0][::2] == ("5136CMS87733288V01", len(expected))
+
+    index = store.index("5136cms87733288v01")
+    reference = BomIndex.from_json_file(data_ref)
+    assert len(index) == len(reference)
+    assert index.get("C1") == reference.get("C001")
+    # Index gardé en mémoire jusqu'à la capture suivante
+    assert store.index("5136CMS87733288V01") is index
+    store.import_json("5136CMS87733288V01", data_ref, captured_at=time.time() + 1)
+    assert store.index("5136CMS87733288V01") is not index
+
+
+def test_is_fresh_around_max_age(store):
+    now = time.time()
+    store.put("RECENT", [("C1", "X", "")], captured_at=now - 50)
+    store.put("ANCIEN", [("C1", "X", "")], captured_at=now - 150)
+
+    assert store.is_fresh("recent", 100)
+    assert not store.is_fresh("ancien", 100)
+    assert not store.is_fresh("ABSENTE", 100)
+    assert store.captured_at("ABSENTE") is None
+
+
+def test_where_used_ignores_case(store, tmp_path):
+    path = tmp_path / "bom.json"
+    with open(path, "w", encoding="cp1252") as f:
+        json.dump([["", "", ""], ["C1", "5136C26202ABC", "Cond é"], ["R2", "5136R999", "Rés"]],
+                  f, ensure_ascii=False)
+    store.import_json("RACINE1", path)
+    store.put("RACINE2", [("C7", "5136c26202abc", "Cond"), ("U1", "5136U1", "")])
+
+    found = store.where_used("5136C26202abc")
+    assert [(root, topology) for _, root, topology, _ in found] == [("RACINE1", "C1"), ("RACINE2", "C7")]
+    assert found[0][3] == "Cond é"
+
+    by_prefix = store.where_used("5136c2", prefix=True)
+    assert {root for _, root, _, _ in by_prefix} == {"RACINE1", "RACINE2"}
+    assert len(store.where_used("5136", prefix=True, limit=2)) == 2
+    assert store.where_used("  ") == []
+
+    many = store.where_used_many(["5136C26202ABC", "5136r999", "INCONNU", ""])
+    assert many == {
+        "5136C26202ABC": [("RACINE1", "C1"), ("RACINE2", "C7")],
+        "5136r999": [("RACINE1", "R2")],
+        "INCONNU": [],
+    }
+
+    store.delete("racine1")
+    assert store.where_used_many(["5136r999"]) == {"5136r999": []}
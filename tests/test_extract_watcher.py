@@ -0,0 +1,77 @@
+# tests/test_extract_watcher.py
+"""Surveillance du dossier des extractions, sur un dossier local."""
+
+import os
+import threading
+
+from package.extract_watcher import ExtractFolderWatcher
+
+
+def write(path, content=b"x"):
+    path.write_bytes(content)
+    return path
+
+
+def test_prime_ignores_existing_files(tmp_path):
+    write(tmp_path / "extraction_OF_du_17_02_2025.xls")
+    watcher = ExtractFolderWatcher(tmp_path)
+    watcher.prime()
+    assert watcher.poll_once() == []
+    assert watcher.poll_once() == []
+
+
+def test_file_reported_once_stable(tmp_path):
+    watcher = ExtractFolderWatcher(tmp_path)
+    watcher.prime()
+    path = write(tmp_path / "extraction_OF_du_18_02_2025.xls", b"debut")
+
+    # Premier passage : fichier vu, pas encore stable
+    assert watcher.poll_once() == []
+    # Encore en cours d'écriture : taille et date changent
+    write(path, b"debut et suite")
+    os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+    assert watcher.poll_once() == []
+    # Inchangé depuis le passage précédent : signalé, une seule fois
+    assert watcher.poll_once() == [path]
+    assert watcher.poll_once() == []
+
+    # Régénéré ensuite : signalé de nouveau une fois stable
+    write(path, b"nouvelle extraction")
+    assert watcher.poll_once() == []
+    assert watcher.poll_once() == [path]
+
+
+def test_new_files_sorted_oldest_first(tmp_path):
+    watcher = ExtractFolderWatcher(tmp_path)
+    watcher.prime()
+    names = ["extraction_OF_du_03_03_2025.xlsx", "extraction_OF_du_28_02_2025.xls",
+             "extraction_OF_du_01_03_2025.xls"]
+    for name in names:
+        write(tmp_path / name)
+    write(tmp_path / "~$extraction_OF_du_04_03_2025.xlsx")
+    write(tmp_path / "autre_fichier.xls")
+
+    assert watcher.poll_once() == []
+    assert [p.name for p in watcher.poll_once()] == [
+        "extraction_OF_du_28_02_2025.xls",
+        "extraction_OF_du_01_03_2025.xls",
+        "extraction_OF_du_03_03_2025.xlsx",
+    ]
+
+
+def test_background_thread_calls_on_new_file(tmp_path):
+    reported = threading.Event()
+    found = []
+
+    def on_new_file(path):
+        found.append(path)
+        reported.set()
+
+    watcher = ExtractFolderWatcher(tmp_path, on_new_file=on_new_file, interval=0.05)
+    watcher.start()
+    try:
+        path = write(tmp_path / "extraction_OF_du_19_02_2025.xls")
+        assert reported.wait(5)
+    finally:
+        watcher.stop()
+    assert found == [path]
@@ -0,0 +1,43 @@
+# tests/test_history_store.py
+"""Historique des extractions : ajout, relecture et rétention des partitions."""
+
+import datetime
+
+import pandas as pd
+import pytest
+
+from package.history_store import HistoryStore
+
+START = datetime.date(2025, 2, 10)
+
+
+def extract(day_number):
+    return pd.DataFrame({"OF": [f"OF{day_number}", "OF0"], "Quantité": [day_number, 1]})
+
+
+def fill(store, days):
+    for number in range(days):
+        store.append(START + datetime.timedelta(days=number), extract(number))
+
+
+def test_append_and_load(tmp_path):
+    store = HistoryStore(tmp_path / "history", keep_days=5)
+    fill(store, 2)
+    assert store.dates() == [START, START + datetime.timedelta(days=1)]
+    df = store.load(START, columns=["OF"])
+    assert list(df.columns) == ["OF"]
+    assert list(df["OF"]) == ["OF0", "OF0"]
+
+
+def test_prune_keeps_most_recent_days(tmp_path):
+    store = HistoryStore(tmp_path / "history", keep_days=3)
+    fill(store, 5)
+    assert store.dates() == [START + datetime.timedelta(days=n) for n in (2, 3, 4)]
+
+
+@pytest.mark.parametrize("keep_days", [0, -1, None])
+def test_prune_without_limit_keeps_everything(tmp_path, keep_days):
+    store = HistoryStore(tmp_path / "history", keep_days=keep_days)
+    fill(store, 4)
+    store.prune()
+    assert len(store.dates()) == 4
@@ -0,0 +1,103 @@
+# tests/test_interactive_bom.py
+"""Nomenclature interactive : réutilisation des captures récentes, nouvelle capture sinon."""
+
+import time
+
+import pytest
+
+from package import bom_store
+from package.bom_store import BomStore, read_bom_json
+from package.logic import BusinessLogic
+
+REFERENCE = "5136CMS87733288V01"
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = BomStore(tmp_path / "bom" / bom_store.STORE_FILE_NAME)
+    monkeypatch.setattr(bom_store, "_bom_store", store)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def logic(store, source_resource):
+    """BusinessLogic dont la capture SAP renvoie le data_ref.json des ressources."""
+    data_ref = source_resource("data_ref.json")
+    logic = BusinessLogic(use_search_index=False)
+    logic.captures = []
+    logic.shown = []
+
+    def bom_capture(reference):
+        logic.captures.append(reference)
+        return data_ref
+
+    logic.bom_capture = bom_capture
+    # Fenêtre de recherche non affichée : seule la référence est notée
+    logic.show_interactive_bom = lambda reference, executor=None: logic.shown.append(reference)
+    logic.data_ref = data_ref
+    return logic
+
+
+class ImmediateExecutor:
+    """Exécuteur minimal : le job tourne tout de suite, dans le thread courant."""
+    def __init__(self):
+        self.targets = []
+        self.outcomes = []
+
+    def submit(self, target, label, func, on_done=None):
+        self.targets.append(target)
+        outcome = func()
+        self.outcomes.append(on_done(outcome) if on_done else outcome)
+
+
+def test_fresh_capture_is_reused(logic, store):
+    logic.open_interactive_bom(REFERENCE)
+    assert logic.captures == [REFERENCE]
+    assert store.rows(REFERENCE) == read_bom_json(logic.data_ref)
+
+    logic.open_interactive_bom(f" {REFERENCE.lower()} ")
+    assert logic.captures == [REFERENCE]
+    assert len(logic.shown) == 2
+
+
+def test_stale_capture_or_forced_refresh_captures_again(logic, store, write_settings):
+    write_settings(bom_max_age_hours=1)
+    store.put(REFERENCE, [("C1", "ANCIEN", "")], captured_at=time.time() - 2 * 3600)
+
+    logic.open_interactive_bom(REFERENCE)
+    assert logic.captures == [REFERENCE]
+    assert store.rows(REFERENCE) == read_bom_json(logic.data_ref)
+
+    logic.open_interactive_bom(REFERENCE, force_refresh=True)
+    assert logic.captures == [REFERENCE, REFERENCE]
+
+
+def test_capture_goes_through_the_sap_queue(logic):
+    executor = ImmediateExecutor()
+    logic.open_interactive_bom(REFERENCE, executor=executor)
+    assert executor.targets == ["SAP"]
+    assert executor.outcomes == [("Nomenclature capturée", "info")]
+    assert logic.shown == [REFERENCE]
+
+    # Capture récente : pas de nouveau job SAP
+    logic.open_interactive_bom(REFERENCE, executor=executor)
+    assert executor.targets == ["SAP"]
+
+
+def test_failed_capture_keeps_previous_rows(logic, store):
+    previous = [("C1", "5136C1", "COND"), ("R1", "5136R1", "RES")]
+    store.put(REFERENCE, previous, captured_at=time.time() - 48 * 3600)
+
+    def sap_closed(reference):
+        raise Exception("Session SAP introuvable")
+
+    logic.bom_capture = sap_closed
+    message, level = logic.refresh_bom(REFERENCE)
+    assert level == "warning"
+    assert "dernière capture conservée" in message
+    assert store.rows(REFERENCE) == previous
+
+    # Sans capture précédente, l'erreur remonte
+    with pytest.raises(Exception, match="Session SAP introuvable"):
+        logic.refresh_bom("5136AUTRE")
@@ -0,0 +1,63 @@
+# tests/test_ipr_index.py
+"""Index IPR : priorité des répertoires et rafraîchissement hors du chemin de recherche."""
+import time
+
+from package import ipr_index
+from package.ipr_index import IPR_DIRECTORIES, IprIndex
+
+
+def make_share(tmp_path):
+    base = tmp_path / "Methodes Production"
+    for dir_name in IPR_DIRECTORIES:
+        (base / dir_name).mkdir(parents=True)
+    return base
+
+
+def test_lookup_respects_directory_and_type_priority(tmp_path):
+    base = make_share(tmp_path)
+    (base / "3- IPR ARCHIVES" / "ABC-12.xlsx").touch()
+    (base / "1- IPR AUTORISEES" / "ABC-12.doc").touch()
+    (base / "1- IPR AUTORISEES" / "ABC-12.xls").touch()
+
+    index = IprIndex(tmp_path / "ipr_index.json", base_path=base)
+
+    dir_name, path, kind = index.lookup("abc/12 ")
+    assert (dir_name, kind) == ("1- IPR AUTORISEES", "xls")
+    assert path.endswith("ABC-12.xls")
+    assert index.lookup("inconnu") is None
+
+
+def test_lookup_serves_current_index_and_refreshes_in_background(tmp_path, monkeypatch):
+    base = make_share(tmp_path)
+    (base / "0- IPR VALIDE" / "OLD.xls").touch()
+    index = IprIndex(tmp_path / "ipr_index.json", base_path=base)
+    assert index.lookup("OLD") is not None
+
+    # Nouveau fichier : l'index courant répond tant que l'intervalle n'est pas écoulé
+    (base / "2- IPR en COURS" / "NEW.xls").touch()
+    refreshes = []
+    monkeypatch.setattr(index, "refresh_in_background",
+                        lambda force=False: refreshes.append(force))
+    assert index.lookup("NEW") is None
+    assert refreshes == []
+
+    # Intervalle écoulé : lookup déclenche le rafraîchissement sans l'attendre
+    index.refreshed_at = time.monotonic() - ipr_index.REFRESH_INTERVAL_S - 1
+    assert index.lookup("NEW") is None
+    assert refreshes == [False]
+
+    monkeypatch.undo()
+    index.refreshed_at = None
+    index.lookup("NEW")
+    index._refresh_thread.join(timeout=5)
+    assert index.lookup("NEW")[0] == "2- IPR en COURS"
+
+
+def test_index_is_reloaded_from_disk(tmp_path):
+    base = make_share(tmp_path)
+    (base / "0- IPR VALIDE" / "KEEP.doc").touch()
+    IprIndex(tmp_path / "ipr_index.json", base_path=base).refresh()
+
+    reloaded = IprIndex(tmp_path / "ipr_index.json", base_path=base)
+    assert reloaded.directory_entries
+    assert reloaded._lookup["keep"][2] == "doc"
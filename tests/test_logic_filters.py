@@ -0,0 +1,42 @@
+# tests/test_logic_filters.py
+"""Filtrage de BusinessLogic : filtres texte et « lignes modifiées »."""
+
+import numpy as np
+import pandas as pd
+
+from package.extract_diff import ADDED, MODIFIED, UNCHANGED, ExtractDiff
+from package.logic import BusinessLogic
+
+
+def make_diff(df, row_status):
+    row_status = np.array(row_status, dtype=np.int8)
+    changed = np.zeros((len(df), len(df.columns)), dtype=bool)
+    removed = pd.DataFrame({"OF": [], "Opération": []})
+    return ExtractDiff(df.columns, row_status, changed, removed, "16/02/2025")
+
+
+def make_df():
+    return pd.DataFrame({"OF": ["OF1", "OF2", "OF3"], "Opération": ["10", "20", "10"]})
+
+
+def test_only_changed_combines_with_text_filters():
+    df = make_df()
+    logic = BusinessLogic(use_search_index=False)
+    logic.set_data(df, make_diff(df, [UNCHANGED, ADDED, MODIFIED]))
+
+    logic.set_only_changed(True)
+    assert list(logic.filter_data(["", ""])["OF"]) == ["OF2", "OF3"]
+    assert list(logic.filter_data(["", "10"])["OF"]) == ["OF3"]
+
+
+def test_new_data_resets_only_changed():
+    df = make_df()
+    logic = BusinessLogic(use_search_index=False)
+    logic.set_data(df, make_diff(df, [UNCHANGED, ADDED, UNCHANGED]))
+    logic.set_only_changed(True)
+    assert len(logic.filter_data(["", ""])) == 1
+
+    # Autre extraction (ou date d'historique) : la case repart décochée
+    logic.set_data(df, make_diff(df, [ADDED, UNCHANGED, UNCHANGED]))
+    assert logic.only_changed is False
+    assert len(logic.filter_data(["", ""])) == 3
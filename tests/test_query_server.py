@@ -0,0 +1,114 @@
+# tests/test_query_server.py
+"""Service de requêtes : application bottle servie en local (port libre)."""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+import pandas as pd
+import pytest
+
+from package.query_client import RemoteExtractClient
+from package.query_server import ExtractQueryService, create_app
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def make_df():
+    return pd.DataFrame({
+        "OF": ["OF1", "OF2", "OF3", "OF4"],
+        "Désignation": ["Dégrappage", "Collage", "Dégrappage", "Étuvage"],
+        "Quantité": [10, 20, 30, 40],
+    })
+
+
+@pytest.fixture
+def server():
+    service = ExtractQueryService(make_df())
+    httpd = make_server("127.0.0.1", 0, create_app(service), handler_class=QuietHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield service, f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(url, etag=None):
+    request = urllib.request.Request(url)
+    if etag:
+        request.add_header("If-None-Match", etag)
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, response.headers.get("ETag"), json.loads(response.read().decode("utf-8"))
+    except urllib.error.HTTPError as e:
+        body = e.read().decode("utf-8")
+        return e.code, e.headers.get("ETag"), json.loads(body) if body else None
+
+
+def test_query_and_not_modified(server):
+    _, base = server
+    status, etag, payload = get(f"{base}/api/query?f=D%C3%A9signation%3Ddegr")
+    assert status == 200
+    assert payload["meta"]["total"] == 2
+    assert [row[0] for row in payload["frame"]["data"]] == ["OF1", "OF3"]
+
+    status, same_etag, _ = get(f"{base}/api/query?f=D%C3%A9signation%3Ddegr", etag)
+    assert (status, same_etag) == (304, etag)
+
+
+def test_bad_requests(server):
+    _, base = server
+    status, _, payload = get(f"{base}/api/query?f=Inconnue%3Dx")
+    assert status == 400 and "Colonne inconnue" in payload["error"]
+    status, _, payload = get(f"{base}/api/values/OF?f=sans-egal")
+    assert status == 400 and "Filtre invalide" in payload["error"]
+
+
+def test_repeated_column_keys_on_resolved_filter(server):
+    _, base = server
+    # Colonne répétée : le dernier texte l'emporte, la clé de cache aussi
+    status, etag_a, payload = get(f"{base}/api/query?f=OF%3DOF1&f=OF%3DOF2")
+    assert status == 200 and payload["frame"]["data"][0][0] == "OF2"
+    status, etag_b, payload = get(f"{base}/api/query?f=OF%3DOF2&f=OF%3DOF1")
+    assert status == 200 and payload["frame"]["data"][0][0] == "OF1"
+    assert etag_a != etag_b
+    # Même filtre résolu, écrit autrement : même réponse en cache
+    _, etag_c, _ = get(f"{base}/api/query?f=of%3DOF2")
+    assert etag_c == etag_a
+
+
+def test_values_and_client(server):
+    service, base = server
+    client = RemoteExtractClient(base)
+    info = client.info()
+    assert info["rows"] == 4
+    labels, counts, longest = client.values("Désignation", ["", "", ""])
+    assert labels == ["Collage", "Dégrappage", "Étuvage"]
+    assert counts == [1, 2, 1]
+
+    df, total = client.query(["", "", ""], limit=2)
+    assert total == 4 and len(df) == 2
+    assert df["Quantité"].tolist() == [10, 20]
+
+    # Extraction remplacée : nouvelle version, nouvelles réponses
+    service.set_extract(make_df().head(1))
+    df, total = client.query(["", "", ""])
+    assert total == 1
+
+
+def test_build_runs_outside_lock():
+    service = ExtractQueryService(make_df())
+    seen = []
+
+    def build():
+        seen.append(service._lock.locked())
+        return "{}"
+
+    assert service.respond(["test"], build)[1] == "{}"
+    assert service.respond(["test"], build)[1] == "{}"
+    assert seen == [False]
@@ -0,0 +1,94 @@
+# tests/test_sap_worker.py
+"""SapWorkerClient face au worker factice (sap_worker_stub), et repli sur cscript."""
+
+import sys
+
+import pytest
+
+from package import sap_service
+from package.sap_worker import (
+    SapTransactionError, SapWorkerClient, SapWorkerError, SapWorkerStartError, SapWorkerTimeout
+)
+
+from conftest import REPO_ROOT
+
+STUB_COMMAND = [sys.executable, "-m", "package.sap_worker_stub"]
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    monkeypatch.setenv("PYTHONPATH", str(REPO_ROOT / "src" / "main" / "python"))
+    client = SapWorkerClient(STUB_COMMAND, timeout=5.0, start_timeout=10.0)
+    yield client
+    client.stop()
+
+
+def test_runs_transactions_in_one_process(worker):
+    assert worker.run_transaction("/nzp20", "5136CMS00000000V01")["ok"]
+    process = worker.process
+    assert worker.run_transaction("/nmd04", "X")["ok"]
+    assert worker.process is process
+    assert worker.ping()
+
+
+def test_transaction_error_keeps_worker(worker):
+    worker.run_transaction("/nzp20", "A")
+    process = worker.process
+    with pytest.raises(SapTransactionError, match="Erreur simulée"):
+        worker.run_transaction("/nzp20", "__error__")
+    assert worker.process is process and worker.is_alive()
+
+
+def test_timeout_is_not_replayed(worker):
+    worker.timeout = 1.0
+    with pytest.raises(SapWorkerTimeout):
+        worker.run_transaction("/nzp20", "__hang__")
+    # Worker bloqué arrêté, relancé à la requête suivante
+    assert worker.process is None
+    assert worker.run_transaction("/nzp20", "A")["ok"]
+
+
+def test_crash_is_replayed_once_then_not_a_start_error(worker):
+    with pytest.raises(SapWorkerError) as raised:
+        worker.run_transaction("/nzp20", "__crash__")
+    assert not isinstance(raised.value, SapWorkerStartError)
+
+
+def test_start_failure_is_a_start_error(tmp_path):
+    client = SapWorkerClient([sys.executable, "-c", "pass"], start_timeout=5.0)
+    with pytest.raises(SapWorkerStartError):
+        client.run_transaction("/nzp20", "A")
+    client = SapWorkerClient([str(tmp_path / "absent.exe")])
+    with pytest.raises(SapWorkerStartError):
+        client.run_transaction("/nzp20", "A")
+
+
+class RaisingWorker:
+    def __init__(self, error):
+        self.error = error
+
+    def run_transaction(self, transaction, value=""):
+        raise self.error
+
+
+@pytest.mark.parametrize("error, falls_back", [
+    (SapWorkerStartError("absent"), True),
+    (SapWorkerTimeout("délai"), False),
+    (SapWorkerError("arrêt"), False),
+    (SapTransactionError("refus"), False),
+])
+def test_cscript_fallback_only_before_sending(monkeypatch, write_settings, resources_dir,
+                                              error, falls_back):
+    write_settings(sap_worker=True)
+    (resources_dir / "TransactionSAP.vbs").touch()
+    monkeypatch.setattr(sap_service, "get_sap_worker", lambda: RaisingWorker(error))
+    launched = []
+    monkeypatch.setattr(sap_service, "run_process", lambda args, **kwargs: launched.append(args))
+
+    if falls_back:
+        assert sap_service._run_sap_transaction("/nzp20", "A") == "cscript"
+        assert len(launched) == 1
+    else:
+        with pytest.raises(Exception):
+            sap_service._run_sap_transaction("/nzp20", "A")
+        assert launched == []
@@ -0,0 +1,59 @@
+# tests/test_value_catalog.py
+"""Catalogue des valeurs (FilterEngine) et liste virtuelle des filtres."""
+
+import numpy as np
+import pandas as pd
+
+from package import value_popup
+from package.filter_engine import FilterEngine, normalize_text
+from package.value_popup import ValueListModel
+
+
+def make_engine():
+    df = pd.DataFrame({
+        "Désignation": ["Dégrappage", "COLLAGE", None, "Dégrappage", "Étuvage"],
+        "Atelier": pd.Categorical(["A1", "B2", "A1", "A1", "B2"]),
+    })
+    return FilterEngine(df)
+
+
+def test_value_entries_carry_normalized_labels():
+    engine = make_engine()
+    for catalog in engine.catalogs:
+        labels, search_labels, counts = catalog.value_entries()
+        assert list(search_labels) == [normalize_text(label) for label in labels]
+
+    labels, search_labels, counts = engine.catalogs[0].value_entries()
+    assert list(labels) == ["COLLAGE", "Dégrappage", "Étuvage"]
+    assert list(counts) == [1, 2, 1]
+
+    mask = np.array([True, False, False, True, False])
+    labels, search_labels, counts = engine.catalogs[0].value_entries(mask)
+    assert list(labels) == ["Dégrappage"] and list(search_labels) == ["degrappage"]
+    assert list(counts) == [2]
+
+
+def test_list_model_reuses_catalog_labels(qapp, monkeypatch):
+    labels, search_labels, counts = make_engine().catalogs[0].value_entries()
+    calls = []
+    monkeypatch.setattr(value_popup, "normalize_text",
+                        lambda text: calls.append(text) or normalize_text(text))
+
+    model = ValueListModel()
+    model.set_values(labels, counts, search_labels)
+    model.set_search_text("DEGR")
+    # Seul le texte saisi est normalisé, pas les libellés
+    assert calls == ["DEGR"]
+    assert [model.value(row) for row in range(model.rowCount())] == ["Dégrappage"]
+
+    model.set_search_text("")
+    assert model.rowCount() == 3
+
+
+def test_list_model_normalizes_once_without_catalog_labels(qapp):
+    model = ValueListModel()
+    model.set_values(["Étuvage", "COLLAGE"], [1, 2])
+    model.set_search_text("etu")
+    assert [model.value(row) for row in range(model.rowCount())] == ["Étuvage"]
+    model.set_search_text("coll")
+    assert [model.value(row) for row in range(model.rowCount())] == ["COLLAGE"]
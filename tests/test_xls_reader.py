@@ -0,0 +1,57 @@
+# tests/test_xls_reader.py
+
+import datetime
+import shutil
+
+import pandas as pd
+
+from package.DataExtractOF import get_extract_of_the_day
+from package.data_extract_service import read_extract_file
+from package.resourcesPath import SOURCE_RESOURCES_DIR
+
+from conftest import FIXTURES_DIR
+
+XLS_FIXTURE = FIXTURES_DIR / "extraction_OF_du_17_02_2025.xls"
+XLSX_SOURCE = SOURCE_RESOURCES_DIR / "extraction_OF_du_17_02_2025.xlsx"
+
+
+def test_xls_matches_xlsx_load():
+    from_xls = read_extract_file(XLS_FIXTURE)
+    from_xlsx = read_extract_file(XLSX_SOURCE)
+
+    assert len(from_xls) == len(from_xlsx) > 0
+    assert list(from_xls.columns) == list(from_xlsx.columns)
+    assert from_xls.dtypes.to_dict() == from_xlsx.dtypes.to_dict()
+    pd.testing.assert_frame_equal(from_xls, from_xlsx)
+
+
+def test_extract_of_the_day_reads_network_xls(tmp_path, resources_dir, write_settings):
+    network = tmp_path / "reseau"
+    network.mkdir()
+    today = datetime.date.today()
+    name = f"extraction_OF_du_{today:%d_%m_%Y}.xls"
+    shutil.copy(XLS_FIXTURE, network / name)
+    write_settings(extract_source_dir=str(network), keep_xlsx_copy=False)
+
+    # Sans copie .xlsx locale : le .xls réseau est lu tel quel (sans Excel)
+    path = get_extract_of_the_day()
+    assert path == network / name
+    df = read_extract_file(path)
+    assert len(df) == len(read_extract_file(XLSX_SOURCE))
+
+
+def test_extract_of_the_day_prefers_local_xlsx(tmp_path, resources_dir, write_settings):
+    network = tmp_path / "reseau"
+    network.mkdir()
+    today = datetime.date.today()
+    shutil.copy(XLS_FIXTURE, network / f"extraction_OF_du_{today:%d_%m_%Y}.xls")
+    local = resources_dir / f"extraction_OF_du_{today:%d_%m_%Y}.xlsx"
+    shutil.copy(XLSX_SOURCE, local)
+    write_settings(extract_source_dir=str(network))
+
+    assert get_extract_of_the_day() == local
+
+
+def test_extract_of_the_day_missing(tmp_path, write_settings):
+    write_settings(extract_source_dir=str(tmp_path / "absent"))
+    assert get_extract_of_the_day() is None
@@ -0,0 +1,126 @@
+# tests/test_zp20_extractor.py
+"""Extraction ZP20 : session factice, lecture par colonne de l'arbre SAP GUI."""
+
+import json
+
+import pytest
+
+from package.job_control import ActionCancelled, ActionJob, CANCELLED, running_job
+from package.zp20_extractor import (
+    NODE_KEY_WIDTH, SapGuiTree, Zp20Session, Zp20Tree, extract_bom, iter_tree_rows
+)
+from package.zp20_tree_stub import FakeZp20Session, FakeZp20Tree, synthetic_rows
+
+ROWS = [
+    ["", "", ""],
+    ["0001", "5136CMS00000000V01", "PCBA \"ESSAI\""],
+    ["C001", "5136C2620210281", "COND 220nF 20% 10V"],
+    ["R002", "5136R999", "RÉSISTANCE 10kΩ"],
+    ["C001", "5136AUTRE", "doublon ignoré"],
+]
+
+
+def read_json(path):
+    with open(path, "r", encoding="cp1252") as f:
+        return json.load(f)
+
+
+def test_interfaces_are_abstract():
+    with pytest.raises(TypeError):
+        Zp20Tree()
+    with pytest.raises(TypeError):
+        Zp20Session()
+
+
+def test_extract_bom_from_fake_session(tmp_path):
+    session = FakeZp20Session({"REF": ROWS})
+    path = tmp_path / "data_ref.json"
+
+    count = extract_bom(session, "REF", path, batch_size=2)
+
+    assert count == 4
+    assert session.opened == ["REF"] and session.closed == 1
+    # Clés puis une lecture par colonne, quel que soit le nombre de nœuds
+    assert session.current.calls == 4
+    rows = read_json(path)
+    assert rows[0] == ["", "", ""]
+    assert rows[1][2] == 'PCBA "ESSAI"'
+    # Première ligne d'une topologie conservée ; caractère hors CP1252 remplacé
+    assert rows[2] == ["C001", "5136C2620210281", "COND 220nF 20% 10V"]
+    assert rows[3] == ["R002", "5136R999", "RÉSISTANCE 10k?"]
+    assert not (tmp_path / "data_ref.json.tmp").exists()
+
+
+def test_calls_do_not_grow_with_tree_size(tmp_path):
+    session = FakeZp20Session({"SYNTH": synthetic_rows(5000)})
+    assert extract_bom(session, "SYNTH", tmp_path / "synth.json") == 5002
+    assert session.current.calls == 4
+
+
+def test_failed_capture_keeps_previous_file(tmp_path):
+    class BrokenTree(FakeZp20Tree):
+        def column_texts(self, column):
+            if column == "ZDES":
+                raise Exception("Session SAP perdue")
+            return super().column_texts(column)
+
+    class BrokenSession(FakeZp20Session):
+        def open_tree(self, reference):
+            super().open_tree(reference)
+            self.current = BrokenTree(self.trees[reference])
+            return self.current
+
+    path = tmp_path / "data_ref.json"
+    path.write_text("[]\n", encoding="cp1252")
+    session = BrokenSession({"REF": ROWS})
+    with pytest.raises(Exception, match="Session SAP perdue"):
+        extract_bom(session, "REF", path)
+    assert session.closed == 1
+    assert path.read_text(encoding="cp1252") == "[]\n"
+    assert not (tmp_path / "data_ref.json.tmp").exists()
+
+
+def test_cancelled_job_stops_extraction():
+    job = ActionJob(1, "SAP", "ZP20", func=None)
+    job.request_cancel(CANCELLED)
+    tree = FakeZp20Tree(ROWS)
+    with running_job(job), pytest.raises(ActionCancelled):
+        list(iter_tree_rows(tree))
+
+
+class FakeShell:
+    """Contrôle arbre COM minimal : appels comptés par méthode."""
+    def __init__(self, rows, column_col=True):
+        self.rows = {number: row for number, row in enumerate(rows, start=1)}
+        self.column_col = column_col
+        self.calls = {"GetAllNodeKeys": 0, "GetColumnCol": 0, "GetItemText": 0}
+
+    def GetAllNodeKeys(self):
+        self.calls["GetAllNodeKeys"] += 1
+        return list(self.rows)
+
+    def GetColumnCol(self, column):
+        self.calls["GetColumnCol"] += 1
+        if not self.column_col:
+            raise AttributeError("GetColumnCol")
+        position = ("ZTOPO", "ZCOMP", "ZDES").index(column)
+        return [row[position] for row in self.rows.values()]
+
+    def GetItemText(self, key, column):
+        self.calls["GetItemText"] += 1
+        assert len(key) == NODE_KEY_WIDTH
+        return self.rows[int(key)][("ZTOPO", "ZCOMP", "ZDES").index(column)]
+
+
+def test_sap_gui_tree_reads_each_column_once():
+    shell = FakeShell(ROWS)
+    rows = list(iter_tree_rows(SapGuiTree(shell)))
+    assert [row[0] for row in rows] == ["", "0001", "C001", "R002"]
+    assert shell.calls == {"GetAllNodeKeys": 1, "GetColumnCol": 3, "GetItemText": 0}
+
+
+def test_sap_gui_tree_falls_back_to_item_texts():
+    shell = FakeShell(ROWS, column_col=False)
+    rows = list(iter_tree_rows(SapGuiTree(shell)))
+    assert rows == list(iter_tree_rows(SapGuiTree(FakeShell(ROWS))))
+    assert shell.calls["GetItemText"] == 3 * len(ROWS)